@@ -0,0 +1,61 @@
+"""
+Benchmark of the exact matching algorithm on random dense graphs.
+
+Run from the repository root:
+
+	python -m bench.bench_matching --vertices 5000 --degree 100
+
+Prints the solve time and the solver statistics, so that the effect of
+changes to the algorithm can be compared between runs.
+"""
+
+import argparse
+import random
+import time
+
+from src.mwmatching import solve_maximum_weight_matching, SolverStats
+
+
+def random_graph(num_vertex: int, degree: int, seed: int, integer: bool) -> list[tuple[int, int, float]]:
+	# Every vertex gets about "degree" random neighbours, like a kNN graph
+	rng = random.Random(seed)
+	seen = set()
+	edges = []
+	for x in range(num_vertex):
+		for y in rng.sample(range(num_vertex), degree // 2 + 1):
+			key = (min(x, y), max(x, y))
+			if x != y and key not in seen:
+				seen.add(key)
+				w = rng.randint(1, 1_000_000) if integer else rng.random()
+				edges.append((key[0], key[1], w))
+	return edges
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--vertices", type=int, default=5000)
+	parser.add_argument("--degree", type=int, default=100)
+	parser.add_argument("--seed", type=int, default=1)
+	parser.add_argument("--repeat", type=int, default=1)
+	parser.add_argument("--float", action="store_true", help="use floating point weights")
+	parser.add_argument("--stats", action="store_true", help="collect and print solver statistics")
+	args = parser.parse_args()
+
+	edges = random_graph(args.vertices, args.degree, args.seed, not args.float)
+	print(f"graph: {args.vertices} vertices, {len(edges)} edges")
+
+	best = float("inf")
+	for _ in range(args.repeat):
+		stats = SolverStats() if args.stats else None
+		start = time.perf_counter()
+		result = solve_maximum_weight_matching(edges, stats=stats)
+		elapsed = time.perf_counter() - start
+		best = min(best, elapsed)
+		print(f"solve: {elapsed:.3f} s, {len(result.pairs)} pairs")
+		if stats is not None:
+			print(f"stages: {len(stats.stages)}, {stats.totals()}")
+	print(f"best: {best:.3f} s")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,47 @@
+import numpy
+
+# Bytes per similarity entry while a block is ranked: the float32 similarity, its negation, and the int64 argpartition result
+_BYTES_PER_ENTRY = 16
+
+# Bytes per result entry: an int64 index and a float32 score
+_BYTES_PER_RESULT = 12
+
+def unit_rows(vectors) -> numpy.ndarray:
+	# float32 rows scaled to unit length, so dot products are cosine similarities; zero rows stay zero
+	return normalize_rows(numpy.array(vectors, dtype=numpy.float32))
+
+def normalize_rows(matrix: numpy.ndarray) -> numpy.ndarray:
+	# Scales the rows of a float matrix to unit length in place, one row-sized temporary at a time; zero rows stay zero
+	norms = numpy.sqrt(numpy.einsum("ij,ij->i", matrix, matrix))
+	norms[norms == 0] = 1
+	matrix /= norms[:, None]
+	return matrix
+
+def top_k_neighbours(vectors, k: int, memory_limit: int = 256 * 2**20) -> tuple[numpy.ndarray, numpy.ndarray]:
+	# Exact cosine top-k of every row among all other rows, best first, as (n, k) arrays of indices and similarities
+	return top_k_unit_neighbours(unit_rows(vectors), k, memory_limit)
+
+def top_k_unit_neighbours(unit: numpy.ndarray, k: int, memory_limit: int = 256 * 2**20) -> tuple[numpy.ndarray, numpy.ndarray]:
+	# top_k_neighbours() for rows that are already unit length, e.g. from normalize_rows().
+	# memory_limit covers everything ranking holds: the rows themselves, the results, and the block of similarities,
+	# whose size is whatever the rows and results leave over (at least one row at a time)
+	num_vertex = len(unit)
+	k = max(0, min(k, num_vertex - 1))
+	indices = numpy.empty((num_vertex, k), dtype=numpy.int64)
+	scores = numpy.empty((num_vertex, k), dtype=numpy.float32)
+	if k == 0:
+		return indices, scores
+	block_budget = memory_limit - unit.nbytes - _BYTES_PER_RESULT * num_vertex * k
+	block_size = max(1, block_budget // (_BYTES_PER_ENTRY * num_vertex))
+	for start in range(0, num_vertex, block_size):
+		end = min(start + block_size, num_vertex)
+		similarity = unit[start:end] @ unit.T
+		rows = numpy.arange(end - start)
+		# Never your own neighbour
+		similarity[rows, rows + start] = -numpy.inf
+		candidates = numpy.argpartition(-similarity, k - 1, axis=1)[:, :k]
+		candidate_scores = numpy.take_along_axis(similarity, candidates, axis=1)
+		order = numpy.argsort(-candidate_scores, axis=1, kind="stable")
+		indices[start:end] = numpy.take_along_axis(candidates, order, axis=1)
+		scores[start:end] = numpy.take_along_axis(candidate_scores, order, axis=1)
+	return indices, scores
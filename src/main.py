@@ -1,19 +1,70 @@
+import os
+import time
 from logging import Logger
 from .pinecone_graph import PineconeGraph
-from .matching import optimal_matching
+from .matching import optimal_matching, certified_matching
+from .mwmatching import SolverStats, ingest_edges
 from .coda_client import CodaClient
 
 
 INDEX_NAME = "matchmaker-interests-3072"
 
+# Cloud Function timeout (see TIMEOUT in deploy.sh), and the time we keep
+# in reserve after matching to persist the pairs to Coda and Pinecone
+FUNCTION_TIMEOUT_SECONDS = 540
+PERSIST_RESERVE_SECONDS = 60
+
+# Cosine scores are rounded to multiples of this before matching, so the solver
+# works on exact integers; differences below it are noise in the embeddings anyway
+WEIGHT_RESOLUTION = 1e-6
+
+# A solve stopped by the deadline is resumed from here on the next invocation.
+# /tmp survives between invocations only while the same instance stays warm.
+CHECKPOINT_PATH = os.environ.get("MATCHING_CHECKPOINT_PATH", "/tmp/matching-checkpoint.json.gz")
+
+# Set MATCHING_CERTIFY=1 to match on all pairs instead of only each person's top-50 neighbors.
+# The top-50 solve is extended with whatever excluded pairs could still improve it, so the result is
+# provably optimal for the full similarity graph; costs a full n^2 similarity scan per round.
+CERTIFY_MATCHING = os.environ.get("MATCHING_CERTIFY") == "1"
+
+# Neighbours are ranked locally from the vectors build() already downloaded, instead of one Pinecone
+# query per person. Set MATCHING_PINECONE_KNN=1 to go back to the queries.
+LOCAL_KNN = os.environ.get("MATCHING_PINECONE_KNN") != "1"
+
+# Memory the local ranking may hold: the float32 unit rows, the top-k results and the similarity block together.
+# Half of deploy.sh's 512MB, leaving the rest for the edge arrays and the solver
+KNN_MEMORY_LIMIT = 256 * 2**20
+
+# Set MATCHING_STATS=1 to log per-stage solver counters. Off by default: collecting them makes the
+# solve roughly 15% slower, which comes out of the deadline.
+COLLECT_SOLVER_STATS = os.environ.get("MATCHING_STATS") == "1"
+
+# Pinecone queries kept in flight at once when ranking remotely
+KNN_QUERY_CONCURRENCY = 16
+
 def perform_matchmaking(logger: Logger):
+	deadline = time.monotonic() + FUNCTION_TIMEOUT_SECONDS - PERSIST_RESERVE_SECONDS
 	graph = PineconeGraph(INDEX_NAME)
-	graph.build()
+	# The vectors' values are only needed to rank neighbours or similarities locally; both read the one float32 matrix build() keeps
+	graph.build(include_values=LOCAL_KNN or CERTIFY_MATCHING)
 	coda = CodaClient()
 
 	existing = graph.load_pairs()
-	edges = graph.edges(forbidden_pairs=existing)
-	final_pairs_idx = optimal_matching(edges)
+	capacity = graph.load_capacities()
+	stats = SolverStats() if COLLECT_SOLVER_STATS else None
+	if CERTIFY_MATCHING:
+		if capacity:
+			logger.warning(f"certified matching gives everyone one match; ignoring the wishes of {len(capacity)} people for more")
+		edges = graph.edges(forbidden_pairs=existing, local=LOCAL_KNN, memory_limit=KNN_MEMORY_LIMIT, max_in_flight=KNN_QUERY_CONCURRENCY)
+		final_pairs_idx = certified_matching(graph.vector_matrix(), edges, graph.forbidden_index_pairs(existing), deadline=deadline, stats=stats, weight_resolution=WEIGHT_RESOLUTION, normalized=True)
+	else:
+		# Quantize and shift the weights while the edges stream in, so the edge list is never held as tuples
+		edges = ingest_edges(graph.iter_edges(forbidden_pairs=existing, local=LOCAL_KNN, memory_limit=KNN_MEMORY_LIMIT, max_in_flight=KNN_QUERY_CONCURRENCY), resolution=WEIGHT_RESOLUTION, maximum_cardinality=True)
+		final_pairs_idx = optimal_matching(edges, deadline=deadline, checkpoint_path=CHECKPOINT_PATH, stats=stats, capacity=capacity, vertex_ids=graph.index_to_id)
+	if not LOCAL_KNN:
+		logger.info(f"pinecone kNN query latency (s): {graph.query_latency_summary()}")
+	if stats is not None:
+		_log_solver_stats(logger, stats)
 
 	# map index pairs to external ids
 	final_pairs_ids = [(graph.index_to_id[a], graph.index_to_id[b]) for a, b in final_pairs_idx]
@@ -28,3 +79,13 @@ def perform_matchmaking(logger: Logger):
 		coda_rows = coda.add_pairs(new_pairs_ids)
 		pinecone_vectors = graph.add_pairs(new_pairs_ids)
 		logger.info(f"persisted {coda_rows} pairs to Coda; updated {pinecone_vectors} vectors in Pinecone")
+
+
+def _log_solver_stats(logger: Logger, stats: SolverStats):
+	# Enough to tell why one week's graph takes much longer than another's
+	if not stats.stages:
+		return
+	totals = stats.totals()
+	slowest = max(stats.stages, key=lambda stage: stage.seconds)
+	logger.info(f"matching took {len(stats.stages)} stages: {totals}")
+	logger.info(f"slowest stage: {slowest}")
@@ -1,7 +1,143 @@
-from typing import Sequence
-from .mwmatching import maximum_weight_matching, adjust_weights_for_maximum_cardinality_matching
+import logging
+import os
+from typing import AbstractSet, Literal, Mapping, Optional, Sequence, Union
+import numpy
+from .mwmatching import solve_maximum_weight_matching_by_component, adjust_weights_for_maximum_cardinality_matching, quantize_weights, build_graph, presolve, greedy_matching, path_growing_matching, improve_matching, graph_fingerprint, save_checkpoint, load_checkpoint, remap_state, SolverStats, solve_with_edge_generation, find_violated_edges, solve_maximum_weight_b_matching, adjust_weights_for_maximum_cardinality_b_matching
+from .mwmatching.numpy_input import EdgeArrays
+from .knn import unit_rows
 
-def optimal_matching(edges: Sequence[tuple[int, int, float]]) -> list[tuple[int, int]]:
+# "exact" finds the optimum; "greedy" and "path_growing" guarantee at least
+# half the optimal weight in near-linear time, for very large pools
+MatchingMode = Literal["exact", "greedy", "path_growing"]
+
+logger = logging.getLogger(__name__)
+
+def optimal_matching(edges: Union[Sequence[tuple[int, int, float]], EdgeArrays], max_workers: Optional[int] = None, mode: MatchingMode = "exact", refine_seconds: float = 0, deadline: Optional[float] = None, checkpoint_path: Optional[str] = None, stats: Optional[SolverStats] = None, weight_resolution: Optional[float] = None, capacity: Optional[Mapping[int, int]] = None, vertex_ids: Optional[Sequence[str]] = None) -> list[tuple[int, int]]:
+	# deadline is a time.monotonic() value; past it, the exact solver stops between stages
+	# and returns its valid but possibly suboptimal matching so far
+	# checkpoint_path keeps the state of such a stopped solve, so the next run on the same graph resumes it.
+	# vertex_ids (e.g. Pinecone ids by index) are saved with it, so a run that lists the vertices in another
+	# order, or whose graph changed since, still warm-starts from it; without them only the identical graph resumes
+	# stats collects per-stage counters of the exact solver
+	# weight_resolution rounds the weights to integer multiples of it, so the solver runs in exact
+	# integer arithmetic and verifies its optimum; this costs at most n * weight_resolution / 2 of weight
+	# capacity maps a vertex to how many matches it wants (default 1); nobody is paired with the same
+	# person twice. Only the exact mode supports it
+	if weight_resolution is not None:
+		edges = quantize_weights(edges, weight_resolution)
+	if capacity:
+		if mode != "exact":
+			raise ValueError(f"Matching mode {mode!r} does not support capacities")
+		# Gadgets are only built for the pairs the duals need; the checkpoint does not apply here
+		result = solve_maximum_weight_b_matching(adjust_weights_for_maximum_cardinality_b_matching(edges, capacity), capacity, max_workers=max_workers, deadline=deadline, stats=stats)
+		if not result.optimal:
+			logger.warning(f"b-matching stopped at the deadline; {len(result.pairs)} pairs, not proven optimal")
+		return result.pairs
 	# Prefer maximum-cardinality, then maximum-weight among those
 	adjusted = adjust_weights_for_maximum_cardinality_matching(edges)
-	return maximum_weight_matching(adjusted)
+	if mode == "greedy":
+		return _refine(adjusted, greedy_matching(adjusted), refine_seconds)
+	if mode == "path_growing":
+		return _refine(adjusted, path_growing_matching(adjusted), refine_seconds)
+	if mode != "exact":
+		raise ValueError(f"Unknown matching mode {mode!r}")
+	return _solve_exact(adjusted, max_workers, deadline, checkpoint_path, stats, vertex_ids)
+
+def _solve_exact(edges, max_workers: Optional[int], deadline: Optional[float], checkpoint_path: Optional[str], stats: Optional[SolverStats], vertex_ids: Optional[Sequence[str]]) -> list[tuple[int, int]]:
+	# Build the graph once; presolve, the fingerprint and the component split all reuse it.
+	# Fold away the low-degree fringe of the kNN graph before the exact solver sees it
+	reduction = presolve(build_graph(edges))
+	reduced = reduction.edges
+	fingerprint = graph_fingerprint(reduced) if checkpoint_path else ""
+	warm_start = _load_checkpoint(checkpoint_path, fingerprint, vertex_ids) if checkpoint_path else None
+	# kNN graphs tend to fall apart into many components; solve them separately.
+	# Without a warm start, begin from the obvious pairs (mutual best matches) instead of an empty matching
+	result = solve_maximum_weight_matching_by_component(reduced, max_workers=max_workers, warm_start=warm_start, deadline=deadline, stats=stats, jump_start=True)
+	if not result.optimal:
+		logger.warning(f"matching stopped at the deadline; {len(result.pairs)} pairs, not proven optimal")
+	if checkpoint_path:
+		if not result.optimal:
+			save_checkpoint(checkpoint_path, result.state, fingerprint, _state_ids(vertex_ids, len(result.state.vertex_mate)))
+		elif os.path.exists(checkpoint_path):
+			os.remove(checkpoint_path)
+	return reduction.restore(result.pairs)
+
+def certified_matching(vectors, edges: Sequence[tuple[int, int, float]], forbidden_pairs: AbstractSet[tuple[int, int]] = frozenset(), max_workers: Optional[int] = None, weight_resolution: float = 1e-6, deadline: Optional[float] = None, stats: Optional[SolverStats] = None, block_size: int = 1024, max_added_per_vertex: Optional[int] = 5, normalized: bool = False) -> list[tuple[int, int]]:
+	# Optimal matching on the full cosine-similarity graph of the vectors, where edges (e.g. the top-k
+	# neighbors from Pinecone) are only the starting candidates and their scores are recomputed.
+	# The candidates are solved first; then every excluded pair whose similarity beats the duals is added
+	# and the solve continues warm, until the duals prove the matching optimal for all pairs.
+	# forbidden_pairs (index pairs, lo < hi) are never matched. Each round scans all n^2 similarities.
+	# The sparse duals leave far more pairs violated than the optimum needs, so each round only adds
+	# the max_added_per_vertex most violated pairs of each person.
+	# normalized=True takes vectors as float32 unit rows (e.g. PineconeGraph.vector_matrix()) without copying them.
+	unit = vectors if normalized else unit_rows(vectors)
+	num_vertex = len(unit)
+	# Same weights as optimal_matching (quantize, then shift for maximum cardinality), but the shift
+	# covers the whole cosine range [-1, 1] so it stays valid for every pair that may be added
+	scale = round(1 / weight_resolution)
+	delta = (2 * num_vertex + 1) * scale
+	forbidden = numpy.array(sorted(forbidden_pairs), dtype=numpy.int64).reshape(-1, 2)
+	forbidden = numpy.concatenate([forbidden, forbidden[:, ::-1]])
+
+	def quantize(similarity):
+		return numpy.rint(similarity / weight_resolution).astype(numpy.int64) + delta
+
+	def weight_rows(start: int, end: int):
+		weights = quantize(unit[start:end] @ unit.T)
+		rows = numpy.arange(end - start)
+		weights[rows, rows + start] = -1
+		inside = (forbidden[:, 0] >= start) & (forbidden[:, 0] < end)
+		weights[forbidden[inside, 0] - start, forbidden[inside, 1]] = -1
+		return weights
+
+	candidates = [(x, y) for (x, y, _w) in edges if x != y and (min(x, y), max(x, y)) not in forbidden_pairs]
+	if candidates:
+		cx, cy = numpy.array(candidates).T
+		weights = quantize(numpy.einsum("ij,ij->i", unit[cx], unit[cy])).tolist()
+	else:
+		weights = []
+	candidate_edges = [(x, y, w) for ((x, y), w) in zip(candidates, weights)]
+
+	result = solve_with_edge_generation(
+		candidate_edges,
+		lambda state: find_violated_edges(state, num_vertex, weight_rows, block_size=block_size, max_per_vertex=max_added_per_vertex),
+		max_workers=max_workers, deadline=deadline, stats=stats)
+	logger.info(f"certified matching took {result.num_rounds} rounds, added {result.num_added_edges} of the excluded pairs")
+	if not result.optimal:
+		logger.warning(f"certified matching stopped at the deadline; {len(result.pairs)} pairs, not proven optimal")
+	return result.pairs
+
+def _load_checkpoint(path: str, fingerprint: str, vertex_ids: Optional[Sequence[str]]):
+	try:
+		checkpoint = load_checkpoint(path)
+	except FileNotFoundError:
+		return None
+	except (OSError, ValueError) as e:
+		logger.warning(f"ignoring unreadable matching checkpoint {path}: {e}")
+		return None
+	if checkpoint.fingerprint == fingerprint:
+		logger.info(f"resuming matching from checkpoint {path}")
+		return checkpoint.state
+	# Vertex indices only line up with the checkpoint when the graph is unchanged; with ids on both
+	# sides, the state follows each person to their new index and the warm start repairs the rest
+	if checkpoint.vertex_ids is None or vertex_ids is None:
+		logger.info("graph changed since the matching checkpoint; starting over")
+		return None
+	logger.info(f"graph changed since the matching checkpoint {path}; warm-starting from it by vertex id")
+	return remap_state(checkpoint.state, checkpoint.vertex_ids, vertex_ids)
+
+def _state_ids(vertex_ids: Optional[Sequence[str]], num_vertex: int) -> Optional[list[str]]:
+	# The solver's state covers vertices up to the largest edge endpoint; people without edges
+	# past that are not in it
+	if vertex_ids is None:
+		return None
+	return list(vertex_ids[:num_vertex])
+
+def _refine(edges, pairs: list[tuple[int, int]], refine_seconds: float) -> list[tuple[int, int]]:
+	# Local search closes most of the gap left by the approximate modes
+	if refine_seconds <= 0:
+		return pairs
+	result = improve_matching(edges, pairs, time_budget=refine_seconds)
+	logger.info(f"local search improved matching weight by {result.improvement} ({result.num_moves} moves, converged={result.converged})")
+	return result.pairs
@@ -3,9 +3,58 @@ Algorithm for finding a maximum weight matching in general graphs.
 """
 
 __all__ = ["maximum_weight_matching",
+           "solve_maximum_weight_matching",
            "adjust_weights_for_maximum_cardinality_matching",
-           "MatchingError"]
+           "quantize_weights",
+           "build_graph",
+           "MatchingState",
+           "MatchingResult",
+           "MatchingError",
+           "maximum_weight_matching_by_component",
+           "solve_maximum_weight_matching_by_component",
+           "greedy_matching",
+           "path_growing_matching",
+           "improve_matching",
+           "RefinementResult",
+           "Checkpoint",
+           "graph_fingerprint",
+           "save_checkpoint",
+           "load_checkpoint",
+           "remap_state",
+           "SolverStats",
+           "StageStats",
+           "presolve",
+           "Presolve",
+           "solve_with_edge_generation",
+           "find_violated_edges",
+           "EdgeGenerationResult",
+           "maximum_weight_b_matching",
+           "solve_maximum_weight_b_matching",
+           "reduce_b_matching",
+           "adjust_weights_for_maximum_cardinality_b_matching",
+           "BMatchingReduction",
+           "ingest_edges"]
 
 from .algorithm import (maximum_weight_matching,
+                        solve_maximum_weight_matching,
                         adjust_weights_for_maximum_cardinality_matching,
-                        MatchingError)
\ No newline at end of file
+                        quantize_weights,
+                        build_graph,
+                        MatchingState,
+                        MatchingResult,
+                        MatchingError)
+from .components import (maximum_weight_matching_by_component,
+                         solve_maximum_weight_matching_by_component)
+from .approx import greedy_matching, path_growing_matching
+from .local_search import improve_matching, RefinementResult
+from .checkpoint import (Checkpoint, graph_fingerprint, save_checkpoint,
+                         load_checkpoint, remap_state)
+from .stats import SolverStats, StageStats
+from .presolve import presolve, Presolve
+from .generation import (solve_with_edge_generation, find_violated_edges,
+                         EdgeGenerationResult)
+from .bmatching import (maximum_weight_b_matching,
+                        solve_maximum_weight_b_matching, reduce_b_matching,
+                        adjust_weights_for_maximum_cardinality_b_matching,
+                        BMatchingReduction)
+from .ingest import ingest_edges
@@ -4,17 +4,27 @@ Algorithm for finding a maximum weight matching in general graphs.
 
 from __future__ import annotations
 
+import bisect
 import sys
 import itertools
 import math
+import time
+from array import array
 from collections.abc import Sequence
-from typing import NamedTuple, Optional
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
 
-from .datastruct import ConcatenableQueue, PriorityQueue
+from .datastruct import (ConcatenableQueue, IndexedPriorityQueue,
+                         PriorityQueue, RadixPriorityQueue)
+from .warmstart import (_blossom_depth, greedy_start_state, is_exact_resume,
+                        prepare_warm_start)
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+    from .stats import SolverStats
 
 
 def maximum_weight_matching(
-        edges: Sequence[tuple[int, int, float]]
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays]
         ) -> list[tuple[int, int]]:
     """Compute a maximum-weighted matching in the general undirected weighted
     graph given by "edges".
@@ -34,13 +44,22 @@ def maximum_weight_matching(
     no effect on the maximum-weight matching.
     Edges with negative weight are ignored.
 
+    Alternatively, the graph may be specified as a tuple "(u, v, w)" of
+    three NumPy arrays, where "u" and "v" are integer arrays of vertex indices
+    and "w" is an array of edge weights. Such input is validated with
+    vectorized operations, without creating a Python tuple per edge.
+
     This function takes time O(n * (n + m) * log(n)),
     where "n" is the number of vertices and "m" is the number of edges.
     This function uses O(n + m) memory.
 
+    See "solve_maximum_weight_matching()" for a variant that also returns
+    the dual solution and can be warm-started from a previous solution.
+
     Parameters:
         edges: List of edges, each edge specified as a tuple "(x, y, w)"
-            where "x" and "y" are vertex indices and "w" is the edge weight.
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
 
     Returns:
         List of pairs of matched vertex indices.
@@ -53,24 +72,109 @@ def maximum_weight_matching(
         MatchingError: If the matching algorithm fails.
             This can only happen if there is a bug in the algorithm.
     """
+    return solve_maximum_weight_matching(edges).pairs
+
+
+def solve_maximum_weight_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays, GraphInfo],
+        *,
+        warm_start: Optional[MatchingState] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[SolverStats] = None,
+        verify_sample: Optional[int] = None,
+        jump_start: bool = False
+        ) -> MatchingResult:
+    """Compute a maximum-weighted matching, optionally starting from the
+    solution of a previous, similar problem.
+
+    The graph is specified as for "maximum_weight_matching()", or as
+    a graph built by "build_graph()".
+
+    If "warm_start" is specified, the algorithm starts from the matching
+    and dual variables in that state instead of from an empty matching.
+    The state is typically the "state" of an earlier result on a graph
+    that differs only slightly from the current graph.
+    Blossom duals from the previous solution are folded into the vertex
+    duals, so the algorithm starts without non-trivial blossoms.
+    Matched edges that no longer exist or are no longer tight are released,
+    and edges that violate the dual constraints are repaired by raising
+    vertex duals. The algorithm then only needs to run stages for the
+    unmatched vertices that have non-zero dual, which is roughly
+    proportional to the number of vertices affected by the changes.
+
+    Vertices in the state that do not exist in the current graph are
+    ignored. Vertices in the graph that do not exist in the state start
+    unmatched.
+
+    The result is always a maximum-weight matching of the current graph,
+    regardless of the quality of the warm start.
+
+    If "jump_start" is True and no "warm_start" is specified, the algorithm
+    starts from a greedy matching of tight edges with a feasible dual
+    solution (see "greedy_start_state()"). This is cheap to compute and
+    often matches most vertices, which saves most of the stages of a cold
+    start.
+
+    If "deadline" is specified, the algorithm checks the time between stages
+    and stops when the deadline has passed. It then returns the matching
+    found so far, which is valid but not necessarily of maximum weight,
+    and sets "optimal" to False in the result. The state of such a result
+    includes the blossoms, so a later solve of the same graph with this
+    state as "warm_start" continues where this one stopped: the matching,
+    duals and blossoms are kept, and only the alternating trees of the
+    interrupted search are built again. Every stage that such a resumed
+    solve completes makes progress, so repeated solves with a deadline
+    eventually finish. (A warm start on a changed graph folds the blossoms
+    as described above, and may redo earlier stages.)
+    Since a single stage is not interrupted, the function may return up to
+    one stage later than the deadline.
+
+    If "stats" is specified, the algorithm collects counters for each stage
+    in that object (see "SolverStats"). This makes the algorithm slower.
+
+    With integer weights, the result is verified against the optimality
+    conditions before it is returned (see "verify_optimum()"). For very
+    large graphs, "verify_sample" limits the slack check to a random sample
+    of that many edges plus the matched edges.
 
-    # Check that the input meets all constraints.
-    _check_input_types(edges)
-    _check_input_graph(edges)
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)";
+            or a graph built by "build_graph()".
+        warm_start: Optional state of a previous solution.
+        deadline: Optional time limit, as a value of "time.monotonic()".
+        stats: Optional object to collect statistics.
+        verify_sample: Optional number of edges to verify.
+        jump_start: True to start from a greedy matching.
 
-    # Remove edges with negative weight.
-    edges = _remove_negative_weight_edges(edges)
+    Returns:
+        MatchingResult containing the list of matched pairs and the final
+        primal and dual state.
 
-    # Special case for empty graphs.
-    if not edges:
-        return []
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+
+    # Check the input and initialize graph representation.
+    graph = _make_graph(edges)
 
-    # Initialize graph representation.
-    graph = GraphInfo(edges)
+    # Special case for empty graphs.
+    if graph.num_edge == 0:
+        return MatchingResult(pairs=[], state=MatchingState.empty(
+            graph.num_vertex))
 
     # Initialize the matching algorithm.
-    ctx = MatchingContext(graph)
-    ctx.start()
+    ctx = MatchingContext(graph, stats)
+    if (warm_start is None) and jump_start:
+        warm_start = greedy_start_state(graph)
+    if warm_start is None:
+        ctx.start()
+    else:
+        ctx.start_from_state(warm_start)
 
     # Improve the solution until no further improvement is possible.
     #
@@ -79,27 +183,46 @@ def maximum_weight_matching(
     #
     # This loop runs through at most (n/2 + 1) iterations.
     # Each iteration takes time O((n + m) * log(n)).
-    while ctx.run_stage():
-        pass
+    #
+    # Every stage leaves a valid matching and dual solution, so the loop
+    # can stop between stages when the deadline has passed.
+    optimal = True
+    while True:
+        if (deadline is not None) and (time.monotonic() >= deadline):
+            # Vertices that were labeled S but not yet scanned are dropped
+            # together with their alternating trees.
+            ctx.scan_queue.clear()
+            optimal = False
+            break
+        if stats is not None:
+            stats.start_stage()
+        augmented = ctx.run_stage()
+        if stats is not None:
+            stats.end_stage(augmented)
+        if not augmented:
+            break
 
     # Extract the final solution.
     ctx.cleanup()
     pairs: list[tuple[int, int]] = [
-        (x, y) for (x, y, _w) in edges if ctx.vertex_mate[x] == y]
+        (x, y) for (x, y) in zip(graph.edge_x, graph.edge_y)
+        if ctx.vertex_mate[x] == y]
 
     # Verify that the matching is optimal.
     # This is just a safeguard; the verification will always pass unless
     # there is a bug in the matching algorithm.
     # Verification only works reliably for integer weights.
-    if graph.integer_weights:
-        verify_optimum(ctx)
+    if optimal and graph.integer_weights:
+        verify_optimum(ctx, verify_sample)
 
-    return pairs
+    return MatchingResult(pairs=pairs,
+                          state=ctx.export_state(),
+                          optimal=optimal)
 
 
 def adjust_weights_for_maximum_cardinality_matching(
-        edges: Sequence[tuple[int, int, float]]
-        ) -> Sequence[tuple[int, int, float]]:
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays]
+        ) -> Union[Sequence[tuple[int, int, float]], EdgeArrays]:
     """Adjust edge weights such that the maximum-weight matching of
     the adjusted graph is a maximum-cardinality matching, equal to
     a matching in the original graph that has maximum weight out of all
@@ -135,17 +258,24 @@ def adjust_weights_for_maximum_cardinality_matching(
 
     Parameters:
         edges: List of edges, each edge specified as a tuple "(x, y, w)"
-            where "x" and "y" are vertex indices and "w" is the edge weight.
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
 
     Returns:
-        List of edges with adjusted weights. If no adjustments are necessary,
-        the input list instance may be returned.
+        List of edges with adjusted weights, or a tuple of NumPy arrays if
+        the input was given as arrays. If no adjustments are necessary,
+        the input instance may be returned.
 
     Raises:
         ValueError: If the input does not satisfy the constraints.
         TypeError: If the input contains invalid data types.
     """
 
+    if _is_edge_arrays(edges):
+        from .numpy_input import (
+            adjust_edge_arrays_for_maximum_cardinality_matching)
+        return adjust_edge_arrays_for_maximum_cardinality_matching(edges)
+
     _check_input_types(edges)
 
     # Don't worry about empty graphs:
@@ -156,12 +286,36 @@ def adjust_weights_for_maximum_cardinality_matching(
 
     min_weight = min(w for (_x, _y, w) in edges)
     max_weight = max(w for (_x, _y, w) in edges)
-    weight_range = max_weight - min_weight
+
+    delta = _maximum_cardinality_delta(num_vertex, min_weight, max_weight)
 
     # Do nothing if the weights already ensure a maximum-cardinality matching.
-    if min_weight > 0 and min_weight >= num_vertex * weight_range:
+    if delta is None:
         return edges
 
+    # Increase all edge weights by "delta".
+    return [(x, y, w + delta) for (x, y, w) in edges]
+
+
+def _maximum_cardinality_delta(
+        num_vertex: int,
+        min_weight: float,
+        max_weight: float
+        ) -> Optional[float]:
+    """Return the amount by which all edge weights must be increased to
+    ensure a maximum-cardinality matching, or None if the weights
+    already ensure it.
+
+    See "adjust_weights_for_maximum_cardinality_matching()". For
+    a b-matching, "num_vertex" is the total capacity of all vertices,
+    which bounds twice the number of matched edges in the same way.
+    """
+
+    weight_range = max_weight - min_weight
+
+    if min_weight > 0 and min_weight >= num_vertex * weight_range:
+        return None
+
     delta: float
     if weight_range > 0:
         # Increase weights to make minimum edge weight large enough
@@ -172,9 +326,54 @@ def adjust_weights_for_maximum_cardinality_matching(
         delta = 1 - min_weight
 
     assert delta >= 0
+    return delta
 
-    # Increase all edge weights by "delta".
-    return [(x, y, w + delta) for (x, y, w) in edges]
+
+def quantize_weights(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        resolution: float
+        ) -> Union[Sequence[tuple[int, int, float]], EdgeArrays]:
+    """Round edge weights to integer multiples of "resolution".
+
+    Each weight "w" is replaced by the integer "round(w / resolution)".
+    With integer weights, the matching algorithm uses exact arithmetic
+    and verifies that its result is optimal. This is not possible with
+    floating point weights.
+
+    Rounding changes each weight by at most "resolution / 2". A matching
+    that is optimal for the quantized weights therefore has a weight that is
+    at most "n * resolution / 2" below the optimum for the original weights.
+    Quantization should be applied before
+    "adjust_weights_for_maximum_cardinality_matching()", so that
+    the adjustment is also done in integer arithmetic.
+
+    This function takes time O(m), where "m" is the number of edges.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        resolution: Positive weight difference that maps to 1.
+
+    Returns:
+        List of edges with integer weights, or a tuple of NumPy arrays
+        with 64-bit integer weights if the input was given as arrays.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints,
+            or if "resolution" is not a positive finite number.
+        TypeError: If the input contains invalid data types.
+    """
+
+    if not (math.isfinite(resolution) and (resolution > 0)):
+        raise ValueError("Quantization resolution must be a positive number")
+
+    if _is_edge_arrays(edges):
+        from .numpy_input import quantize_edge_arrays
+        return quantize_edge_arrays(edges, resolution)
+
+    _check_input_types(edges)
+    return [(x, y, round(w / resolution)) for (x, y, w) in edges]
 
 
 class MatchingError(Exception):
@@ -185,6 +384,160 @@ class MatchingError(Exception):
     pass
 
 
+class MatchingState(NamedTuple):
+    """Primal and dual solution of a matching problem.
+
+    A state is returned as part of every "MatchingResult" and may be passed
+    back to "solve_maximum_weight_matching()" to warm-start a later solve.
+
+    Non-trivial blossoms are numbered 0 .. k-1.
+    "vertex_blossom[x]" is the smallest non-trivial blossom that contains
+    vertex "x", or -1 if "x" is not contained in any non-trivial blossom.
+    "blossom_parent[b]" is the blossom that contains blossom "b" as
+    a sub-blossom, or -1 if "b" is a top-level blossom.
+    "blossom_dual[b]" is the dual variable of blossom "b".
+    "blossom_edges[b]" lists the edges "(x, y)" that link the sub-blossoms
+    of blossom "b" into an alternating cycle, starting at the sub-blossom
+    that contains the base vertex. The sub-blossoms themselves follow from
+    "vertex_blossom" and "blossom_parent": edge "i" runs from sub-blossom
+    "i" to sub-blossom "i + 1". If "blossom_edges" is None, the blossoms
+    can not be rebuilt and a warm start folds their duals into the vertex
+    duals instead.
+    """
+    vertex_mate: list[int]
+    vertex_dual_2x: list[float]
+    vertex_blossom: list[int]
+    blossom_parent: list[int]
+    blossom_dual: list[float]
+    blossom_edges: Optional[list[list[tuple[int, int]]]] = None
+
+    @classmethod
+    def empty(cls, num_vertex: int) -> MatchingState:
+        """Return the state of an empty matching without dual solution."""
+        return cls(vertex_mate=num_vertex * [-1],
+                   vertex_dual_2x=num_vertex * [0],
+                   vertex_blossom=num_vertex * [-1],
+                   blossom_parent=[],
+                   blossom_dual=[],
+                   blossom_edges=[])
+
+    def blossom_dual_sum(self, x: int, y: int) -> float:
+        """Return the sum of the duals of all blossoms that contain both
+        vertex "x" and vertex "y".
+
+        This function takes time proportional to the nesting depth of
+        the blossoms that contain "x" and "y".
+        """
+        ancestors: set[int] = set()
+        b = self.vertex_blossom[x]
+        while b != -1:
+            ancestors.add(b)
+            b = self.blossom_parent[b]
+        b = self.vertex_blossom[y]
+        while (b != -1) and (b not in ancestors):
+            b = self.blossom_parent[b]
+        total: float = 0
+        while b != -1:
+            total += self.blossom_dual[b]
+            b = self.blossom_parent[b]
+        return total
+
+    def edge_slack_2x(self, x: int, y: int, w: float) -> float:
+        """Return 2 times the slack of an edge "(x, y)" with weight "w"
+        under the dual solution in this state.
+
+        This is the same slack that "verify_optimum()" computes.
+        A negative slack means that adding the edge to the graph could
+        improve the matching.
+        """
+        return (self.vertex_dual_2x[x] + self.vertex_dual_2x[y] - 2 * w
+                + 2 * self.blossom_dual_sum(x, y))
+
+
+class MatchingResult(NamedTuple):
+    """Result of "solve_maximum_weight_matching()"."""
+
+    # List of pairs of matched vertex indices.
+    pairs: list[tuple[int, int]]
+
+    # Final primal and dual solution.
+    state: MatchingState
+
+    # True if the matching is a maximum-weight matching,
+    # False if the algorithm stopped early because of a deadline.
+    optimal: bool = True
+
+
+def _is_edge_arrays(edges: object) -> bool:
+    """Return True if "edges" is a tuple of NumPy edge arrays.
+
+    This check does not import NumPy unless it is already loaded.
+    """
+    if isinstance(edges, tuple) and ("numpy" in sys.modules):
+        from .numpy_input import is_edge_arrays
+        return is_edge_arrays(edges)
+    return False
+
+
+def build_graph(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays]
+        ) -> GraphInfo:
+    """Check the input and build the graph representation.
+
+    "solve_maximum_weight_matching()",
+    "solve_maximum_weight_matching_by_component()", "presolve()" and
+    "graph_fingerprint()" accept the result in place of the list of edges.
+    A graph that is passed to several of them is then checked and built
+    only once. Edges with negative weight are removed.
+
+    Edge arrays returned by "ingest_edges()" are used without copying.
+
+    This function takes time O(n + m * log(m)).
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+
+    Returns:
+        Graph representation.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+    return _make_graph(edges)
+
+
+def _make_graph(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays, GraphInfo]
+        ) -> GraphInfo:
+    """Check that the input meets all constraints, remove edges with
+    negative weight, and initialize the graph representation.
+
+    A graph built by "build_graph()" is returned as it is.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    if isinstance(edges, GraphInfo):
+        return edges
+
+    if _is_edge_arrays(edges):
+        from .numpy_input import (check_edge_arrays,
+                                  graph_from_edge_arrays,
+                                  remove_negative_weight_edge_arrays)
+        check_edge_arrays(edges)
+        return graph_from_edge_arrays(
+            remove_negative_weight_edge_arrays(edges))
+
+    _check_input_types(edges)
+    _check_input_graph(edges)
+    return GraphInfo(_remove_negative_weight_edges(edges))
+
+
 def _check_input_types(edges: Sequence[tuple[int, int, float]]) -> None:
     """Check that the input consists of valid data types and valid
     numerical ranges.
@@ -206,30 +559,41 @@ def _check_input_types(edges: Sequence[tuple[int, int, float]]) -> None:
         raise TypeError('"edges" must be a list')
 
     for e in edges:
-        if (not isinstance(e, tuple)) or (len(e) != 3):
-            raise TypeError("Each edge must be specified as a 3-tuple")
+        _check_edge_types(e, float_limit)
 
-        (x, y, w) = e
 
-        if (not isinstance(x, int)) or (not isinstance(y, int)):
-            raise TypeError("Edge endpoints must be integers")
+def _check_edge_types(e: tuple[int, int, float], float_limit: float) -> None:
+    """Check the data types and numerical ranges of a single edge.
 
-        if (x < 0) or (y < 0):
-            raise ValueError("Edge endpoints must be non-negative integers")
+    Raises:
+        ValueError: If the edge does not satisfy the constraints.
+        TypeError: If the edge contains invalid data types.
+    """
 
-        if not isinstance(w, (int, float)):
-            raise TypeError(
-                "Edge weights must be integers or floating point numbers")
+    if (not isinstance(e, tuple)) or (len(e) != 3):
+        raise TypeError("Each edge must be specified as a 3-tuple")
 
-        if isinstance(w, float):
-            if not math.isfinite(w):
-                raise ValueError("Edge weights must be finite numbers")
+    (x, y, w) = e
 
-            # Check that this edge weight will not cause our dual variable
-            # calculations to exceed the valid floating point range.
-            if w > float_limit:
-                raise ValueError("Floating point edge weights must be"
-                                 f" less than {float_limit:g}")
+    if (not isinstance(x, int)) or (not isinstance(y, int)):
+        raise TypeError("Edge endpoints must be integers")
+
+    if (x < 0) or (y < 0):
+        raise ValueError("Edge endpoints must be non-negative integers")
+
+    if not isinstance(w, (int, float)):
+        raise TypeError(
+            "Edge weights must be integers or floating point numbers")
+
+    if isinstance(w, float):
+        if not math.isfinite(w):
+            raise ValueError("Edge weights must be finite numbers")
+
+        # Check that this edge weight will not cause our dual variable
+        # calculations to exceed the valid floating point range.
+        if w > float_limit:
+            raise ValueError("Floating point edge weights must be"
+                             f" less than {float_limit:g}")
 
 
 def _check_input_graph(edges: Sequence[tuple[int, int, float]]) -> None:
@@ -281,6 +645,10 @@ class GraphInfo:
     """Representation of the input graph.
 
     These data remain unchanged while the algorithm runs.
+
+    Edges and adjacency lists are stored in compact typed arrays rather
+    than lists of Python tuples. This keeps the memory footprint close to
+    a few machine words per edge.
     """
 
     def __init__(self, edges: Sequence[tuple[int, int, float]]) -> None:
@@ -289,42 +657,151 @@ class GraphInfo:
         This function takes time O(n + m).
         """
 
+        # Determine whether _all_ weights are integers.
+        # In this case we can avoid floating point computations entirely.
+        integer_weights = all(isinstance(w, int) for (_x, _y, w) in edges)
+
+        # Vertex and edge indices are stored as 32-bit integers.
+        edge_x = array("i", (x for (x, _y, _w) in edges))
+        edge_y = array("i", (y for (_x, y, _w) in edges))
+        edge_w = _make_weight_array(edges, integer_weights)
+
+        if edges:
+            num_vertex = 1 + max(max(edge_x), max(edge_y))
+        else:
+            num_vertex = 0
+
+        self._init_arrays(edge_x, edge_y, edge_w, integer_weights, num_vertex)
+
+    @classmethod
+    def from_arrays(
+            cls,
+            edge_x: array[int],
+            edge_y: array[int],
+            edge_w: Sequence[float],
+            integer_weights: bool,
+            num_vertex: int,
+            adjacency: Optional[tuple[array[int], array[int]]] = None
+            ) -> GraphInfo:
+        """Initialize the graph representation from prepared edge arrays.
+
+        The arrays are used as-is, without copying or validation.
+        If "adjacency" is specified, it must contain the adjacency arrays
+        in the same format as built by "GraphInfo.__init__()".
+        """
+        graph = cls.__new__(cls)
+        graph._init_arrays(edge_x, edge_y, edge_w, integer_weights,
+                           num_vertex, adjacency)
+        return graph
+
+    def _init_arrays(
+            self,
+            edge_x: array[int],
+            edge_y: array[int],
+            edge_w: Sequence[float],
+            integer_weights: bool,
+            num_vertex: int,
+            adjacency: Optional[tuple[array[int], array[int]]] = None
+            ) -> None:
+        """Store the edge arrays and prepare the adjacency lists."""
+
         # Vertices are indexed by integers in range 0 .. n-1.
         # Edges are indexed by integers in range 0 .. m-1.
         #
         # Each edge is incident on two vertices.
         # Each edge also has a weight.
         #
-        # "edges[e] = (x, y, w)" where
-        #     "e" is an edge index;
-        #     "x" and "y" are vertex indices of the incident vertices;
-        #     "w" is the edge weight.
+        # "edge_x[e]" and "edge_y[e]" are the vertex indices of the
+        # vertices incident on edge "e";
+        # "edge_w[e]" is the weight of edge "e".
         #
         # These data remain unchanged while the algorithm runs.
-        self.edges: Sequence[tuple[int, int, float]] = edges
+        self.num_edge: int = len(edge_x)
+        self.edge_x: array[int] = edge_x
+        self.edge_y: array[int] = edge_y
+        self.edge_w: Sequence[float] = edge_w
+
+        # True if all edge weights are integers.
+        self.integer_weights: bool = integer_weights
 
         # num_vertex = the number of vertices.
-        if edges:
-            self.num_vertex = 1 + max(max(x, y) for (x, y, _w) in edges)
-        else:
-            self.num_vertex = 0
+        self.num_vertex: int = num_vertex
 
         # Each vertex is incident to zero or more edges.
         #
-        # "adjacent_edges[x]" is the list of edge indices of edges incident
-        # to the vertex with index "x".
+        # The adjacency lists are stored in compressed sparse row format:
+        # "adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]" are
+        # the edge indices of edges incident to the vertex with index "x".
         #
         # These data remain unchanged while the algorithm runs.
-        self.adjacent_edges: list[list[int]] = [
-            [] for v in range(self.num_vertex)]
-        for (e, (x, y, _w)) in enumerate(edges):
-            self.adjacent_edges[x].append(e)
-            self.adjacent_edges[y].append(e)
+        if adjacency is None:
+            adjacency = _make_adjacency_arrays(num_vertex, edge_x, edge_y)
+        (self.adjacent_offset, self.adjacent_edge) = adjacency
+
+    def incident_edges(self, x: int) -> array[int]:
+        """Return the edge indices of edges incident to vertex "x"."""
+        return self.adjacent_edge[
+            self.adjacent_offset[x]:self.adjacent_offset[x+1]]
+
+
+def _make_weight_array(
+        edges: Sequence[tuple[int, int, float]],
+        integer_weights: bool
+        ) -> Sequence[float]:
+    """Pack edge weights into a typed array.
+
+    Integer weights are stored as 64-bit integers if they fit.
+    Python integers of unlimited size are kept in a plain list so that
+    the algorithm retains exact arithmetic.
+    All other weights are stored as double precision floats.
+    """
+    if integer_weights:
+        try:
+            return array("q", (w for (_x, _y, w) in edges))
+        except OverflowError:
+            return [w for (_x, _y, w) in edges]
+    return array("d", (w for (_x, _y, w) in edges))
 
-        # Determine whether _all_ weights are integers.
-        # In this case we can avoid floating point computations entirely.
-        self.integer_weights: bool = all(isinstance(w, int)
-                                         for (_x, _y, w) in edges)
+
+def _make_adjacency_arrays(
+        num_vertex: int,
+        edge_x: array[int],
+        edge_y: array[int]
+        ) -> tuple[array[int], array[int]]:
+    """Build adjacency lists in compressed sparse row format.
+
+    This function takes time O(n + m).
+
+    Returns:
+        Tuple "(adjacent_offset, adjacent_edge)".
+    """
+
+    # Count the degree of each vertex.
+    degree = num_vertex * [0]
+    for x in edge_x:
+        degree[x] += 1
+    for y in edge_y:
+        degree[y] += 1
+
+    # Convert degrees to start offsets.
+    adjacent_offset = array("q", bytes(8 * (num_vertex + 1)))
+    pos = 0
+    for x in range(num_vertex):
+        adjacent_offset[x] = pos
+        pos += degree[x]
+    adjacent_offset[num_vertex] = pos
+
+    # Place each edge in the adjacency list of both its endpoints.
+    # Edges appear in increasing order of edge index within each list.
+    adjacent_edge = array("i", bytes(4 * pos))
+    fill = list(adjacent_offset[:num_vertex])
+    for (e, (x, y)) in enumerate(zip(edge_x, edge_y)):
+        adjacent_edge[fill[x]] = e
+        fill[x] += 1
+        adjacent_edge[fill[y]] = e
+        fill[y] += 1
+
+    return (adjacent_offset, adjacent_edge)
 
 
 # Each vertex may be labeled "S" (outer) or "T" (inner) or be unlabeled.
@@ -353,9 +830,23 @@ class Blossom:
     vertex in the same blossom. This is the "base vertex" of the blossom.
     """
 
+    __slots__ = ("parent", "base_vertex", "num_vertex", "label",
+                 "tree_edge", "tree_blossoms", "vertex_queue", "delta2_node",
+                 "vertex_dual_offset", "marker")
+
     def __init__(self, base_vertex: int) -> None:
         """Initialize a new blossom."""
 
+        # Each top-level blossom maintains a concatenable queue containing
+        # all vertices in the blossom.
+        self.vertex_queue: ConcatenableQueue[Blossom, int]
+        self.vertex_queue = ConcatenableQueue(self)
+
+        self._init_blossom(base_vertex)
+
+    def _init_blossom(self, base_vertex: int) -> None:
+        """Initialize the attributes of a new blossom, except its queue."""
+
         # If this is not a top-level blossom,
         # "parent" is the blossom in which this blossom is a sub-blossom.
         #
@@ -371,6 +862,9 @@ class Blossom:
         # vertex in the blossom.
         self.base_vertex: int = base_vertex
 
+        # "num_vertex" is the number of vertices in the blossom.
+        self.num_vertex: int = 1
+
         # A top-level blossom that is part of an alternating tree,
         # has label S or T. An unlabeled top-level blossom is not part
         # of any alternating tree.
@@ -391,11 +885,6 @@ class Blossom:
         # all top-level blossoms in the tree.
         self.tree_blossoms: Optional[set[Blossom]] = None
 
-        # Each top-level blossom maintains a concatenable queue containing
-        # all vertices in the blossom.
-        self.vertex_queue: ConcatenableQueue[Blossom, int]
-        self.vertex_queue = ConcatenableQueue(self)
-
         # If this is a top-level unlabeled blossom with an edge to an
         # S-blossom, "delta2_node" is the corresponding node in the delta2
         # queue.
@@ -432,8 +921,13 @@ class NonTrivialBlossom(Blossom):
     it only becomes a blossom through an explicit action of the algorithm.
     An existing blossom may change when the matching is augmented along
     a path that runs through the blossom.
+
+    Expanded blossom objects are kept in a pool and reused for new
+    blossoms, see "MatchingContext.make_blossom()".
     """
 
+    __slots__ = ("subblossoms", "edges", "dual_var", "delta4_node")
+
     def __init__(
             self,
             subblossoms: list[Blossom],
@@ -442,6 +936,28 @@ class NonTrivialBlossom(Blossom):
         """Initialize a new blossom."""
 
         super().__init__(subblossoms[0].base_vertex)
+        self._init_subblossoms(subblossoms, edges)
+
+    def reuse(
+            self,
+            subblossoms: list[Blossom],
+            edges: list[tuple[int, int]]
+            ) -> None:
+        """Reinitialize an expanded blossom as a new blossom.
+
+        The vertex queue, which is empty after expansion, is kept.
+        """
+
+        assert self.vertex_queue.tree is None
+        self._init_blossom(subblossoms[0].base_vertex)
+        self._init_subblossoms(subblossoms, edges)
+
+    def _init_subblossoms(
+            self,
+            subblossoms: list[Blossom],
+            edges: list[tuple[int, int]]
+            ) -> None:
+        """Initialize the attributes of a new non-trivial blossom."""
 
         # Sanity check.
         n = len(subblossoms)
@@ -464,6 +980,8 @@ class NonTrivialBlossom(Blossom):
         # adjacent to vertex "y" in "subblossoms[1]", etc.
         self.edges: list[tuple[int, int]] = edges
 
+        self.num_vertex = sum(sub.num_vertex for sub in subblossoms)
+
         # Every non-trivial blossom has a variable in the dual LPP.
         # New blossoms start with dual variable 0.
         #
@@ -521,8 +1039,16 @@ class MatchingContext:
     auxiliary data structures.
     """
 
-    def __init__(self, graph: GraphInfo) -> None:
-        """Set up the initial state of the matching algorithm."""
+    def __init__(
+            self,
+            graph: GraphInfo,
+            stats: Optional[SolverStats] = None
+            ) -> None:
+        """Set up the initial state of the matching algorithm.
+
+        If "stats" is specified, the algorithm counts its operations
+        in that object.
+        """
 
         num_vertex = graph.num_vertex
 
@@ -530,6 +1056,16 @@ class MatchingContext:
         # The graph does not change while the algorithm runs.
         self.graph = graph
 
+        # Optional collection of statistics.
+        self.stats = stats
+
+        # Priority queues count their operations if statistics are enabled.
+        new_queue = PriorityQueue if stats is None else stats.new_queue
+        self.new_queue = new_queue
+        new_indexed_queue = (IndexedPriorityQueue if stats is None
+                             else stats.new_indexed_queue)
+        self.new_indexed_queue = new_indexed_queue
+
         # Each vertex is either single (unmatched) or matched to
         # another vertex.
         #
@@ -556,6 +1092,11 @@ class MatchingContext:
         # Initially there are no non-trivial blossoms.
         self.nontrivial_blossom: set[NonTrivialBlossom] = set()
 
+        # Expanded blossom objects, to be reused for new blossoms.
+        # Reusing them avoids allocating a new blossom and vertex queue,
+        # which would become cyclic garbage when the blossom is expanded.
+        self.blossom_pool: list[NonTrivialBlossom] = []
+
         # "vertex_queue_node[x]" represents the vertex "x" inside the
         # concatenable queue of its top-level blossom.
         #
@@ -564,13 +1105,30 @@ class MatchingContext:
             b.vertex_queue.insert(i, math.inf)
             for (i, b) in enumerate(self.trivial_blossom)]
 
+        # "top_blossom[vertex_top_slot[x]]" is the top-level blossom that
+        # contains vertex "x".
+        #
+        # This is the same blossom that "vertex_queue_node[x].find()" returns,
+        # but found through two arrays to make the lookup O(1). All vertices
+        # of a top-level blossom share one slot in "top_blossom".
+        # When blossoms are merged or split, the largest part keeps its slot
+        # and only the vertices of the other parts are moved to another slot.
+        # This keeps the cost of updates to O(n * log(n)) per stage.
+        #
+        # Initially, each vertex belongs to its own trivial top-level blossom.
+        self.vertex_top_slot: list[int] = list(range(num_vertex))
+        self.top_blossom: list[Blossom] = list(self.trivial_blossom)
+
+        # Slots in "top_blossom" that are not used by any blossom.
+        self.free_top_slots: list[int] = []
+
         # All vertex duals are initialized to half the maximum edge weight.
         #
         # "start_vertex_dual_2x" is 2 times the initial vertex dual value.
         #
         # Pre-multiplication by 2 ensures that the values are integers
         # if all edge weights are integers.
-        self.start_vertex_dual_2x = max(w for (_x, _y, w) in graph.edges)
+        self.start_vertex_dual_2x = max(graph.edge_w)
 
         # Every vertex has a variable in the dual LPP.
         #
@@ -598,27 +1156,47 @@ class MatchingContext:
         # Queue containing unlabeled top-level blossoms that have an edge to
         # an S-blossom. The priority of a blossom is 2 times its least slack
         # to an S blossom, plus 2 times the running sum of delta steps.
-        self.delta2_queue: PriorityQueue[Blossom] = PriorityQueue()
+        self.delta2_queue: PriorityQueue[Blossom] = new_queue()
 
         # Queue containing edges between S-vertices in different top-level
         # blossoms. The priority of an edge is its slack plus 2 times the
         # running sum of delta steps.
-        self.delta3_queue: PriorityQueue[int] = PriorityQueue()
-        self.delta3_node: list[Optional[PriorityQueue.Node]]
-        self.delta3_node = [None for _e in graph.edges]
+        #
+        # Priorities are never less than 2 times the running sum of delta
+        # steps, which only increases. With integer weights, the priorities
+        # are integers and a radix heap can be used.
+        self.delta3_queue: Union[IndexedPriorityQueue, RadixPriorityQueue]
+        if graph.integer_weights:
+            self.delta3_queue = (RadixPriorityQueue(graph.num_edge)
+                                 if stats is None
+                                 else stats.new_radix_queue(graph.num_edge))
+        else:
+            self.delta3_queue = new_indexed_queue(graph.num_edge)
 
         # Queue containing top-level non-trivial T-blossoms.
         # The priority of a blossom is its dual plus 2 times the running
         # sum of delta steps.
-        self.delta4_queue: PriorityQueue[NonTrivialBlossom] = PriorityQueue()
+        self.delta4_queue: PriorityQueue[NonTrivialBlossom] = new_queue()
 
         # For each T-vertex or unlabeled vertex "x",
         # "vertex_sedge_queue[x]" is a queue of edges between "x" and any
         # S-vertex. The priority of an edge is 2 times its pseudo-slack.
-        self.vertex_sedge_queue: list[PriorityQueue[int]]
-        self.vertex_sedge_queue = [PriorityQueue() for _x in range(num_vertex)]
-        self.vertex_sedge_node: list[Optional[PriorityQueue.Node]]
-        self.vertex_sedge_node = [None for _e in graph.edges]
+        # An edge is in at most one of these queues, so they all share
+        # one list of edge positions.
+        sedge_queue = new_indexed_queue(graph.num_edge)
+        self.vertex_sedge_queue: list[IndexedPriorityQueue] = [sedge_queue]
+        self.vertex_sedge_queue.extend(new_indexed_queue(share=sedge_queue)
+                                       for _x in range(1, num_vertex))
+
+        # Queue containing all S-vertices, only used after a warm start.
+        # The priority of a vertex is its modified dual, i.e. 2 times its
+        # true dual plus 2 times the running sum of delta steps.
+        #
+        # After a cold start, all unmatched vertices have the same dual
+        # and no vertex has a smaller dual. The minimum dual of any S-vertex
+        # is then simply the dual of the unmatched vertices.
+        # After a warm start, that is not necessarily true.
+        self.vertex_s_queue: Optional[IndexedPriorityQueue] = None
 
         # Queue of S-vertices to be scanned.
         self.scan_queue: list[int] = []
@@ -626,7 +1204,8 @@ class MatchingContext:
     def __del__(self) -> None:
         """Delete reference cycles during cleanup of the matching context."""
         for blossom in itertools.chain(self.trivial_blossom,
-                                       self.nontrivial_blossom):
+                                       self.nontrivial_blossom,
+                                       self.blossom_pool):
             blossom.parent = None
             blossom.vertex_queue.clear()
             del blossom.vertex_queue
@@ -638,9 +1217,48 @@ class MatchingContext:
     def top_level_blossom(self, x: int) -> Blossom:
         """Find the top-level blossom that contains vertex "x".
 
-        This function takes time O(log(n)).
+        This function takes time O(1).
         """
-        return self.vertex_queue_node[x].find()
+        return self.top_blossom[self.vertex_top_slot[x]]
+
+    def merge_top_level_blossom(self, blossom: NonTrivialBlossom) -> None:
+        """Mark the new "blossom" as the top-level blossom of all its
+        vertices.
+
+        The blossom takes over the slot of its largest sub-blossom.
+
+        This function takes time O(k), where "k" is the number of vertices
+        in the blossom but not in its largest sub-blossom.
+        """
+        vertex_top_slot = self.vertex_top_slot
+        largest = max(blossom.subblossoms, key=lambda b: b.num_vertex)
+        slot = vertex_top_slot[largest.base_vertex]
+        self.top_blossom[slot] = blossom
+        for sub in blossom.subblossoms:
+            if sub is not largest:
+                self.free_top_slots.append(vertex_top_slot[sub.base_vertex])
+                for x in sub.vertices():
+                    vertex_top_slot[x] = slot
+
+    def split_top_level_blossom(self, blossom: NonTrivialBlossom) -> None:
+        """Mark the sub-blossoms of the expanded "blossom" as the top-level
+        blossoms of their vertices.
+
+        The largest sub-blossom takes over the slot of the blossom.
+
+        This function takes time O(k), where "k" is the number of vertices
+        in the blossom but not in its largest sub-blossom.
+        """
+        vertex_top_slot = self.vertex_top_slot
+        top_blossom = self.top_blossom
+        largest = max(blossom.subblossoms, key=lambda b: b.num_vertex)
+        top_blossom[vertex_top_slot[largest.base_vertex]] = largest
+        for sub in blossom.subblossoms:
+            if sub is not largest:
+                slot = self.free_top_slots.pop()
+                top_blossom[slot] = sub
+                for x in sub.vertices():
+                    vertex_top_slot[x] = slot
 
     #
     # Least-slack edge tracking:
@@ -661,8 +1279,10 @@ class MatchingContext:
           (edge_pseudo_slack_2x(e)
            - delta_sum_2x + B(y).vertex_dual_offset) / 2
         """
-        (x, y, w) = self.graph.edges[e]
-        return self.vertex_dual_2x[x] + self.vertex_dual_2x[y] - 2 * w
+        graph = self.graph
+        return (self.vertex_dual_2x[graph.edge_x[e]]
+                + self.vertex_dual_2x[graph.edge_y[e]]
+                - 2 * graph.edge_w[e])
 
     def delta2_add_edge(self, e: int, y: int, by: Blossom) -> None:
         """Add edge "e" for delta2 tracking.
@@ -674,12 +1294,12 @@ class MatchingContext:
 
         prio = self.edge_pseudo_slack_2x(e)
 
-        improved = (self.vertex_sedge_queue[y].empty()
-                    or (self.vertex_sedge_queue[y].find_min().prio > prio))
+        vertex_sedge_queue = self.vertex_sedge_queue[y]
+        improved = (vertex_sedge_queue.empty()
+                    or (vertex_sedge_queue.min_prio() > prio))
 
         # Insert edge in the S-edge queue of vertex "y".
-        assert self.vertex_sedge_node[e] is None
-        self.vertex_sedge_node[e] = self.vertex_sedge_queue[y].insert(prio, e)
+        vertex_sedge_queue.insert(e, prio)
 
         # Continue if the new edge becomes the least-slack S-edge for "y".
         if not improved:
@@ -706,17 +1326,15 @@ class MatchingContext:
 
         This function takes time O(log(n)).
         """
-        vertex_sedge_node = self.vertex_sedge_node[e]
-        if vertex_sedge_node is not None:
+        vertex_sedge_queue = self.vertex_sedge_queue[y]
+        if e in vertex_sedge_queue:
             # Delete edge from the S-edge queue of vertex "y".
-            vertex_sedge_queue = self.vertex_sedge_queue[y]
-            vertex_sedge_queue.delete(vertex_sedge_node)
-            self.vertex_sedge_node[e] = None
+            vertex_sedge_queue.delete(e)
 
             if vertex_sedge_queue.empty():
                 prio = math.inf
             else:
-                prio = vertex_sedge_queue.find_min().prio
+                prio = vertex_sedge_queue.min_prio()
 
             # If necessary, update priority of "y" in its ConcatenableQueue.
             if prio > self.vertex_queue_node[y].prio:
@@ -770,11 +1388,9 @@ class MatchingContext:
         disabled for delta2 tracking.
 
         This function takes time O(k + log(n)),
-        where "k" is the number of edges incident on "x".
+        where "k" is the number of edges in the S-edge queue of "x".
         """
         self.vertex_sedge_queue[x].clear()
-        for e in self.graph.adjacent_edges[x]:
-            self.vertex_sedge_node[e] = None
         self.vertex_queue_node[x].set_prio(math.inf)
 
     def delta2_get_min_edge(self) -> tuple[int, float]:
@@ -799,7 +1415,7 @@ class MatchingContext:
         assert blossom.label == LABEL_NONE
 
         x = blossom.vertex_queue.min_elem()
-        e = self.vertex_sedge_queue[x].find_min().data
+        e = self.vertex_sedge_queue[x].find_min()
 
         return (e, slack_2x)
 
@@ -813,7 +1429,7 @@ class MatchingContext:
         """
         # The edge may already be in the delta3 queue, if it was previously
         # discovered in the opposite direction.
-        if self.delta3_node[e] is None:
+        if e not in self.delta3_queue:
             # Priority is edge slack plus 2 times the running sum of
             # delta steps.
             prio_2x = self.edge_pseudo_slack_2x(e)
@@ -824,7 +1440,7 @@ class MatchingContext:
                 prio = prio_2x // 2
             else:
                 prio = prio_2x / 2
-            self.delta3_node[e] = self.delta3_queue.insert(prio, e)
+            self.delta3_queue.insert(e, prio)
 
     def delta3_remove_edge(self, e: int) -> None:
         """Remove edge "e" from delta3 tracking.
@@ -834,10 +1450,8 @@ class MatchingContext:
 
         This function takes time O(log(n)).
         """
-        delta3_node = self.delta3_node[e]
-        if delta3_node is not None:
-            self.delta3_queue.delete(delta3_node)
-            self.delta3_node[e] = None
+        if e in self.delta3_queue:
+            self.delta3_queue.delete(e)
 
     def delta3_get_min_edge(self) -> tuple[int, float]:
         """Find the least-slack edge between any pair of S-vertices in
@@ -850,23 +1464,21 @@ class MatchingContext:
             Tuple (edge_index, slack) if there is an S-to-S edge,
             or (-1, Inf) if there is no suitable edge.
         """
-        while not self.delta3_queue.empty():
-            delta3_node = self.delta3_queue.find_min()
-            e = delta3_node.data
-            (x, y, _w) = self.graph.edges[e]
-            bx = self.top_level_blossom(x)
-            by = self.top_level_blossom(y)
+        delta3_queue = self.delta3_queue
+        while not delta3_queue.empty():
+            e = delta3_queue.find_min()
+            bx = self.top_level_blossom(self.graph.edge_x[e])
+            by = self.top_level_blossom(self.graph.edge_y[e])
             assert (bx.label == LABEL_S) and (by.label == LABEL_S)
             if bx is not by:
-                slack = delta3_node.prio - self.delta_sum_2x
+                slack = delta3_queue.min_prio() - self.delta_sum_2x
                 return (e, slack)
 
             # Reject edges between vertices within the same top-level blossom.
             # Although intra-blossom edges are never inserted into the queue,
             # existing edges in the queue may become intra-blossom when
             # a new blossom is formed.
-            self.delta3_queue.delete(delta3_node)
-            self.delta3_node[e] = None
+            delta3_queue.delete(e)
 
         # If the queue is empty, no suitable edge exists.
         return (-1, math.inf)
@@ -929,6 +1541,11 @@ class MatchingContext:
             # S-vertices do not keep track of potential delta2 edges.
             self.delta2_clear_vertex(x)
 
+        # Track the duals of the new S-vertices, if necessary.
+        if self.vertex_s_queue is not None:
+            for x in vertices:
+                self.vertex_s_queue.insert(x, self.vertex_dual_2x[x])
+
         # Add the new S-vertices to the scan queue.
         self.scan_queue.extend(vertices)
 
@@ -999,25 +1616,33 @@ class MatchingContext:
         assert blossom.vertex_dual_offset == 0
         vertex_dual_fixup = -self.delta_sum_2x
 
-        edges = self.graph.edges
-        adjacent_edges = self.graph.adjacent_edges
+        edge_x = self.graph.edge_x
+        edge_y = self.graph.edge_y
+        adjacent_offset = self.graph.adjacent_offset
+        adjacent_edge = self.graph.adjacent_edge
+        vertex_top_slot = self.vertex_top_slot
+        top_blossom = self.top_blossom
 
         for x in blossom.vertices():
 
             # Unwind lazy delta updates to S-vertex dual variables.
             self.vertex_dual_2x[x] += vertex_dual_fixup
 
+            # Stop tracking the dual of this vertex.
+            if self.vertex_s_queue is not None:
+                self.vertex_s_queue.delete(x)
+
             # Scan the incident edges of all vertices in the blossom.
-            for e in adjacent_edges[x]:
-                (p, q, _w) = edges[e]
-                y = p if p != x else q
+            for e in adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]:
+                p = edge_x[e]
+                y = p if p != x else edge_y[e]
 
                 # If this edge is in the delta3 queue, remove it.
                 # Only edges between S-vertices are tracked for delta3,
                 # and vertex "x" is no longer an S-vertex.
                 self.delta3_remove_edge(e)
 
-                by = self.top_level_blossom(y)
+                by = top_blossom[vertex_top_slot[y]]
                 if by.label == LABEL_S:
                     # Edge "e" connects unlabeled vertex "x" to S-vertex "y".
                     # It must be tracked for delta2 via vertex "x".
@@ -1202,6 +1827,9 @@ class MatchingContext:
         assert len(path.edges) % 2 == 1
         assert len(path.edges) >= 3
 
+        if self.stats is not None:
+            self.stats.current.blossoms_created += 1
+
         # Construct the list of sub-blossoms (current top-level blossoms).
         subblossoms = [self.top_level_blossom(x) for (x, y) in path.edges]
 
@@ -1224,8 +1852,12 @@ class MatchingContext:
                 self.assign_blossom_label_s(sub)
             self.change_s_blossom_to_subblossom(sub)
 
-        # Create the new blossom object.
-        blossom = NonTrivialBlossom(subblossoms, path.edges)
+        # Create the new blossom object, or reuse an expanded one.
+        if self.blossom_pool:
+            blossom = self.blossom_pool.pop()
+            blossom.reuse(subblossoms, path.edges)
+        else:
+            blossom = NonTrivialBlossom(subblossoms, path.edges)
 
         # Assign label S to the new blossom.
         blossom.label = LABEL_S
@@ -1255,6 +1887,9 @@ class MatchingContext:
         # Merge concatenable queues.
         blossom.vertex_queue.merge([sub.vertex_queue for sub in subblossoms])
 
+        # Update the top-level blossom of the vertices.
+        self.merge_top_level_blossom(blossom)
+
     @staticmethod
     def find_path_through_blossom(
             blossom: NonTrivialBlossom,
@@ -1294,6 +1929,9 @@ class MatchingContext:
         assert blossom.parent is None
         assert blossom.label == LABEL_NONE
 
+        if self.stats is not None:
+            self.stats.current.blossoms_expanded += 1
+
         # Remove blossom from the delta2 queue.
         self.delta2_disable_blossom(blossom)
 
@@ -1305,6 +1943,7 @@ class MatchingContext:
         blossom.vertex_dual_offset = 0
 
         # Convert sub-blossoms into top-level blossoms.
+        self.split_top_level_blossom(blossom)
         for sub in blossom.subblossoms:
             assert sub.label == LABEL_NONE
             sub.parent = None
@@ -1314,11 +1953,11 @@ class MatchingContext:
 
             self.delta2_enable_blossom(sub)
 
-        # Avoid leaking a reference cycle.
-        del blossom.vertex_queue
-
-        # Delete the expanded blossom.
+        # Delete the expanded blossom and keep the object for reuse.
+        # The caller may still look at its sub-blossoms, but no new blossom
+        # is made before the caller returns.
         self.nontrivial_blossom.remove(blossom)
+        self.blossom_pool.append(blossom)
 
     def expand_t_blossom(self, blossom: NonTrivialBlossom) -> None:
         """Expand the specified T-blossom.
@@ -1407,41 +2046,54 @@ class MatchingContext:
         """
 
         # Walk through the blossom from "sub" to the base vertex.
-        (path_nodes, path_edges) = self.find_path_through_blossom(blossom,
-                                                                  sub)
+        # This is the path that "find_path_through_blossom()" returns,
+        # but indexed directly in the lists of sub-blossoms and edges
+        # instead of copying and reversing them at every level of nesting.
+        #
+        # Before augmentation, the path alternates between matched and
+        # unmatched edges, starting with a matched edge at "sub":
+        #
+        #   (sub) ===== (bx) ---(x,y)--- (by) ===== ... (base)
+        #
+        # After augmentation, each edge (x, y) is matched:
+        #
+        #   (sub) ----- (bx) ===(x,y)=== (by) ----- ... (base)
+        #
+        subblossoms = blossom.subblossoms
+        blossom_edges = blossom.edges
+        num_sub = len(subblossoms)
+        p = subblossoms.index(sub)
 
-        for p in range(0, len(path_edges), 2):
-            # Before augmentation:
-            #   path_nodes[p] is matched to path_nodes[p+1]
-            #
-            #   (p) ===== (p+1) ---(x,y)--- (p+2)
-            #
-            # After augmentation:
-            #   path_nodes[p+1] matched to path_nodes[p+2] via edge (i,j)
-            #
-            #   (p) ----- (p+1) ===(x,y)=== (p+2)
-            #
+        if p % 2 == 0:
+            # Walk backwards around the blossom.
+            # Edge "blossom_edges[i]" connects sub-blossom "i" to "i+1";
+            # flip it to fit in the path from "sub" to base.
+            steps = [(blossom_edges[i][1], blossom_edges[i][0],
+                      subblossoms[i+1], subblossoms[i])
+                     for i in range(p - 2, -1, -2)]
+        else:
+            # Walk forward around the blossom.
+            steps = [(blossom_edges[i][0], blossom_edges[i][1],
+                      subblossoms[i], subblossoms[(i + 1) % num_sub])
+                     for i in range(p + 1, num_sub, 2)]
 
+        trivial_blossom = self.trivial_blossom
+        vertex_mate = self.vertex_mate
+        for (x, y, bx, by) in steps:
             # Pull the edge (x, y) into the matching.
-            (x, y) = path_edges[p+1]
-            self.vertex_mate[x] = y
-            self.vertex_mate[y] = x
+            vertex_mate[x] = y
+            vertex_mate[y] = x
 
             # Augment through the subblossoms touching the edge (x, y).
             # Nothing needs to be done for trivial subblossoms.
-            bx = path_nodes[p+1]
             if isinstance(bx, NonTrivialBlossom):
-                stack.append((bx, self.trivial_blossom[x]))
-
-            by = path_nodes[p+2]
+                stack.append((bx, trivial_blossom[x]))
             if isinstance(by, NonTrivialBlossom):
-                stack.append((by, self.trivial_blossom[y]))
+                stack.append((by, trivial_blossom[y]))
 
         # Rotate the subblossom list so the new base ends up in position 0.
-        p = blossom.subblossoms.index(sub)
-        blossom.subblossoms = (
-            blossom.subblossoms[p:] + blossom.subblossoms[:p])
-        blossom.edges = blossom.edges[p:] + blossom.edges[:p]
+        blossom.subblossoms = subblossoms[p:] + subblossoms[:p]
+        blossom.edges = blossom_edges[p:] + blossom_edges[:p]
 
         # Update the base vertex.
         # We can pull this from the sub-blossom where we started since
@@ -1526,6 +2178,90 @@ class MatchingContext:
             self.vertex_mate[x] = y
             self.vertex_mate[y] = x
 
+    def trace_tree_path(self, x: int) -> list[tuple[int, int]]:
+        """Trace back through the alternating tree from vertex "x"
+        to the root of the tree.
+
+        This function takes time O(n * log(n)).
+
+        Returns:
+            List of tree edges from the root of the alternating tree
+            to the top-level blossom that contains "x".
+        """
+        path_edges: list[tuple[int, int]] = []
+        bx = self.top_level_blossom(x)
+        while bx.tree_edge is not None:
+            path_edges.append(bx.tree_edge)
+            bx = self.top_level_blossom(bx.tree_edge[0])
+        path_edges.reverse()
+        return path_edges
+
+    def augment_to_unmatched_blossom(self, x: int, y: int) -> None:
+        """Augment the matching through the path from the root of the
+        alternating tree of S-vertex "x", via edge (x, y), to the unlabeled
+        blossom that contains "y" and has an unmatched base vertex.
+
+        Such blossoms only exist after a warm start.
+        They hold unmatched vertices with zero dual that are not the root
+        of an alternating tree.
+
+        This function takes time O(n * log(n)).
+        """
+
+        bx = self.top_level_blossom(x)
+        assert bx.label == LABEL_S
+        assert bx.tree_blossoms is not None
+
+        path = AlternatingPath(edges=self.trace_tree_path(x) + [(x, y)],
+                               is_cycle=False)
+
+        self.remove_alternating_tree(bx.tree_blossoms)
+        self.augment_matching(path)
+
+    def release_s_vertex(self, x: int) -> None:
+        """Make S-vertex "x" an unmatched vertex.
+
+        This function is called when the dual of "x" has reached zero,
+        which can only happen after a warm start.
+        The alternating path from the root of the tree to "x" is flipped.
+        The root of the tree becomes matched (unless "x" is the root)
+        and "x" becomes an unmatched vertex. The alternating tree is removed.
+
+        Since "x" has zero dual, it can remain unmatched in an optimal
+        solution. It is not the root of a new alternating tree.
+
+        This function takes time O(n * log(n)).
+        """
+
+        bx = self.top_level_blossom(x)
+        assert bx.label == LABEL_S
+        assert bx.tree_blossoms is not None
+
+        # The path from the root to "bx" has an even number of edges
+        # and ends with the matched edge to the base of "bx".
+        path_edges = self.trace_tree_path(x)
+        assert len(path_edges) % 2 == 0
+
+        self.remove_alternating_tree(bx.tree_blossoms)
+
+        # Flip the edges along the path.
+        for (y, z) in path_edges[0::2]:
+            by = self.top_level_blossom(y)
+            if isinstance(by, NonTrivialBlossom):
+                self.augment_blossom(by, self.trivial_blossom[y])
+
+            bz = self.top_level_blossom(z)
+            if isinstance(bz, NonTrivialBlossom):
+                self.augment_blossom(bz, self.trivial_blossom[z])
+
+            self.vertex_mate[y] = z
+            self.vertex_mate[z] = y
+
+        # Make "x" the base of its blossom and release it.
+        if isinstance(bx, NonTrivialBlossom):
+            self.augment_blossom(bx, self.trivial_blossom[x])
+        self.vertex_mate[x] = -1
+
     #
     # Alternating tree:
     #
@@ -1671,25 +2407,34 @@ class MatchingContext:
         this function takes total time O((n + m) * log(n)) per stage.
         """
 
-        edges = self.graph.edges
-        adjacent_edges = self.graph.adjacent_edges
+        edge_x = self.graph.edge_x
+        edge_y = self.graph.edge_y
+        adjacent_offset = self.graph.adjacent_offset
+        adjacent_edge = self.graph.adjacent_edge
+        vertex_top_slot = self.vertex_top_slot
+        top_blossom = self.top_blossom
+
+        if self.stats is not None:
+            self.stats.current.edges_scanned += sum(
+                adjacent_offset[x+1] - adjacent_offset[x]
+                for x in self.scan_queue)
 
         # Process S-vertices waiting to be scanned.
         # This loop runs through O(n) iterations per stage.
         for x in self.scan_queue:
 
             # Double-check that "x" is an S-vertex.
-            bx = self.top_level_blossom(x)
+            bx = top_blossom[vertex_top_slot[x]]
             assert bx.label == LABEL_S
 
             # Scan the edges that are incident on "x".
             # This loop runs through O(m) iterations per stage.
-            for e in adjacent_edges[x]:
-                (p, q, _w) = edges[e]
-                y = p if p != x else q
+            for e in adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]:
+                p = edge_x[e]
+                y = p if p != x else edge_y[e]
 
                 # Ignore edges that are internal to a blossom.
-                by = self.top_level_blossom(y)
+                by = top_blossom[vertex_top_slot[y]]
                 if bx is by:
                     continue
 
@@ -1735,10 +2480,16 @@ class MatchingContext:
         delta_blossom: Optional[NonTrivialBlossom] = None
 
         # Compute delta1: minimum dual variable of any S-vertex.
-        # All unmatched vertices have the same dual value, and this is
-        # the minimum value among all S-vertices.
+        # After a cold start, all unmatched vertices have the same dual value,
+        # and this is the minimum value among all S-vertices.
+        # After a warm start, the S-vertex duals are tracked in a queue.
         delta_type = 1
-        delta_2x = self.start_vertex_dual_2x - self.delta_sum_2x
+        if self.vertex_s_queue is None:
+            delta_2x = self.start_vertex_dual_2x - self.delta_sum_2x
+        elif self.vertex_s_queue.empty():
+            delta_2x = math.inf
+        else:
+            delta_2x = self.vertex_s_queue.min_prio() - self.delta_sum_2x
 
         # Compute delta2: minimum slack of any edge between an S-vertex and
         # an unlabeled vertex.
@@ -1796,6 +2547,96 @@ class MatchingContext:
             bx.tree_edge = None
             bx.tree_blossoms = {bx}
 
+    def start_from_state(self, state: MatchingState) -> None:
+        """Start from the matching and dual solution of a previous state.
+
+        If the state is a valid starting point for the current graph as it
+        is, for example the state of a solve of the same graph that was
+        stopped by its deadline, its blossoms are rebuilt and the solve
+        continues where it stopped (see "is_exact_resume()").
+        Otherwise the state is first repaired to obtain a valid starting
+        point for the current graph (see "prepare_warm_start()").
+        Then each unmatched vertex with non-zero dual is marked as the root
+        of an alternating tree. Unmatched vertices with zero dual are left
+        unlabeled.
+
+        This function takes time O(n * log(n) + m) plus the time needed
+        to check and repair the state.
+        It is called once, at the beginning of the algorithm.
+        """
+
+        if is_exact_resume(self.graph, state):
+            self.vertex_mate = list(state.vertex_mate)
+            self.vertex_dual_2x = list(state.vertex_dual_2x)
+            self.restore_blossoms(state)
+        else:
+            (self.vertex_mate, self.vertex_dual_2x
+             ) = prepare_warm_start(self.graph, state)
+
+        # Unmatched vertices may have different duals.
+        # Keep track of the minimum dual of all S-vertices.
+        self.vertex_s_queue = self.new_indexed_queue(self.graph.num_vertex)
+
+        for x in range(self.graph.num_vertex):
+            if (self.vertex_mate[x] != -1) or (self.vertex_dual_2x[x] == 0):
+                continue
+
+            bx = self.top_level_blossom(x)
+            assert bx.base_vertex == x
+
+            # Assign label S.
+            self.assign_blossom_label_s(bx)
+
+            # Mark blossom as the root of an alternating tree.
+            bx.tree_edge = None
+            bx.tree_blossoms = {bx}
+
+    def restore_blossoms(self, state: MatchingState) -> None:
+        """Rebuild the non-trivial blossoms of a state.
+
+        The state must have passed "is_exact_resume()".
+        Blossoms are built from the deepest level up, so that the
+        sub-blossoms of each blossom are top-level blossoms when it is
+        created. All blossoms start unlabeled.
+
+        This function takes time O(n * log(n) + k * d), where "k" is the
+        number of blossoms and "d" their maximum nesting depth.
+        """
+
+        vertex_blossom = state.vertex_blossom
+        blossom_parent = state.blossom_parent
+        assert state.blossom_edges is not None
+        depth = _blossom_depth(blossom_parent)
+        assert depth is not None
+
+        num_blossom = len(blossom_parent)
+        blossoms: list[Optional[NonTrivialBlossom]] = num_blossom * [None]
+
+        def child(b: int, x: int) -> Blossom:
+            # Return the sub-blossom of "b" that contains vertex "x".
+            c = vertex_blossom[x]
+            if c == b:
+                return self.trivial_blossom[x]
+            while blossom_parent[c] != b:
+                c = blossom_parent[c]
+            sub = blossoms[c]
+            assert sub is not None
+            return sub
+
+        for b in sorted(range(num_blossom), key=depth.__getitem__,
+                        reverse=True):
+            edges = [(x, y) for (x, y) in state.blossom_edges[b]]
+            subblossoms = [child(b, x) for (x, _y) in edges]
+            blossom = NonTrivialBlossom(subblossoms, edges)
+            blossom.dual_var = state.blossom_dual[b]
+            for sub in subblossoms:
+                sub.parent = blossom
+            blossom.vertex_queue.merge(
+                [sub.vertex_queue for sub in subblossoms])
+            self.nontrivial_blossom.add(blossom)
+            self.merge_top_level_blossom(blossom)
+            blossoms[b] = blossom
+
     def run_stage(self) -> bool:
         """Run one stage of the matching algorithm.
 
@@ -1827,24 +2668,41 @@ class MatchingContext:
             (delta_type, delta_2x, delta_edge, delta_blossom
              ) = self.calc_dual_delta_step()
 
+            # Stop if there are no more alternating trees.
+            if delta_2x == math.inf:
+                return False
+
+            if self.stats is not None:
+                self.stats.current.delta_steps[delta_type] += 1
+
             # Update the running sum of delta steps.
             # This implicitly updates the dual variables as needed, because
             # the running delta sum is taken into account when calculating
             # dual values.
             self.delta_sum_2x += delta_2x
+            self.delta3_queue.advance(self.delta_sum_2x)
 
             if delta_type == 2:
                 # Use the edge from S-vertex to unlabeled vertex that got
                 # unlocked through the delta update.
-                (x, y, _w) = self.graph.edges[delta_edge]
+                x = self.graph.edge_x[delta_edge]
+                y = self.graph.edge_y[delta_edge]
                 if self.top_level_blossom(x).label != LABEL_S:
                     (x, y) = (y, x)
+                by = self.top_level_blossom(y)
+                if self.vertex_mate[by.base_vertex] == -1:
+                    # The edge leads to an unmatched vertex that is not
+                    # in an alternating tree. This can only happen after
+                    # a warm start. Augment the matching and end the stage.
+                    self.augment_to_unmatched_blossom(x, y)
+                    return True
                 self.extend_tree_s_to_t(x, y)
 
             elif delta_type == 3:
                 # Use the S-to-S edge that got unlocked by the delta update.
                 # This reveals either a new blossom or an augmenting path.
-                (x, y, _w) = self.graph.edges[delta_edge]
+                x = self.graph.edge_x[delta_edge]
+                y = self.graph.edge_y[delta_edge]
                 if self.add_s_to_s_edge(x, y):
                     # Matching was augmented. End the stage.
                     return True
@@ -1855,6 +2713,14 @@ class MatchingContext:
                 assert delta_blossom is not None
                 self.expand_t_blossom(delta_blossom)
 
+            elif self.vertex_s_queue is not None:
+                # An S-vertex reached dual value 0 through the delta update.
+                # Release that vertex and end the stage.
+                assert delta_type == 1
+                x = self.vertex_s_queue.find_min()
+                self.release_s_vertex(x)
+                return True
+
             else:
                 # No further improvement possible. End the algorithm.
                 assert delta_type == 1
@@ -1894,12 +2760,43 @@ class MatchingContext:
         assert self.delta3_queue.empty()
         assert self.delta4_queue.empty()
 
+    def export_state(self) -> MatchingState:
+        """Return the current matching and dual solution.
+
+        This function must be called after "cleanup()".
+
+        This function takes time O(n).
+        """
+
+        blossoms = list(self.nontrivial_blossom)
+        blossom_index = {blossom: i for (i, blossom) in enumerate(blossoms)}
+
+        blossom_parent = [
+            (-1 if blossom.parent is None else blossom_index[blossom.parent])
+            for blossom in blossoms]
+        blossom_dual = [blossom.dual_var for blossom in blossoms]
+        blossom_edges = [list(blossom.edges) for blossom in blossoms]
+
+        vertex_blossom = [
+            (-1 if blossom.parent is None else blossom_index[blossom.parent])
+            for blossom in self.trivial_blossom]
+
+        return MatchingState(
+            vertex_mate=list(self.vertex_mate),
+            vertex_dual_2x=list(self.vertex_dual_2x),
+            vertex_blossom=vertex_blossom,
+            blossom_parent=blossom_parent,
+            blossom_dual=blossom_dual,
+            blossom_edges=blossom_edges)
+
 
 def _verify_blossom_edges(
         ctx: MatchingContext,
         blossom: NonTrivialBlossom,
-        edge_slack_2x: list[float]
-        ) -> None:
+        edge_slack_2x: list[float],
+        vertex_visit: list[int],
+        first_visit: int
+        ) -> int:
     """Descend down the blossom tree to find edges that are contained
     in blossoms.
 
@@ -1909,27 +2806,51 @@ def _verify_blossom_edges(
     On the way down, keep track of the sum of dual variables of
     the containing blossoms.
 
-    On the way up, keep track of the total number of matched edges
-    in the subblossoms. Then check that all blossoms with non-zero
+    On the way up, keep track of the total number of vertices and matched
+    edges in the subblossoms. Then check that all blossoms with non-zero
     dual variable are "full".
 
+    Vertices are numbered in the order in which the descent reaches them.
+    Each edge is handled when the descent reaches its second vertex "y".
+    At that point, the blossoms on the descent path that contain the first
+    vertex "x" are exactly the blossoms that were entered before "x" was
+    reached. The smallest of them is found by binary search. This takes
+    time O(log(d)) per edge, where "d" is the nesting depth, instead of
+    time O(n) per nested blossom to mark the vertices of each blossom.
+
+    This function takes time O(k + m * log(d)), where "k" is the number
+    of vertices in the blossom and "m" is the number of incident edges.
+
+    Parameters:
+        vertex_visit: List with an element for each vertex, where
+            "vertex_visit[x]" is the number of the vertex in the order of
+            the descent. Elements less than "first_visit" are ignored.
+        first_visit: Number to assign to the first vertex of this blossom.
+
+    Returns:
+        The number to assign to the first vertex of the next blossom.
+
     Raises:
         MatchingError: If a blossom with non-zero dual is not full.
     """
 
-    num_vertex = ctx.graph.num_vertex
+    graph = ctx.graph
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+    vertex_mate = ctx.vertex_mate
+    next_visit = first_visit
 
-    # For each vertex "x",
-    # "vertex_depth[x]" is the depth of the smallest blossom on
-    # the current descent path that contains "x".
-    vertex_depth: list[int] = num_vertex * [0]
+    # Keep track of the first visit number inside each blossom along
+    # the current descent path. Depth 0 is outside the top-level blossom.
+    path_first_visit: list[int] = [-1]
 
     # Keep track of the sum of blossom duals at each depth along
     # the current descent path.
     path_sum_dual: list[float] = [0]
 
-    # Keep track of the number of matched edges at each depth along
-    # the current descent path.
+    # Keep track of the number of vertices and matched edges at each depth
+    # along the current descent path.
+    path_num_vertex: list[int] = [0]
     path_num_matched: list[int] = [0]
 
     # Use an explicit stack to avoid deep recursion.
@@ -1941,14 +2862,13 @@ def _verify_blossom_edges(
 
         if p == -1:
             # We just entered this sub-blossom.
-            # Update the depth of all vertices in this sub-blossom.
-            for x in blossom.vertices():
-                vertex_depth[x] = depth
+            path_first_visit.append(next_visit)
 
             # Calculate the sub of blossoms at the current depth.
             path_sum_dual.append(path_sum_dual[-1] + blossom.dual_var)
 
-            # Initialize the number of matched edges at the current depth.
+            # Initialize the counters at the current depth.
+            path_num_vertex.append(0)
             path_num_matched.append(0)
 
             p += 1
@@ -1966,36 +2886,39 @@ def _verify_blossom_edges(
 
             else:
                 # Handle this trivial sub-blossom.
-                # Scan its adjacent edges and find the smallest blossom
-                # that contains each edge.
-                for e in ctx.graph.adjacent_edges[sub.base_vertex]:
-                    (x, y, _w) = ctx.graph.edges[e]
-
-                    # Only process edges that are ordered out from this
-                    # sub-blossom. This ensures that we process each edge in
-                    # the blossom only once.
-                    if x == sub.base_vertex:
-
-                        edge_depth = vertex_depth[y]
-                        if edge_depth > 0:
-                            # This edge is contained in an ancestor blossom.
-                            # Update its slack.
-                            edge_slack_2x[e] += 2 * path_sum_dual[edge_depth]
-
-                            # Update the number of matched edges in ancestor.
-                            if ctx.vertex_mate[x] == y:
-                                path_num_matched[edge_depth] += 1
+                x = sub.base_vertex
+                vertex_visit[x] = next_visit
+                next_visit += 1
+                path_num_vertex[depth] += 1
+
+                # Scan its adjacent edges to vertices that were already
+                # reached, and find the smallest blossom that contains
+                # each edge.
+                for e in graph.incident_edges(x):
+                    y = edge_x[e]
+                    if y == x:
+                        y = edge_y[e]
+
+                    y_visit = vertex_visit[y]
+                    if y_visit >= first_visit:
+                        edge_depth = bisect.bisect_right(path_first_visit,
+                                                         y_visit) - 1
+
+                        # This edge is contained in an ancestor blossom.
+                        # Update its slack.
+                        edge_slack_2x[e] += 2 * path_sum_dual[edge_depth]
+
+                        # Update the number of matched edges in ancestor.
+                        if vertex_mate[x] == y:
+                            path_num_matched[edge_depth] += 1
 
         else:
             # We are now leaving the current sub-blossom.
 
-            # Count the number of vertices inside this blossom.
-            blossom_vertices = blossom.vertices()
-            blossom_num_vertex = len(blossom_vertices)
-
             # Check that all blossoms are "full".
             # A blossom is full if all except one of its vertices are
             # matched to another vertex in the blossom.
+            blossom_num_vertex = path_num_vertex[depth]
             blossom_num_matched = path_num_matched[depth]
             if blossom_num_vertex != 2 * blossom_num_matched + 1:
                 raise MatchingError(
@@ -2004,34 +2927,62 @@ def _verify_blossom_edges(
                     f" nvertex={blossom_num_vertex}"
                     f" nmatched={blossom_num_matched}")
 
-            # Update the number of matched edges in the parent blossom to
-            # take into account the matched edges in this blossom.
-            path_num_matched[depth - 1] += path_num_matched[depth]
-
-            # Revert the depth of the vertices in this sub-blossom.
-            for x in blossom_vertices:
-                vertex_depth[x] = depth - 1
+            # Update the number of vertices and matched edges in the parent
+            # blossom to take into account this blossom.
+            path_num_vertex[depth - 1] += blossom_num_vertex
+            path_num_matched[depth - 1] += blossom_num_matched
 
             # Trim the descending path.
+            path_first_visit.pop()
             path_sum_dual.pop()
+            path_num_vertex.pop()
             path_num_matched.pop()
 
             # Remove the current blossom from the stack.
             # We thus continue our scan of the parent blossom.
             stack.pop()
 
+    return next_visit
+
 
-def verify_optimum(ctx: MatchingContext) -> None:
+def verify_optimum(
+        ctx: MatchingContext,
+        sample_size: Optional[int] = None
+        ) -> None:
     """Verify that the optimum solution has been found.
 
-    This function takes time O(n**2).
+    If NumPy is loaded, the checks run as array operations,
+    see "numpy_verify.verify_optimum_arrays()".
+
+    If "sample_size" is specified, only a random sample of that many edges,
+    plus the matched edges, is checked for non-negative slack.
+    This always uses NumPy.
+
+    This function takes time O(n + m * log(n)).
+
+    Raises:
+        MatchingError: If the solution is not optimal.
+    """
+
+    if (sample_size is not None) or ("numpy" in sys.modules):
+        from .numpy_verify import verify_optimum_arrays
+        verify_optimum_arrays(ctx, sample_size)
+    else:
+        _verify_optimum_lists(ctx)
+
+
+def _verify_optimum_lists(ctx: MatchingContext) -> None:
+    """Verify that the optimum solution has been found, without NumPy.
+
+    This function takes time O(n + m * log(n)).
 
     Raises:
         MatchingError: If the solution is not optimal.
     """
 
-    num_vertex = ctx.graph.num_vertex
-    num_edge = len(ctx.graph.edges)
+    graph = ctx.graph
+    num_vertex = graph.num_vertex
+    num_edge = graph.num_edge
 
     # Check that each matched edge actually exists in the graph.
     num_matched_vertex = 0
@@ -2045,7 +2996,7 @@ def verify_optimum(ctx: MatchingContext) -> None:
             num_matched_vertex += 1
 
     num_matched_edge = 0
-    for (x, y, _w) in ctx.graph.edges:
+    for (x, y) in zip(graph.edge_x, graph.edge_y):
         if ctx.vertex_mate[x] == y:
             num_matched_edge += 1
 
@@ -2077,15 +3028,18 @@ def verify_optimum(ctx: MatchingContext) -> None:
     # A correction will be needed for edges inside blossoms.
     edge_slack_2x: list[float] = [
         ctx.vertex_dual_2x[x] + ctx.vertex_dual_2x[y] - 2 * w
-        for (x, y, w) in ctx.graph.edges]
+        for (x, y, w) in zip(graph.edge_x, graph.edge_y, graph.edge_w)]
 
     # Descend down each top-level blossom.
     # Adjust edge slacks to account for the duals of its containing blossoms.
     # And check that all blossoms are full.
-    # This takes total time O(n**2).
+    # This takes total time O(n + m * log(n)).
+    vertex_visit: list[int] = num_vertex * [-1]
+    next_visit = 0
     for blossom in ctx.nontrivial_blossom:
         if blossom.parent is None:
-            _verify_blossom_edges(ctx, blossom, edge_slack_2x)
+            next_visit = _verify_blossom_edges(ctx, blossom, edge_slack_2x,
+                                               vertex_visit, next_visit)
 
     # We now know the correct slack of each edge.
     # Check that all edges have non-negative slack.
@@ -2096,7 +3050,8 @@ def verify_optimum(ctx: MatchingContext) -> None:
 
     # Check that all matched edges have zero slack.
     for e in range(num_edge):
-        (x, y, _w) = ctx.graph.edges[e]
+        x = graph.edge_x[e]
+        y = graph.edge_y[e]
         if ctx.vertex_mate[x] == y and edge_slack_2x[e] != 0:
             raise MatchingError(
                 "Verification failed:"
@@ -0,0 +1,185 @@
+"""
+Approximate maximum weight matching in near-linear time.
+
+The functions in this module find a matching with at least half the weight
+of a maximum-weight matching. They are much faster than the exact algorithm
+and are intended for very large graphs where an exact solution takes
+too long.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Union
+
+from .algorithm import GraphInfo, _is_edge_arrays, _make_graph
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+def greedy_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays]
+        ) -> list[tuple[int, int]]:
+    """Compute a matching by adding edges in order of decreasing weight,
+    skipping edges that touch an already matched vertex.
+
+    The weight of the matching is at least half the weight of
+    a maximum-weight matching.
+
+    The graph is specified as for "maximum_weight_matching()".
+
+    This function takes time O(m * log(m)).
+
+    Returns:
+        List of pairs of matched vertex indices.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    graph = _make_graph(edges)
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+
+    vertex_mate = graph.num_vertex * [-1]
+    for e in _edges_by_decreasing_weight(graph, _is_edge_arrays(edges)):
+        x = edge_x[e]
+        y = edge_y[e]
+        if (vertex_mate[x] == -1) and (vertex_mate[y] == -1):
+            vertex_mate[x] = y
+            vertex_mate[y] = x
+
+    return _matched_pairs(graph, vertex_mate)
+
+
+def path_growing_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays]
+        ) -> list[tuple[int, int]]:
+    """Compute a matching with the path growing algorithm, improved by
+    dynamic programming.
+
+    The algorithm grows vertex-disjoint paths by repeatedly following
+    the heaviest edge to an unvisited vertex. Each path is then matched
+    optimally by dynamic programming. The weight of the matching is at least
+    half the weight of a maximum-weight matching.
+
+    See: D. Drake, S. Hougardy, "A simple approximation algorithm for
+    the weighted matching problem", Information Processing Letters, 2003.
+
+    The graph is specified as for "maximum_weight_matching()".
+
+    This function takes time O(n + m).
+
+    Returns:
+        List of pairs of matched vertex indices.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    graph = _make_graph(edges)
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+    edge_w = graph.edge_w
+    adjacent_offset = graph.adjacent_offset
+    adjacent_edge = graph.adjacent_edge
+
+    vertex_mate = graph.num_vertex * [-1]
+    visited = graph.num_vertex * [False]
+
+    for start in range(graph.num_vertex):
+        if visited[start]:
+            continue
+
+        # Grow a path from "start" along the heaviest edges.
+        path: list[int] = []
+        x = start
+        while True:
+            visited[x] = True
+            best_edge = -1
+            best_weight: float = 0
+            for e in adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]:
+                p = edge_x[e]
+                y = p if p != x else edge_y[e]
+                if (not visited[y]) and ((best_edge == -1)
+                                         or (edge_w[e] > best_weight)):
+                    best_edge = e
+                    best_weight = edge_w[e]
+            if best_edge == -1:
+                break
+            path.append(best_edge)
+            p = edge_x[best_edge]
+            x = p if p != x else edge_y[best_edge]
+
+        for e in _max_weight_path_matching(path, edge_w):
+            x = edge_x[e]
+            y = edge_y[e]
+            vertex_mate[x] = y
+            vertex_mate[y] = x
+
+    return _matched_pairs(graph, vertex_mate)
+
+
+def _edges_by_decreasing_weight(
+        graph: GraphInfo,
+        use_numpy: bool
+        ) -> Sequence[int]:
+    """Return edge indices ordered by decreasing weight.
+
+    If the graph was passed as NumPy arrays, the edges are sorted by NumPy.
+    """
+    if use_numpy:
+        import numpy
+        dtype = numpy.int64 if graph.integer_weights else numpy.float64
+        weights = numpy.frombuffer(graph.edge_w, dtype=dtype)
+        return numpy.argsort(-weights, kind="stable").tolist()
+    return sorted(range(graph.num_edge),
+                  key=graph.edge_w.__getitem__,
+                  reverse=True)
+
+
+def _max_weight_path_matching(
+        path: list[int],
+        edge_w: Sequence[float]
+        ) -> list[int]:
+    """Return a maximum-weight matching of a path.
+
+    This function takes time O(k), where "k" is the number of edges
+    in the path.
+
+    Parameters:
+        path: List of edge indices that form a path, in order.
+        edge_w: Edge weights.
+
+    Returns:
+        List of matched edge indices.
+    """
+
+    # "best[i]" is the weight of a maximum matching of the first "i" edges.
+    best: list[float] = (len(path) + 1) * [0]
+    for (i, e) in enumerate(path):
+        take = edge_w[e] + (best[i-1] if i > 0 else 0)
+        best[i+1] = max(best[i], take)
+
+    # Trace back to find the matched edges.
+    matched: list[int] = []
+    i = len(path)
+    while i > 0:
+        if best[i] == best[i-1]:
+            i -= 1
+        else:
+            matched.append(path[i-1])
+            i -= 2
+    return matched
+
+
+def _matched_pairs(
+        graph: GraphInfo,
+        vertex_mate: list[int]
+        ) -> list[tuple[int, int]]:
+    """Return the matched pairs in the order of the edges of the graph."""
+    return [(x, y) for (x, y) in zip(graph.edge_x, graph.edge_y)
+            if vertex_mate[x] == y]
@@ -0,0 +1,517 @@
+"""
+Maximum weight b-matching, where each vertex has a capacity.
+
+A b-matching is a set of edges such that each vertex "x" is covered by at
+most "capacity[x]" edges. Each edge is used at most once, so two vertices
+are never matched to each other twice.
+
+The b-matching problem is reduced to an ordinary matching problem:
+
+ - Each vertex "x" is represented by "capacity[x]" copies.
+
+ - An edge with an endpoint of capacity 1 is connected to every copy
+   of its other endpoint. The single copy of the first endpoint ensures
+   that the edge is used at most once.
+
+ - An edge (x, y) with weight "w" between two vertices of larger capacity
+   is replaced by a gadget with two new vertices "a" and "b": "a" is
+   connected to every copy of "x" with weight "w + C", "b" to every copy
+   of "y" with weight "w + C", and "a" to "b" with weight "2 * C".
+   If "C" is larger than any edge weight, a maximum-weight matching either
+   matches "a" and "b" to copies of "x" and "y" (the edge is used), or
+   matches "a" to "b" (the edge is not used). The difference is "2 * w".
+
+All other edges are doubled in weight, so the reduced problem has exactly
+twice the weight of the b-matching plus "2 * C" per gadget.
+
+Simply duplicating vertices and connecting every copy of "x" to every copy
+of "y" needs "capacity[x] * capacity[y]" edges per edge and may match
+the same two vertices more than once. The gadget needs
+"capacity[x] + capacity[y] + 1" edges.
+
+Gadgets add two vertices per edge, which makes the reduced problem much
+larger than the original graph when many vertices have a capacity above 1.
+Most of these edges are never used: a vertex of capacity "b" uses at most
+"b" of its edges. "solve_maximum_weight_b_matching()" therefore starts with
+gadgets for the heaviest edges of each vertex only, and leaves the other
+edges between two vertices of larger capacity out. After each solve,
+a left-out edge "(x, y)" with weight "w" whose gadget would violate the
+dual solution gets its gadget, and the solve continues from the previous
+state. This is the case if the mean dual of the copies of "x" plus
+the mean dual of the copies of "y" is less than "2 * w" (the weight of
+the edge in the reduced problem). When no left-out edge is violated,
+the dual solution extends to the full reduced problem, with all omitted
+gadgets matched internally, so the b-matching is optimal.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Mapping, Sequence, Set
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from .algorithm import (GraphInfo, MatchingResult, MatchingState,
+                        _check_input_graph, _check_input_types,
+                        _is_edge_arrays, _make_graph,
+                        _maximum_cardinality_delta)
+from .components import solve_maximum_weight_matching_by_component
+from .stats import SolverStats
+from .warmstart import _fold_blossom_duals
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+class BMatchingReduction(NamedTuple):
+    """Result of "reduce_b_matching()"."""
+
+    # Edges of the reduced matching problem.
+    edges: list[tuple[int, int, float]]
+
+    # "vertex_origin[p]" is the original vertex of which reduced vertex "p"
+    # is a copy, or -1 if "p" is a gadget vertex.
+    vertex_origin: list[int]
+
+    # "gadget_edge[k]" is the original edge "(x, y)" represented by the
+    # gadget with vertices "a = g + 2 * k" and "b = g + 2 * k + 1",
+    # where "g" is the number of copy vertices.
+    gadget_edge: list[tuple[int, int]]
+
+    # Weight "C" used in the gadgets.
+    gadget_weight: float
+
+    # Edges "(x, y, w)" between two vertices of capacity 2 or more that
+    # have no gadget, see "gadget_pairs" in "reduce_b_matching()".
+    excluded_edge: list[tuple[int, int, float]]
+
+    def initial_state(self) -> MatchingState:
+        """Return a state in which every gadget is matched internally.
+
+        The state has a feasible dual solution: copy vertices get dual
+        "C - 1" and gadget vertices get dual "C". Passing it as "warm_start"
+        saves the algorithm one stage per gadget.
+
+        This function takes time O(n) in the size of the reduced problem.
+        """
+        num_vertex = len(self.vertex_origin)
+        num_copy = num_vertex - 2 * len(self.gadget_edge)
+        vertex_mate = num_vertex * [-1]
+        for a in range(num_copy, num_vertex, 2):
+            vertex_mate[a] = a + 1
+            vertex_mate[a+1] = a
+        vertex_dual_2x = (num_copy * [2 * (self.gadget_weight - 1)]
+                          + (num_vertex - num_copy) * [2 * self.gadget_weight])
+        return MatchingState(vertex_mate=vertex_mate,
+                             vertex_dual_2x=vertex_dual_2x,
+                             vertex_blossom=num_vertex * [-1],
+                             blossom_parent=[],
+                             blossom_dual=[])
+
+    def carry_over_state(
+            self,
+            previous: BMatchingReduction,
+            state: MatchingState
+            ) -> MatchingState:
+        """Map the state of an earlier reduction of the same problem, with
+        a subset of the gadgets, to a warm start for this reduction.
+
+        Copy vertices keep their index, and the vertices of existing
+        gadgets are renumbered. New gadgets start matched internally as in
+        "initial_state()". Blossom duals are folded into the vertex duals.
+
+        This function takes time O(n) in the size of the reduced problem.
+        """
+        num_copy = len(self.vertex_origin) - 2 * len(self.gadget_edge)
+        gadget_index = {edge: k for (k, edge) in enumerate(self.gadget_edge)}
+        new_index = list(range(num_copy))
+        for edge in previous.gadget_edge:
+            a = num_copy + 2 * gadget_index[edge]
+            new_index.extend((a, a + 1))
+
+        dual_2x = _fold_blossom_duals(state)
+        carried = self.initial_state()
+        for (p, q) in enumerate(new_index[:len(dual_2x)]):
+            mate = state.vertex_mate[p]
+            carried.vertex_mate[q] = -1 if mate == -1 else new_index[mate]
+            carried.vertex_dual_2x[q] = dual_2x[p]
+        return carried
+
+    def violated_gadget_pairs(
+            self,
+            state: MatchingState
+            ) -> set[tuple[int, int]]:
+        """Return the excluded edges whose gadget would have negative slack
+        under the dual solution in "state".
+
+        The copies of a vertex are interchangeable, so averaging the dual
+        solution over all permutations of the copies gives another optimal
+        dual solution, in which each copy of "x" has the mean dual of
+        the copies of "x". The gadget of an excluded edge "(x, y)" with
+        weight "w" can be added to that solution, matched internally,
+        if and only if the mean duals of "x" and "y" add up to at least
+        "2 * w". Gadget edges connect to new vertices, so they are not
+        affected by blossom duals.
+
+        This function takes time O(n + m) in the size of the reduced problem.
+
+        Returns:
+            Set of pairs "(x, y)" with "x < y", to be passed as part of
+            "gadget_pairs" to "reduce_b_matching()".
+        """
+        vertex_dual_2x = state.vertex_dual_2x
+        num_known = len(vertex_dual_2x)
+        sum_dual_2x: dict[int, float] = {}
+        num_copies: dict[int, int] = {}
+        for (p, x) in enumerate(self.vertex_origin):
+            if x == -1:
+                break
+            d = vertex_dual_2x[p] if p < num_known else 0
+            sum_dual_2x[x] = sum_dual_2x.get(x, 0) + d
+            num_copies[x] = num_copies.get(x, 0) + 1
+        return {(min(x, y), max(x, y))
+                for (x, y, w) in self.excluded_edge
+                if (sum_dual_2x[x] * num_copies[y]
+                    + sum_dual_2x[y] * num_copies[x]
+                    < 4 * w * num_copies[x] * num_copies[y])}
+
+    def restore(
+            self,
+            pairs: Sequence[tuple[int, int]]
+            ) -> list[tuple[int, int]]:
+        """Map a matching of the reduced problem to a b-matching of
+        the original graph.
+
+        If "pairs" is a maximum-weight matching of the reduced problem,
+        the result is a maximum-weight b-matching of the original graph.
+        Gadgets that are only half used do not contribute an edge.
+
+        This function takes time O(n + m) in the size of the reduced problem.
+        """
+
+        vertex_origin = self.vertex_origin
+        num_copy = len(vertex_origin) - 2 * len(self.gadget_edge)
+
+        restored: list[tuple[int, int]] = []
+        gadget_ends = len(self.gadget_edge) * [0]
+        for (p, q) in pairs:
+            x = vertex_origin[p]
+            y = vertex_origin[q]
+            if (x != -1) and (y != -1):
+                restored.append((x, y))
+            elif (x != -1) or (y != -1):
+                g = p if x == -1 else q
+                gadget_ends[(g - num_copy) // 2] += 1
+
+        for (k, ends) in enumerate(gadget_ends):
+            if ends == 2:
+                restored.append(self.gadget_edge[k])
+        return restored
+
+
+def reduce_b_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        capacity: Mapping[int, int],
+        gadget_pairs: Optional[Set[tuple[int, int]]] = None
+        ) -> BMatchingReduction:
+    """Reduce a maximum-weight b-matching problem to a maximum-weight
+    matching problem.
+
+    The graph is specified as for "maximum_weight_matching()".
+    Vertices that do not appear in "capacity" have capacity 1.
+
+    If "gadget_pairs" is specified, only edges "(x, y)" with "x < y" in
+    this set get a gadget. Other edges between two vertices of capacity 2
+    or more are left out of the reduced problem and listed in
+    "excluded_edge". A matching of the reduced problem then restores to
+    a valid b-matching, but not necessarily an optimal one, see
+    "BMatchingReduction.violated_gadget_pairs()".
+
+    This function takes time O(n + m * b), where "b" is the maximum
+    capacity of a vertex.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        capacity: Maximum number of matched edges of each vertex.
+        gadget_pairs: Optional set of edges that get a gadget.
+            By default, every edge that needs a gadget gets one.
+
+    Returns:
+        BMatchingReduction containing the reduced problem and the information
+        needed to map its matching back to a b-matching.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints,
+            or if a capacity is negative.
+        TypeError: If the input contains invalid data types.
+    """
+
+    graph = _make_graph(edges)
+    return _reduce_graph(graph,
+                         _vertex_capacity(graph, capacity),
+                         gadget_pairs)
+
+
+def _vertex_capacity(
+        graph: GraphInfo,
+        capacity: Mapping[int, int]
+        ) -> list[int]:
+    """Return the capacity of every vertex of the graph.
+
+    Raises:
+        ValueError: If a capacity is negative.
+    """
+    vertex_capacity = graph.num_vertex * [1]
+    for (x, b) in capacity.items():
+        if b < 0:
+            raise ValueError(f"Vertex {x} has negative capacity {b}")
+        if 0 <= x < graph.num_vertex:
+            vertex_capacity[x] = b
+    return vertex_capacity
+
+
+def _reduce_graph(
+        graph: GraphInfo,
+        vertex_capacity: list[int],
+        gadget_pairs: Optional[Set[tuple[int, int]]]
+        ) -> BMatchingReduction:
+    """Reduce a checked graph, see "reduce_b_matching()"."""
+
+    # Copies of vertex "x" are "copy_offset[x] .. copy_offset[x+1]-1".
+    copy_offset = [0]
+    vertex_origin: list[int] = []
+    for (x, b) in enumerate(vertex_capacity):
+        vertex_origin.extend(b * [x])
+        copy_offset.append(len(vertex_origin))
+    num_copy = len(vertex_origin)
+
+    max_weight = max(graph.edge_w, default=0)
+    gadget_weight = max_weight + 1
+
+    reduced: list[tuple[int, int, float]] = []
+    gadget_edge: list[tuple[int, int]] = []
+    excluded_edge: list[tuple[int, int, float]] = []
+    for (x, y, w) in zip(graph.edge_x, graph.edge_y, graph.edge_w):
+        if (vertex_capacity[x] == 0) or (vertex_capacity[y] == 0):
+            continue
+        x_copies = range(copy_offset[x], copy_offset[x+1])
+        y_copies = range(copy_offset[y], copy_offset[y+1])
+        if (vertex_capacity[x] == 1) or (vertex_capacity[y] == 1):
+            reduced.extend((p, q, 2 * w) for p in x_copies for q in y_copies)
+        elif ((gadget_pairs is not None)
+                and ((min(x, y), max(x, y)) not in gadget_pairs)):
+            excluded_edge.append((x, y, w))
+        else:
+            a = num_copy + 2 * len(gadget_edge)
+            b = a + 1
+            gadget_edge.append((x, y))
+            reduced.extend((p, a, w + gadget_weight) for p in x_copies)
+            reduced.append((a, b, 2 * gadget_weight))
+            reduced.extend((b, q, w + gadget_weight) for q in y_copies)
+
+    vertex_origin.extend(2 * len(gadget_edge) * [-1])
+
+    return BMatchingReduction(edges=reduced,
+                              vertex_origin=vertex_origin,
+                              gadget_edge=gadget_edge,
+                              gadget_weight=gadget_weight,
+                              excluded_edge=excluded_edge)
+
+
+def _initial_gadget_pairs(
+        graph: GraphInfo,
+        vertex_capacity: list[int]
+        ) -> set[tuple[int, int]]:
+    """Return the edges that get a gadget in the first solve of
+    "solve_maximum_weight_b_matching()".
+
+    These are the "2 * capacity[x]" heaviest edges from each vertex "x" to
+    other vertices of capacity 2 or more. With fewer edges, the first
+    dual solution tends to violate many of the excluded edges.
+
+    This function takes time O(m * log(b)), where "b" is the maximum
+    capacity of a vertex.
+    """
+    incident: list[list[tuple[float, int, int]]] = [
+        [] for _x in range(graph.num_vertex)]
+    for (x, y, w) in zip(graph.edge_x, graph.edge_y, graph.edge_w):
+        if (vertex_capacity[x] >= 2) and (vertex_capacity[y] >= 2):
+            pair = (min(x, y), max(x, y))
+            incident[x].append((w,) + pair)
+            incident[y].append((w,) + pair)
+
+    gadget_pairs: set[tuple[int, int]] = set()
+    for (x, edges) in enumerate(incident):
+        for (_w, p, q) in heapq.nlargest(2 * vertex_capacity[x], edges):
+            gadget_pairs.add((p, q))
+    return gadget_pairs
+
+
+def solve_maximum_weight_b_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        capacity: Mapping[int, int],
+        *,
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[SolverStats] = None
+        ) -> MatchingResult:
+    """Compute a maximum-weighted b-matching, adding gadgets to the reduced
+    problem only where the dual solution requires them.
+
+    The first solve has gadgets for the "2 * capacity[x]" heaviest edges
+    of each vertex "x".
+    Each further solve adds the gadgets reported by
+    "BMatchingReduction.violated_gadget_pairs()" and starts from the state
+    of the previous solve, see "BMatchingReduction.carry_over_state()".
+    The result is the same as for "maximum_weight_b_matching()".
+
+    The deadline applies to the whole computation. If it expires, the
+    result is a valid b-matching that is not necessarily optimal.
+
+    This function takes time O(n**3) in the size of the reduced problem
+    per solve. In the worst case, each solve adds one gadget.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        capacity: Maximum number of matched edges of each vertex.
+        max_workers: Maximum number of worker processes,
+            see "solve_maximum_weight_matching_by_component()".
+        deadline: Optional time limit, as a value of "time.monotonic()".
+        stats: Optional object to collect statistics of all solves.
+
+    Returns:
+        MatchingResult containing the pairs of the b-matching and the
+        primal and dual state of the final reduced problem.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+
+    graph = _make_graph(edges)
+    vertex_capacity = _vertex_capacity(graph, capacity)
+    gadget_pairs = _initial_gadget_pairs(graph, vertex_capacity)
+    reduction = _reduce_graph(graph, vertex_capacity, gadget_pairs)
+    warm_start = reduction.initial_state()
+
+    while True:
+        result = solve_maximum_weight_matching_by_component(
+            reduction.edges,
+            max_workers=max_workers,
+            warm_start=warm_start,
+            deadline=deadline,
+            stats=stats)
+        violated: set[tuple[int, int]] = set()
+        if result.optimal:
+            violated = reduction.violated_gadget_pairs(result.state)
+        if not violated:
+            return MatchingResult(pairs=reduction.restore(result.pairs),
+                                  state=result.state,
+                                  optimal=result.optimal)
+        gadget_pairs |= violated
+        previous = reduction
+        reduction = _reduce_graph(graph, vertex_capacity, gadget_pairs)
+        warm_start = reduction.carry_over_state(previous, result.state)
+
+
+def maximum_weight_b_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        capacity: Mapping[int, int]
+        ) -> list[tuple[int, int]]:
+    """Compute a maximum-weighted b-matching in the general undirected
+    weighted graph given by "edges".
+
+    Each vertex "x" is matched to at most "capacity[x]" other vertices,
+    and each pair of vertices is matched at most once. Vertices that do not
+    appear in "capacity" have capacity 1; if every vertex has capacity 1,
+    this is an ordinary maximum-weight matching.
+
+    The graph is specified as for "maximum_weight_matching()".
+
+    This function takes time O(n**3) in the size of the reduced problem,
+    see "reduce_b_matching()", per solve. Gadgets are only added where
+    the dual solution requires them, see "solve_maximum_weight_b_matching()".
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        capacity: Maximum number of matched edges of each vertex.
+
+    Returns:
+        List of pairs of matched vertex indices.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+    return solve_maximum_weight_b_matching(edges, capacity,
+                                           max_workers=1).pairs
+
+
+def adjust_weights_for_maximum_cardinality_b_matching(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        capacity: Mapping[int, int]
+        ) -> Union[Sequence[tuple[int, int, float]], EdgeArrays]:
+    """Adjust edge weights such that the maximum-weight b-matching of
+    the adjusted graph is a maximum-cardinality b-matching, equal to
+    a matching in the original graph that has maximum weight out of all
+    matchings with maximum cardinality.
+
+    This is the b-matching variant of
+    "adjust_weights_for_maximum_cardinality_matching()". A b-matching has
+    at most "sum(capacity) / 2" edges, so the weights are raised by
+    the weight range times the total capacity instead of the number
+    of vertices.
+
+    This function takes time O(n + m).
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        capacity: Maximum number of matched edges of each vertex.
+
+    Returns:
+        List of edges with adjusted weights, or a tuple of NumPy arrays if
+        the input was given as arrays. If no adjustments are necessary,
+        the input instance may be returned.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    if _is_edge_arrays(edges):
+        from .numpy_input import (
+            adjust_edge_arrays_for_maximum_cardinality_b_matching)
+        return adjust_edge_arrays_for_maximum_cardinality_b_matching(
+            edges, capacity)
+
+    _check_input_types(edges)
+    _check_input_graph(edges)
+
+    # Don't worry about empty graphs:
+    if not edges:
+        return edges
+
+    num_vertex = 1 + max(max(x, y) for (x, y, _w) in edges)
+    total_capacity = sum(capacity.get(x, 1) for x in range(num_vertex))
+
+    min_weight = min(w for (_x, _y, w) in edges)
+    max_weight = max(w for (_x, _y, w) in edges)
+
+    delta = _maximum_cardinality_delta(total_capacity, min_weight, max_weight)
+
+    # Do nothing if the weights already ensure a maximum-cardinality matching.
+    if delta is None:
+        return edges
+
+    return [(x, y, w + delta) for (x, y, w) in edges]
@@ -0,0 +1,240 @@
+"""
+Checkpoint and resume of a matching solve.
+
+A checkpoint stores the primal and dual state of a solve that was stopped
+early (see the "deadline" parameter of "solve_maximum_weight_matching()"),
+together with a fingerprint of the graph. A later process can load the
+checkpoint and pass its state as "warm_start" to continue the solve
+instead of starting from an empty matching.
+
+The state refers to vertices by index. When the vertices have external
+ids, the checkpoint can also store the id of each vertex. A later process
+whose vertices are listed in a different order, or whose graph has
+changed, can then use "remap_state()" to carry the state over to its own
+vertex indices.
+
+The checkpoint is a gzip-compressed JSON document. Integers and floating
+point numbers round-trip exactly, and the blossoms are stored with the
+edges of their alternating cycles, so a resumed solve of the same graph
+rebuilds the blossoms and continues from the same state as the solve
+that wrote the checkpoint (see "is_exact_resume()" in "warmstart.py").
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from .algorithm import GraphInfo, MatchingState, _make_graph
+from .warmstart import _fold_blossom_duals
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+# Version of the checkpoint format.
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint(NamedTuple):
+    """Contents of a checkpoint file."""
+
+    # Primal and dual state of the solve.
+    state: MatchingState
+
+    # Fingerprint of the graph that was being solved,
+    # or an empty string if unknown.
+    fingerprint: str
+
+    # External id of each vertex, or None if the ids were not saved.
+    vertex_ids: Optional[list[str]] = None
+
+
+def graph_fingerprint(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays, GraphInfo]
+        ) -> str:
+    """Return a fingerprint of the graph.
+
+    The graph is specified as for "maximum_weight_matching()", or as
+    a graph built by "build_graph()".
+
+    Two graphs have the same fingerprint if they have the same number of
+    vertices and the same edges with the same weights, in the same order.
+
+    This function takes time O(n + m).
+
+    Returns:
+        Hexadecimal SHA-256 digest.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+    graph = _make_graph(edges)
+    digest = hashlib.sha256()
+    digest.update(f"{graph.num_vertex} {graph.integer_weights}".encode())
+    digest.update(graph.edge_x.tobytes())
+    digest.update(graph.edge_y.tobytes())
+    digest.update(graph.edge_w.tobytes())
+    return digest.hexdigest()
+
+
+def save_checkpoint(
+        path: Union[str, os.PathLike[str]],
+        state: MatchingState,
+        fingerprint: str = "",
+        vertex_ids: Optional[Sequence[str]] = None
+        ) -> None:
+    """Write a checkpoint file.
+
+    The file is written to a temporary file first and then renamed,
+    so that a process that is killed while writing does not leave
+    a damaged checkpoint behind.
+
+    Parameters:
+        path: Name of the checkpoint file.
+        state: State of the solve, typically the "state" of a result
+            that was stopped by its deadline.
+        fingerprint: Optional fingerprint of the graph,
+            see "graph_fingerprint()".
+        vertex_ids: Optional external id of each vertex,
+            see "remap_state()".
+
+    Raises:
+        ValueError: If the number of ids does not match the state.
+    """
+    if (vertex_ids is not None) and (len(vertex_ids)
+                                     != len(state.vertex_mate)):
+        raise ValueError("Expecting one id per vertex")
+
+    doc = {
+        "version": CHECKPOINT_VERSION,
+        "fingerprint": fingerprint,
+        "vertex_mate": list(state.vertex_mate),
+        "vertex_dual_2x": list(state.vertex_dual_2x),
+        "vertex_blossom": list(state.vertex_blossom),
+        "blossom_parent": list(state.blossom_parent),
+        "blossom_dual": list(state.blossom_dual)}
+    if state.blossom_edges is not None:
+        doc["blossom_edges"] = [[[x, y] for (x, y) in edges]
+                                for edges in state.blossom_edges]
+    if vertex_ids is not None:
+        doc["vertex_ids"] = list(vertex_ids)
+    data = gzip.compress(
+        json.dumps(doc, separators=(",", ":")).encode(), mtime=0)
+
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Union[str, os.PathLike[str]]) -> Checkpoint:
+    """Read a checkpoint file.
+
+    Parameters:
+        path: Name of the checkpoint file.
+
+    Returns:
+        Checkpoint containing the state and the graph fingerprint.
+
+    Raises:
+        OSError: If the file can not be read.
+        ValueError: If the file is not a valid checkpoint.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    try:
+        doc = json.loads(gzip.decompress(data))
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid checkpoint file {path}") from exc
+
+    if (not isinstance(doc, dict)) or (doc.get("version")
+                                       != CHECKPOINT_VERSION):
+        raise ValueError(f"Unsupported checkpoint file {path}")
+
+    try:
+        blossom_edges = doc.get("blossom_edges")
+        if blossom_edges is not None:
+            blossom_edges = [[(x, y) for (x, y) in edges]
+                             for edges in blossom_edges]
+        state = MatchingState(vertex_mate=doc["vertex_mate"],
+                              vertex_dual_2x=doc["vertex_dual_2x"],
+                              vertex_blossom=doc["vertex_blossom"],
+                              blossom_parent=doc["blossom_parent"],
+                              blossom_dual=doc["blossom_dual"],
+                              blossom_edges=blossom_edges)
+        fingerprint = doc["fingerprint"]
+        vertex_ids = doc.get("vertex_ids")
+    except KeyError as exc:
+        raise ValueError(f"Incomplete checkpoint file {path}") from exc
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid checkpoint file {path}") from exc
+
+    num_vertex = len(state.vertex_mate)
+    num_blossom = len(state.blossom_parent)
+    if ((len(state.vertex_dual_2x) != num_vertex)
+            or (len(state.vertex_blossom) != num_vertex)
+            or (len(state.blossom_dual) != num_blossom)
+            or ((state.blossom_edges is not None)
+                and (len(state.blossom_edges) != num_blossom))
+            or ((vertex_ids is not None)
+                and (len(vertex_ids) != num_vertex))):
+        raise ValueError(f"Inconsistent checkpoint file {path}")
+
+    return Checkpoint(state=state,
+                      fingerprint=fingerprint,
+                      vertex_ids=vertex_ids)
+
+
+def remap_state(
+        state: MatchingState,
+        old_ids: Sequence[str],
+        new_ids: Sequence[str]
+        ) -> MatchingState:
+    """Carry a state over to a different numbering of the vertices.
+
+    Vertex "x" of the state has id "old_ids[x]"; vertex "y" of the result
+    has id "new_ids[y]". Vertices that keep their id keep their dual and,
+    if their mate also kept its id, their mate. Vertices with a new id
+    start with dual 0 and unmatched. Blossom duals are folded into the
+    vertex duals, so the result has no blossoms.
+
+    The result can be passed as "warm_start" to a solve of the graph with
+    vertex ids "new_ids". If that graph differs from the graph of the
+    original state, the warm start repairs the state as usual.
+
+    This function takes time O(n + k), where "k" is the number of blossoms.
+
+    Parameters:
+        state: State of a previous solve.
+        old_ids: External id of each vertex of the state.
+        new_ids: External id of each vertex of the new numbering.
+
+    Returns:
+        State with one entry per vertex of "new_ids".
+
+    Raises:
+        ValueError: If the number of old ids does not match the state.
+    """
+    if len(old_ids) != len(state.vertex_mate):
+        raise ValueError("Expecting one old id per vertex")
+
+    new_index = {vid: y for (y, vid) in enumerate(new_ids)}
+    old_to_new = [new_index.get(vid, -1) for vid in old_ids]
+    old_dual_2x = _fold_blossom_duals(state)
+
+    remapped = MatchingState.empty(len(new_ids))
+    for (x, y) in enumerate(old_to_new):
+        if y == -1:
+            continue
+        remapped.vertex_dual_2x[y] = old_dual_2x[x]
+        mate = state.vertex_mate[x]
+        if mate != -1:
+            remapped.vertex_mate[y] = old_to_new[mate]
+    return remapped
@@ -0,0 +1,505 @@
+"""
+Decomposition of a matching problem into connected components.
+
+A maximum-weight matching of a graph is the union of maximum-weight
+matchings of its connected components. Solving each component separately
+reduces the cost of each stage of the matching algorithm, and allows
+components to be solved in parallel worker processes.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from .algorithm import (GraphInfo, MatchingResult, MatchingState,
+                        _is_edge_arrays, _make_graph,
+                        solve_maximum_weight_matching)
+from .stats import SolverStats, StageStats
+from .warmstart import _fold_blossom_duals
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+# Edges of one component, as a list of tuples or as NumPy edge arrays.
+SubEdges = Union[list[tuple[int, int, float]], "EdgeArrays"]
+
+
+def connected_components(graph: GraphInfo) -> list[list[int]]:
+    """Partition the edges of the graph into connected components.
+
+    This function takes time O(n + m * alpha(n)).
+
+    Returns:
+        List of components, each component specified as a list of edge
+        indices in increasing order. Components are ordered by their
+        lowest edge index. Isolated vertices do not form a component.
+    """
+    (num_component, edge_component) = _edge_components(graph)
+    components: list[list[int]] = [[] for _c in range(num_component)]
+    for (e, c) in enumerate(edge_component):
+        components[c].append(e)
+    return components
+
+
+def _edge_components(graph: GraphInfo) -> tuple[int, array[int]]:
+    """Label each edge with the index of its connected component.
+
+    Components are numbered in order of their lowest edge index.
+
+    This function takes time O(n + m * alpha(n)).
+
+    Returns:
+        Tuple "(num_component, edge_component)".
+    """
+
+    # Union-find with path halving and union by size.
+    parent = list(range(graph.num_vertex))
+    size = graph.num_vertex * [1]
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for (x, y) in zip(graph.edge_x, graph.edge_y):
+        rx = find(x)
+        ry = find(y)
+        if rx != ry:
+            if size[rx] < size[ry]:
+                (rx, ry) = (ry, rx)
+            parent[ry] = rx
+            size[rx] += size[ry]
+
+    component_index: dict[int, int] = {}
+    edge_component = array("i")
+    for x in graph.edge_x:
+        r = find(x)
+        c = component_index.get(r)
+        if c is None:
+            c = len(component_index)
+            component_index[r] = c
+        edge_component.append(c)
+
+    return (len(component_index), edge_component)
+
+
+def _split_components(
+        graph: GraphInfo,
+        num_component: int,
+        edge_component: array[int]
+        ) -> _Components:
+    """Renumber the vertices of each component to consecutive indices.
+
+    This function takes time O(n + m).
+    """
+
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+    edge_w = graph.edge_w
+
+    components: list[list[int]] = [[] for _c in range(num_component)]
+    for (e, c) in enumerate(edge_component):
+        components[c].append(e)
+
+    vertices: list[int] = []
+    vertex_start = [0]
+    local_index = graph.num_vertex * [-1]
+    vertex_component = graph.num_vertex * [-1]
+    sub_x: list[int] = []
+    sub_y: list[int] = []
+    sub_w: list[float] = []
+    edge_start = [0]
+    for (c, component) in enumerate(components):
+        base = len(vertices)
+        for e in component:
+            x = edge_x[e]
+            y = edge_y[e]
+            for v in (x, y):
+                if local_index[v] == -1:
+                    local_index[v] = len(vertices) - base
+                    vertex_component[v] = c
+                    vertices.append(v)
+            sub_x.append(local_index[x])
+            sub_y.append(local_index[y])
+            sub_w.append(edge_w[e])
+        vertex_start.append(len(vertices))
+        edge_start.append(len(sub_x))
+
+    return _Components(vertices, vertex_start, local_index, vertex_component,
+                       (sub_x, sub_y, sub_w), edge_start)
+
+
+class _Components(NamedTuple):
+    """Subproblems for the connected components of a graph.
+
+    Component "c" consists of the vertices
+    "vertices[vertex_start[c]:vertex_start[c+1]]" and the edges
+    "edges[i][edge_start[c]:edge_start[c+1]]", with vertices renumbered
+    to consecutive local indices in order of first appearance.
+
+    The sequences are either lists, or NumPy arrays if the graph was
+    specified as NumPy edge arrays.
+    """
+    vertices: Sequence[int]
+    vertex_start: Sequence[int]
+    local_index: Sequence[int]
+    vertex_component: Sequence[int]
+    edges: tuple[Sequence[int], Sequence[int], Sequence[float]]
+    edge_start: Sequence[int]
+
+
+def maximum_weight_matching_by_component(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        *,
+        max_workers: Optional[int] = None,
+        min_parallel_edges: int = 10000
+        ) -> list[tuple[int, int]]:
+    """Compute a maximum-weighted matching by solving each connected
+    component of the graph separately.
+
+    The graph is specified as for "maximum_weight_matching()",
+    and the result is the same as the result of "maximum_weight_matching()".
+
+    Components with at least "min_parallel_edges" edges are solved in
+    a pool of worker processes if there are at least two such components.
+    Smaller components are solved in the calling process, since the cost
+    of sending them to a worker exceeds the cost of solving them.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)".
+        max_workers: Maximum number of worker processes.
+            Defaults to the number of CPUs. Specify 1 to solve all
+            components in the calling process.
+        min_parallel_edges: Minimum number of edges of a component
+            to solve it in a worker process.
+
+    Returns:
+        List of pairs of matched vertex indices.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+    return solve_maximum_weight_matching_by_component(
+        edges,
+        max_workers=max_workers,
+        min_parallel_edges=min_parallel_edges).pairs
+
+
+def solve_maximum_weight_matching_by_component(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays, GraphInfo],
+        *,
+        max_workers: Optional[int] = None,
+        min_parallel_edges: int = 10000,
+        warm_start: Optional[MatchingState] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[SolverStats] = None,
+        verify_sample: Optional[int] = None,
+        jump_start: bool = False
+        ) -> MatchingResult:
+    """Compute a maximum-weighted matching by solving each connected
+    component of the graph separately, and return the combined primal and
+    dual solution.
+
+    This is the variant of "maximum_weight_matching_by_component()" that
+    corresponds to "solve_maximum_weight_matching()". The deadline applies
+    to each component separately; the result is optimal only if every
+    component was solved before the deadline.
+
+    If "warm_start" is specified, it is split into a warm start for each
+    component. Each blossom goes with the component that contains it, so
+    that a solve of the same graph that was stopped by its deadline
+    resumes with its blossoms. If the blossoms do not fit the components
+    of the current graph, their duals are folded into the vertex duals
+    first, as "solve_maximum_weight_matching()" would do anyway.
+
+    If "stats" is specified, the stages of all components are added to it,
+    one component after another.
+
+    A connected graph is solved as it is, without renumbering its vertices.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)";
+            or a graph built by "build_graph()".
+        max_workers: Maximum number of worker processes.
+            Defaults to the number of CPUs. Specify 1 to solve all
+            components in the calling process.
+        min_parallel_edges: Minimum number of edges of a component
+            to solve it in a worker process.
+        warm_start: Optional state of a previous solution.
+        deadline: Optional time limit, as a value of "time.monotonic()".
+        stats: Optional object to collect statistics.
+        verify_sample: Optional number of edges to verify in each component,
+            see "solve_maximum_weight_matching()".
+        jump_start: True to start each component without a warm start
+            from a greedy matching, see "solve_maximum_weight_matching()".
+
+    Returns:
+        MatchingResult containing the list of matched pairs and the combined
+        primal and dual state of all components.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+
+    # Check the input and initialize graph representation.
+    graph = _make_graph(edges)
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+
+    (num_component, edge_component) = _edge_components(graph)
+    if num_component <= 1:
+        return solve_maximum_weight_matching(graph,
+                                             warm_start=warm_start,
+                                             deadline=deadline,
+                                             stats=stats,
+                                             verify_sample=verify_sample,
+                                             jump_start=jump_start)
+
+    # Build a subproblem for each component, with vertices renumbered
+    # to consecutive indices. Edge arrays are split with NumPy, so that
+    # a component is passed on as slices of arrays rather than as a list
+    # of tuples. A prepared graph is split with NumPy if it is loaded.
+    if _is_edge_arrays(edges) or (isinstance(edges, GraphInfo)
+                                  and ("numpy" in sys.modules)
+                                  and isinstance(graph.edge_w, array)):
+        from .numpy_input import split_edge_arrays_by_component
+        parts = split_edge_arrays_by_component(graph, num_component,
+                                               edge_component)
+        components = _Components(*parts)
+    else:
+        components = _split_components(graph, num_component, edge_component)
+    local_index = components.local_index
+    vertex_component = components.vertex_component
+    (sub_x, sub_y, sub_w) = components.edges
+
+    def component_vertices(c: int) -> list[int]:
+        (vstart, vend) = components.vertex_start[c:c+2]
+        vertices = components.vertices[vstart:vend]
+        return vertices if isinstance(vertices, list) else vertices.tolist()
+
+    def subproblem(c: int) -> tuple[list[int], SubEdges]:
+        (estart, eend) = components.edge_start[c:c+2]
+        sub_edges: SubEdges
+        if isinstance(sub_x, list):
+            sub_edges = list(zip(sub_x[estart:eend],
+                                 sub_y[estart:eend],
+                                 sub_w[estart:eend]))
+        else:
+            sub_edges = (sub_x[estart:eend],
+                         sub_y[estart:eend],
+                         sub_w[estart:eend])
+        return (component_vertices(c), sub_edges)
+
+    def num_edges(c: int) -> int:
+        return int(components.edge_start[c+1] - components.edge_start[c])
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    large = [c for c in range(num_component)
+             if num_edges(c) >= min_parallel_edges]
+    small = [c for c in range(num_component)
+             if num_edges(c) < min_parallel_edges]
+    if (max_workers < 2) or (len(large) < 2):
+        small = list(range(num_component))
+        large = []
+
+    # Solve the largest components first to balance the worker load.
+    large.sort(key=num_edges, reverse=True)
+
+    # Combine the solutions of the components, mapping vertex and blossom
+    # indices back to the full graph.
+    state = MatchingState.empty(graph.num_vertex)
+    optimal = True
+
+    def merge(
+            vertices: list[int],
+            solved: tuple[MatchingResult, Optional[list[StageStats]]]
+            ) -> None:
+        nonlocal optimal
+        (result, stages) = solved
+        if (stats is not None) and (stages is not None):
+            for stage in stages:
+                stats.add_stage(stage)
+        optimal = optimal and result.optimal
+        sub = result.state
+        offset = len(state.blossom_dual)
+        for (i, v) in enumerate(vertices):
+            y = sub.vertex_mate[i]
+            state.vertex_mate[v] = -1 if y == -1 else vertices[y]
+            state.vertex_dual_2x[v] = sub.vertex_dual_2x[i]
+            b = sub.vertex_blossom[i]
+            state.vertex_blossom[v] = -1 if b == -1 else b + offset
+        state.blossom_parent.extend(
+            -1 if b == -1 else b + offset for b in sub.blossom_parent)
+        state.blossom_dual.extend(sub.blossom_dual)
+        assert state.blossom_edges is not None
+        assert sub.blossom_edges is not None
+        state.blossom_edges.extend(
+            [(vertices[x], vertices[y]) for (x, y) in edges]
+            for edges in sub.blossom_edges)
+
+    # Split the warm start into a state for each component.
+    # Blossoms go with the component that contains them, so that a stopped
+    # solve of the same graph resumes with its blossoms. If the blossoms
+    # do not fit the components, their duals are folded instead.
+    warm_dual_2x: list[float] = []
+    component_blossoms: Optional[dict[int, list[int]]] = None
+    if warm_start is not None:
+        component_blossoms = _blossoms_by_component(
+            warm_start, graph.num_vertex, vertex_component)
+        if component_blossoms is None:
+            warm_dual_2x = _fold_blossom_duals(warm_start)
+        else:
+            warm_dual_2x = list(warm_start.vertex_dual_2x)
+
+    def split(vertices: list[int]) -> Optional[MatchingState]:
+        if warm_start is None:
+            return None
+        sub = MatchingState.empty(len(vertices))
+        for (i, v) in enumerate(vertices):
+            if v < len(warm_dual_2x):
+                y = warm_start.vertex_mate[v]
+                if ((0 <= y < graph.num_vertex)
+                        and (vertex_component[y] == vertex_component[v])):
+                    sub.vertex_mate[i] = int(local_index[y])
+                sub.vertex_dual_2x[i] = warm_dual_2x[v]
+        if component_blossoms is not None:
+            assert warm_start.blossom_edges is not None
+            blossoms = component_blossoms.get(
+                int(vertex_component[vertices[0]]), [])
+            local_blossom = {b: i for (i, b) in enumerate(blossoms)}
+            for (i, v) in enumerate(vertices):
+                b = warm_start.vertex_blossom[v]
+                sub.vertex_blossom[i] = -1 if b == -1 else local_blossom[b]
+            for b in blossoms:
+                p = warm_start.blossom_parent[b]
+                sub.blossom_parent.append(-1 if p == -1 else local_blossom[p])
+                sub.blossom_dual.append(warm_start.blossom_dual[b])
+                assert sub.blossom_edges is not None
+                sub.blossom_edges.append(
+                    [(int(local_index[x]), int(local_index[y]))
+                     for (x, y) in warm_start.blossom_edges[b]])
+        return sub
+
+    def solve_args(
+            vertices: list[int],
+            sub_edges: SubEdges
+            ) -> tuple[SubEdges, Optional[MatchingState], Optional[float],
+                       bool, Optional[int], bool]:
+        return (sub_edges, split(vertices), deadline, stats is not None,
+                verify_sample, jump_start)
+
+    if large:
+        with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(large))) as pool:
+            results = pool.map(
+                _solve_component,
+                (solve_args(*subproblem(c)) for c in large))
+            # Solve small components while the workers are busy.
+            for c in small:
+                (vertices, sub_edges) = subproblem(c)
+                merge(vertices,
+                      _solve_component(solve_args(vertices, sub_edges)))
+            for (c, solved) in zip(large, results):
+                merge(component_vertices(c), solved)
+    else:
+        for c in small:
+            (vertices, sub_edges) = subproblem(c)
+            merge(vertices,
+                  _solve_component(solve_args(vertices, sub_edges)))
+
+    pairs = [(x, y) for (x, y) in zip(edge_x, edge_y)
+             if state.vertex_mate[x] == y]
+    return MatchingResult(pairs=pairs, state=state, optimal=optimal)
+
+
+def _blossoms_by_component(
+        state: MatchingState,
+        num_vertex: int,
+        vertex_component: Sequence[int]
+        ) -> Optional[dict[int, list[int]]]:
+    """Group the blossoms of a state by the component that contains them.
+
+    Returns None if the blossoms can not be split along the components:
+    if the blossom edges are unknown, if the state does not have one entry
+    per vertex, or if a blossom or its cycle spans several components.
+
+    This function takes time O(n * d + k), where "k" is the number of
+    blossoms and "d" their maximum nesting depth.
+    """
+    num_blossom = len(state.blossom_parent)
+    if ((state.blossom_edges is None)
+            or (len(state.vertex_blossom) != num_vertex)
+            or (len(state.blossom_dual) != num_blossom)
+            or (len(state.blossom_edges) != num_blossom)):
+        return None
+
+    blossom_component = num_blossom * [-1]
+    for (v, b) in enumerate(state.vertex_blossom):
+        c = int(vertex_component[v])
+        steps = 0
+        while b != -1:
+            if (not (0 <= b < num_blossom)) or (steps > num_blossom):
+                return None
+            if blossom_component[b] == c:
+                break
+            if blossom_component[b] != -1:
+                return None
+            blossom_component[b] = c
+            b = state.blossom_parent[b]
+            steps += 1
+
+    component_blossoms: dict[int, list[int]] = {}
+    for (b, c) in enumerate(blossom_component):
+        if c == -1:
+            return None
+        for (x, y) in state.blossom_edges[b]:
+            if ((not (0 <= x < num_vertex)) or (not (0 <= y < num_vertex))
+                    or (vertex_component[x] != c)
+                    or (vertex_component[y] != c)):
+                return None
+        component_blossoms.setdefault(c, []).append(b)
+    return component_blossoms
+
+
+def _solve_component(
+        args: tuple[SubEdges,
+                    Optional[MatchingState],
+                    Optional[float],
+                    bool,
+                    Optional[int],
+                    bool]
+        ) -> tuple[MatchingResult, Optional[list[StageStats]]]:
+    """Solve one component, possibly in a worker process.
+
+    Statistics are collected in a new object, since the caller's object
+    can not be shared with a worker process.
+    """
+    (sub_edges, warm_start, deadline, collect_stats, verify_sample,
+     jump_start) = args
+    stats = SolverStats() if collect_stats else None
+    result = solve_maximum_weight_matching(sub_edges,
+                                           warm_start=warm_start,
+                                           deadline=deadline,
+                                           stats=stats,
+                                           verify_sample=verify_sample,
+                                           jump_start=jump_start)
+    return (result, None if stats is None else stats.stages)
@@ -631,4 +631,404 @@ class PriorityQueue(Generic[_ElemT]):
         assert self.heap[elem.index] is elem
         assert prio >= elem.prio
         elem.prio = prio
-        self._sift_down(elem.index)
\ No newline at end of file
+        self._sift_down(elem.index)
+
+
+class IndexedPriorityQueue:
+    """Priority queue of integer elements based on a binary heap.
+
+    Elements are integers in the range 0 .. size-1. Each element can be
+    in the queue at most once, and the element itself is used to delete it
+    or to change its priority. The queue does not allocate an object per
+    element: the heap is kept in a list of elements with a parallel list of
+    priorities, and the heap position of each element is kept in a list
+    indexed by element.
+
+    Several queues can share the same position list, as long as each
+    element is in at most one of these queues at a time.
+    """
+
+    __slots__ = ("heap", "heap_prio", "pos")
+
+    def __init__(
+            self,
+            size: int = 0,
+            share: Optional[IndexedPriorityQueue] = None
+            ) -> None:
+        """Initialize an empty queue.
+
+        Parameters:
+            size: Number of possible elements.
+            share: Optional queue whose position list this queue will share.
+                If specified, "size" is ignored.
+        """
+        self.heap: list[int] = []
+        self.heap_prio: list[float] = []
+        self.pos: list[int]
+        if share is None:
+            self.pos = size * [-1]
+        else:
+            self.pos = share.pos
+
+    def clear(self) -> None:
+        """Remove all elements from the queue.
+
+        This function takes time O(n).
+        """
+        pos = self.pos
+        for elem in self.heap:
+            pos[elem] = -1
+        self.heap.clear()
+        self.heap_prio.clear()
+
+    def empty(self) -> bool:
+        """Return True if the queue is empty."""
+        return (not self.heap)
+
+    def __contains__(self, elem: int) -> bool:
+        """Return True if the element is in this queue, or in any queue
+        that shares its position list."""
+        return self.pos[elem] != -1
+
+    def advance(self, floor: float) -> None:
+        """Declare that no priority less than "floor" will be inserted.
+
+        This does nothing. It exists for compatibility with
+        "RadixPriorityQueue".
+        """
+
+    def find_min(self) -> int:
+        """Return the minimum-priority element.
+
+        This function takes time O(1).
+        """
+        if not self.heap:
+            raise IndexError("Queue is empty")
+        return self.heap[0]
+
+    def min_prio(self) -> float:
+        """Return the minimum priority.
+
+        This function takes time O(1).
+        """
+        if not self.heap_prio:
+            raise IndexError("Queue is empty")
+        return self.heap_prio[0]
+
+    def get_prio(self, elem: int) -> float:
+        """Return the priority of an element in the queue."""
+        return self.heap_prio[self.pos[elem]]
+
+    def _sift_up(self, index: int, elem: int, prio: float) -> None:
+        """Place "elem" with priority "prio" at heap position "index",
+        then repair the heap along an ascending path to the root."""
+        heap = self.heap
+        heap_prio = self.heap_prio
+        pos = self.pos
+
+        while index > 0:
+            tpos = (index - 1) // 2
+            tprio = heap_prio[tpos]
+            if tprio <= prio:
+                break
+            telem = heap[tpos]
+            heap[index] = telem
+            heap_prio[index] = tprio
+            pos[telem] = index
+            index = tpos
+
+        heap[index] = elem
+        heap_prio[index] = prio
+        pos[elem] = index
+
+    def _sift_down(self, index: int, elem: int, prio: float) -> None:
+        """Place "elem" with priority "prio" at heap position "index",
+        then repair the heap along a descending path."""
+        heap = self.heap
+        heap_prio = self.heap_prio
+        pos = self.pos
+        num_elem = len(heap)
+
+        while True:
+            tpos = 2 * index + 1
+            if tpos >= num_elem:
+                break
+            tprio = heap_prio[tpos]
+
+            qpos = tpos + 1
+            if qpos < num_elem:
+                qprio = heap_prio[qpos]
+                if qprio <= tprio:
+                    tpos = qpos
+                    tprio = qprio
+
+            if tprio >= prio:
+                break
+
+            telem = heap[tpos]
+            heap[index] = telem
+            heap_prio[index] = tprio
+            pos[telem] = index
+            index = tpos
+
+        heap[index] = elem
+        heap_prio[index] = prio
+        pos[elem] = index
+
+    def insert(self, elem: int, prio: float) -> None:
+        """Insert a new element into the queue.
+
+        This function takes time O(log(n)).
+        """
+        assert self.pos[elem] == -1
+        self.heap.append(elem)
+        self.heap_prio.append(prio)
+        self._sift_up(len(self.heap) - 1, elem, prio)
+
+    def delete(self, elem: int) -> None:
+        """Delete the specified element from the queue.
+
+        This function takes time O(log(n)).
+        """
+        pos = self.pos
+        index = pos[elem]
+        assert self.heap[index] == elem
+        pos[elem] = -1
+
+        last_elem = self.heap.pop()
+        last_prio = self.heap_prio.pop()
+        if index < len(self.heap):
+            if last_prio < self.heap_prio[index]:
+                self._sift_up(index, last_elem, last_prio)
+            else:
+                self._sift_down(index, last_elem, last_prio)
+
+    def decrease_prio(self, elem: int, prio: float) -> None:
+        """Decrease the priority of an existing element in the queue.
+
+        This function takes time O(log(n)).
+        """
+        index = self.pos[elem]
+        assert self.heap[index] == elem
+        assert prio <= self.heap_prio[index]
+        self._sift_up(index, elem, prio)
+
+    def increase_prio(self, elem: int, prio: float) -> None:
+        """Increase the priority of an existing element in the queue.
+
+        This function takes time O(log(n)).
+        """
+        index = self.pos[elem]
+        assert self.heap[index] == elem
+        assert prio >= self.heap_prio[index]
+        self._sift_down(index, elem, prio)
+
+
+class RadixPriorityQueue:
+    """Monotone priority queue of integer elements with integer priorities,
+    based on a radix heap.
+
+    Elements are integers in the range 0 .. size-1, as in
+    "IndexedPriorityQueue", and the queue has the same interface.
+    In addition, priorities must be integers, and the queue must be told
+    a lower bound on all future priorities through "advance()". The lower
+    bound may only increase.
+
+    Each element is kept in a bucket, determined by the highest bit in
+    which its priority differs from a base value that is at most the lower
+    bound. Only the lowest bucket is kept in a binary heap. Elements in
+    higher buckets are inserted and deleted in time O(1); they are moved
+    to the heap when the heap runs empty, after rebasing the buckets on
+    the current lower bound.
+
+    Unlike in a classic radix heap, new priorities may be less than
+    the current minimum, as long as they are not less than the lower bound.
+    """
+
+    __slots__ = ("last", "floor", "low", "low_bucket", "buckets", "prio",
+                 "bucket", "slot", "num_elem")
+
+    # Value of "bucket[elem]" for elements that are not in the queue,
+    # and for elements in the heap.
+    _ABSENT = -1
+    _IN_HEAP = -2
+
+    def __init__(self, size: int = 0) -> None:
+        """Initialize an empty queue.
+
+        Parameters:
+            size: Number of possible elements.
+        """
+        # Base value of the bucket indices. This is a lower bound on
+        # all priorities in the queue.
+        self.last: int = 0
+
+        # Lower bound on all future priorities, see "advance()".
+        self.floor: int = 0
+
+        # Binary heap containing the elements whose priority differs from
+        # "last" in bit "low_bucket-1" or lower bits only.
+        self.low = IndexedPriorityQueue(size)
+        self.low_bucket = 0
+
+        # "buckets[i]" contains the elements whose priority differs from
+        # "last" in bit "i-1" and no higher bit, for "i > low_bucket".
+        self.buckets: list[list[int]] = [[]]
+
+        # For each element in the queue, its priority, and either its
+        # bucket and its position in the bucket, or "_IN_HEAP".
+        self.prio: list[int] = size * [0]
+        self.bucket: list[int] = size * [self._ABSENT]
+        self.slot: list[int] = size * [0]
+
+        self.num_elem = 0
+
+    def clear(self) -> None:
+        """Remove all elements from the queue.
+
+        This function takes time O(n).
+        """
+        bucket = self.bucket
+        for elem in self.low.heap:
+            bucket[elem] = self._ABSENT
+        self.low.clear()
+        for elems in self.buckets:
+            for elem in elems:
+                bucket[elem] = self._ABSENT
+            elems.clear()
+        self.num_elem = 0
+
+    def empty(self) -> bool:
+        """Return True if the queue is empty."""
+        return self.num_elem == 0
+
+    def __contains__(self, elem: int) -> bool:
+        """Return True if the element is in the queue."""
+        return self.bucket[elem] != self._ABSENT
+
+    def advance(self, floor: int) -> None:
+        """Declare that no priority less than "floor" will be inserted.
+
+        This function takes time O(1). The buckets are rebased on
+        the new lower bound when the heap runs empty.
+        """
+        assert floor >= self.floor
+        self.floor = floor
+
+    def _refill(self) -> None:
+        """Rebase the buckets on the lower bound and move the elements of
+        the lowest non-empty bucket into the heap."""
+        buckets = self.buckets
+        b = self.low_bucket + 1
+        while not buckets[b]:
+            b += 1
+
+        # All priorities in the lowest bucket share their bits above
+        # bit "b-1" with the old and new base value. Elements in higher
+        # buckets therefore keep their bucket index.
+        elems = buckets[b]
+        buckets[b] = []
+        last = self.floor
+        self.last = last
+        prio = self.prio
+        new_low = min((prio[elem] ^ last).bit_length() for elem in elems)
+        self.low_bucket = new_low
+        for elem in elems:
+            self._add(elem, prio[elem])
+
+    def _add(self, elem: int, prio: int) -> None:
+        """Put an element in the heap or in a bucket."""
+        b = (prio ^ self.last).bit_length()
+        if b <= self.low_bucket:
+            self.bucket[elem] = self._IN_HEAP
+            self.low.insert(elem, prio)
+        else:
+            buckets = self.buckets
+            while len(buckets) <= b:
+                buckets.append([])
+            elems = buckets[b]
+            self.bucket[elem] = b
+            self.slot[elem] = len(elems)
+            elems.append(elem)
+
+    def _remove(self, elem: int) -> None:
+        """Take an element out of the heap or out of its bucket."""
+        bucket = self.bucket
+        b = bucket[elem]
+        assert b != self._ABSENT
+        bucket[elem] = self._ABSENT
+        if b == self._IN_HEAP:
+            self.low.delete(elem)
+        else:
+            elems = self.buckets[b]
+            s = self.slot[elem]
+            moved = elems.pop()
+            if moved != elem:
+                elems[s] = moved
+                self.slot[moved] = s
+
+    def find_min(self) -> int:
+        """Return the minimum-priority element.
+
+        This function takes time O(1), plus time to refill the heap if it
+        is empty. Over the lifetime of the queue, each element moves to
+        a lower bucket at most once per bit of its priority.
+        """
+        if self.num_elem == 0:
+            raise IndexError("Queue is empty")
+        if self.low.empty():
+            self._refill()
+        return self.low.find_min()
+
+    def min_prio(self) -> int:
+        """Return the minimum priority.
+
+        This function takes the same time as "find_min()".
+        """
+        return self.prio[self.find_min()]
+
+    def get_prio(self, elem: int) -> int:
+        """Return the priority of an element in the queue."""
+        return self.prio[elem]
+
+    def insert(self, elem: int, prio: int) -> None:
+        """Insert a new element into the queue.
+
+        This function takes time O(1) if the element goes into a bucket,
+        or O(log(n)) if it goes into the heap.
+        """
+        assert self.bucket[elem] == self._ABSENT
+        assert prio >= self.floor
+        self.prio[elem] = prio
+        self._add(elem, prio)
+        self.num_elem += 1
+
+    def delete(self, elem: int) -> None:
+        """Delete the specified element from the queue.
+
+        This function takes time O(1) if the element is in a bucket,
+        or O(log(n)) if it is in the heap.
+        """
+        self._remove(elem)
+        self.num_elem -= 1
+
+    def decrease_prio(self, elem: int, prio: int) -> None:
+        """Decrease the priority of an existing element in the queue.
+
+        This function takes time O(log(n)).
+        """
+        assert prio <= self.prio[elem]
+        assert prio >= self.floor
+        self._remove(elem)
+        self.prio[elem] = prio
+        self._add(elem, prio)
+
+    def increase_prio(self, elem: int, prio: int) -> None:
+        """Increase the priority of an existing element in the queue.
+
+        This function takes time O(log(n)).
+        """
+        assert prio >= self.prio[elem]
+        self._remove(elem)
+        self.prio[elem] = prio
+        self._add(elem, prio)
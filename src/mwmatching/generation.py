@@ -0,0 +1,235 @@
+"""
+Maximum weight matching on a dense graph by edge generation.
+
+Many graphs are too dense to solve directly, but their maximum-weight
+matching only uses edges from a small candidate subgraph, for example
+the k nearest neighbors of each vertex. Edge generation solves the
+candidate subgraph, then checks the excluded edges against the dual
+solution. An excluded edge with negative slack could improve the matching;
+such edges are added to the subgraph and the solve is continued from
+the previous state. When no excluded edge has negative slack, the dual
+solution is feasible for the full graph, so the matching is a maximum-weight
+matching of the full graph.
+
+The full graph is never passed to the solver. It is only accessed through
+a function that returns the violated edges for a given dual solution.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from .algorithm import MatchingState, _make_graph
+from .components import solve_maximum_weight_matching_by_component
+from .stats import SolverStats
+
+if TYPE_CHECKING:
+    import numpy
+    from .numpy_input import EdgeArrays
+
+
+class EdgeGenerationResult(NamedTuple):
+    """Result of "solve_with_edge_generation()"."""
+
+    # List of pairs of matched vertex indices.
+    pairs: list[tuple[int, int]]
+
+    # Final primal and dual solution.
+    state: MatchingState
+
+    # True if the matching is a maximum-weight matching of the full graph,
+    # False if the algorithm stopped early because of a deadline or
+    # because the maximum number of rounds was reached.
+    optimal: bool
+
+    # Edges of the final subgraph: the candidate edges followed by
+    # the generated edges.
+    edges: list[tuple[int, int, float]]
+
+    # Number of solves, and number of edges added to the candidate edges.
+    num_rounds: int
+    num_added_edges: int
+
+
+def solve_with_edge_generation(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays],
+        find_violations: Callable[[MatchingState],
+                                  Sequence[tuple[int, int, float]]],
+        *,
+        max_rounds: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[SolverStats] = None
+        ) -> EdgeGenerationResult:
+    """Compute a maximum-weight matching of a full graph, starting from
+    a subgraph of candidate edges.
+
+    Each round solves the current subgraph, warm-started from the state
+    of the previous round, and calls "find_violations" with the result.
+    This function must return the edges of the full graph that have
+    negative slack under the dual solution (see
+    "MatchingState.edge_slack_2x()"); "find_violated_edges()" does this
+    for full graphs that can be computed in blocks. The edges are added
+    to the subgraph and the next round starts. The algorithm finishes
+    when no violated edges are left.
+
+    The candidate edges are specified as for "maximum_weight_matching()".
+    The full graph must contain every candidate edge with the same weight.
+
+    Each round takes the time of one warm-started solve plus the time
+    of "find_violations".
+
+    Parameters:
+        edges: List of candidate edges, each edge specified as a tuple
+            "(x, y, w)" where "x" and "y" are vertex indices and "w" is
+            the edge weight; or a tuple of NumPy arrays "(u, v, w)".
+        find_violations: Function that returns a list of violated edges
+            "(x, y, w)" of the full graph for a given state.
+        max_rounds: Optional maximum number of solves.
+        max_workers: Maximum number of worker processes,
+            see "solve_maximum_weight_matching_by_component()".
+        deadline: Optional time limit, as a value of "time.monotonic()".
+        stats: Optional object to collect statistics of all solves.
+
+    Returns:
+        EdgeGenerationResult containing the matched pairs and the final
+        primal and dual state.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+        MatchingError: If the matching algorithm fails.
+            This can only happen if there is a bug in the algorithm.
+    """
+
+    graph = _make_graph(edges)
+    current: list[tuple[int, int, float]] = list(
+        zip(graph.edge_x, graph.edge_y, graph.edge_w))
+    present: set[tuple[int, int]] = set(
+        (min(x, y), max(x, y)) for (x, y, _w) in current)
+
+    warm_start: Optional[MatchingState] = None
+    num_rounds = 0
+    num_added_edges = 0
+
+    while True:
+        result = solve_maximum_weight_matching_by_component(
+            current,
+            max_workers=max_workers,
+            warm_start=warm_start,
+            deadline=deadline,
+            stats=stats)
+        num_rounds += 1
+
+        added = 0
+        if result.optimal:
+            for (x, y, w) in find_violations(result.state):
+                pair = (min(x, y), max(x, y))
+                if (x != y) and (w > 0) and (pair not in present):
+                    present.add(pair)
+                    current.append((x, y, w))
+                    added += 1
+        num_added_edges += added
+
+        optimal = result.optimal and (added == 0)
+        if (optimal
+                or (not result.optimal)
+                or ((max_rounds is not None) and (num_rounds >= max_rounds))):
+            return EdgeGenerationResult(pairs=result.pairs,
+                                        state=result.state,
+                                        optimal=optimal,
+                                        edges=current,
+                                        num_rounds=num_rounds,
+                                        num_added_edges=num_added_edges)
+
+        warm_start = result.state
+
+
+def find_violated_edges(
+        state: MatchingState,
+        num_vertex: int,
+        weight_rows: Callable[[int, int], numpy.ndarray],
+        *,
+        block_size: int = 1024,
+        max_per_vertex: Optional[int] = None,
+        tolerance: float = 0
+        ) -> list[tuple[int, int, float]]:
+    """Return the edges of a full graph that have negative slack under
+    the dual solution in "state".
+
+    The full graph is given by a function "weight_rows(start, end)",
+    which returns a NumPy array of shape "(end - start, num_vertex)" with
+    the weights of the edges from vertices "start .. end-1" to all vertices.
+    Missing edges should have a negative weight.
+
+    Slacks are first computed from the vertex duals only. Since blossom duals
+    are non-negative, this is a lower bound on the slack. Only edges where
+    this bound is negative are checked exactly with
+    "MatchingState.edge_slack_2x()".
+
+    The dual solution of a sparse subgraph may leave many edges of the full
+    graph violated, most of which are not needed. With "max_per_vertex",
+    only the most violated edges of each vertex are returned. The result
+    is empty if and only if no edge is violated, so edge generation still
+    finishes with a maximum-weight matching of the full graph.
+
+    This function takes time O(n**2) plus the time of "weight_rows".
+
+    Parameters:
+        state: Primal and dual solution. Vertices beyond the length of
+            the state are treated as unmatched with zero dual.
+        num_vertex: Number of vertices in the full graph.
+        weight_rows: Function that returns a block of rows of
+            the weight matrix.
+        block_size: Number of rows to request at once.
+        max_per_vertex: Optional maximum number of edges "(x, y)" with
+            "x < y" to return for each vertex "x".
+        tolerance: Report only edges with slack below "-tolerance".
+            With floating point weights, this should be a small positive
+            number to ignore rounding errors.
+
+    Returns:
+        List of violated edges "(x, y, w)" with "x < y".
+    """
+
+    import numpy
+
+    num_known = len(state.vertex_dual_2x)
+    dual_2x = numpy.array(list(state.vertex_dual_2x[:num_vertex])
+                          + max(0, num_vertex - num_known) * [0])
+    column = numpy.arange(num_vertex)
+
+    violations: list[tuple[int, int, float]] = []
+    for start in range(0, num_vertex, block_size):
+        end = min(start + block_size, num_vertex)
+        w = weight_rows(start, end)
+        slack_2x = dual_2x[start:end, None] + dual_2x[None, :] - 2 * w
+        bound = ((slack_2x < -tolerance)
+                 & (column[None, :] > column[start:end, None]))
+        (rows, cols) = numpy.nonzero(bound)
+        if len(rows) == 0:
+            continue
+
+        # Visit the candidates of each row from the most violated bound.
+        order = numpy.lexsort((slack_2x[rows, cols], rows))
+        rows = rows[order]
+        cols = cols[order]
+        row_start = numpy.flatnonzero(numpy.r_[True, rows[1:] != rows[:-1]])
+        row_end = numpy.r_[row_start[1:], len(rows)]
+
+        for (p, q) in zip(row_start.tolist(), row_end.tolist()):
+            i = int(rows[p])
+            x = start + i
+            found = 0
+            for y in cols[p:q].tolist():
+                wxy = w[i, y].item()
+                if y < num_known:
+                    if state.edge_slack_2x(x, y, wxy) >= -tolerance:
+                        continue
+                violations.append((x, y, wxy))
+                found += 1
+                if (max_per_vertex is not None) and (found >= max_per_vertex):
+                    break
+
+    return violations
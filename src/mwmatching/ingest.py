@@ -0,0 +1,142 @@
+"""
+Single-pass ingestion of a stream of edges.
+
+Preparing a list of edges for the matching algorithm normally copies it
+several times: quantizing the weights, adjusting them for a maximum-
+cardinality matching, removing negative edges and checking for duplicate
+edges each build a new list of tuples. For a large graph, several such
+lists may be alive at the same time.
+
+"ingest_edges()" consumes an iterator of edges once, validates and
+transforms each edge as it arrives, and packs the result into compact
+typed arrays. The edge tuples are never stored. The result is returned
+as NumPy edge arrays that share memory with the typed arrays, and can be
+passed to all matching functions.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Optional
+
+from .algorithm import _check_edge_types, _maximum_cardinality_delta
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+def ingest_edges(
+        edges: Iterable[tuple[int, int, float]],
+        *,
+        resolution: Optional[float] = None,
+        maximum_cardinality: bool = False
+        ) -> EdgeArrays:
+    """Read a stream of edges into NumPy edge arrays.
+
+    Each edge is specified as a tuple "(x, y, w)" as for
+    "maximum_weight_matching()". The edges are read exactly once, so
+    "edges" may be a generator.
+
+    The weights are transformed as by "quantize_weights()" (if
+    "resolution" is given) and then
+    "adjust_weights_for_maximum_cardinality_matching()" (if
+    "maximum_cardinality" is True), but only one compact copy of the graph
+    is made. The edges differ from the result of those functions in one
+    respect: without "maximum_cardinality", edges whose (quantized) weight
+    is negative are dropped as they arrive. Such edges can never be part
+    of a maximum-weight matching, so the matching functions give the same
+    result for both, but the returned arrays may contain fewer edges than
+    the input.
+
+    The arrays share memory with compact typed arrays, which
+    "build_graph()" uses without copying.
+
+    This function requires NumPy.
+
+    This function takes time O(m * log(m)).
+
+    Parameters:
+        edges: Iterable of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight.
+        resolution: Optional positive weight difference that maps to 1,
+            see "quantize_weights()".
+        maximum_cardinality: True to adjust the weights such that
+            the maximum-weight matching has maximum cardinality.
+
+    Returns:
+        Tuple of NumPy arrays "(u, v, w)", with 64-bit integer weights
+        if all weights are integers and 64-bit floating point weights
+        otherwise.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints,
+            or if an integer weight does not fit in 64 bits.
+        TypeError: If the input contains invalid data types.
+    """
+
+    import numpy
+    from .numpy_input import check_edge_arrays
+
+    if resolution is not None:
+        if not (math.isfinite(resolution) and (resolution > 0)):
+            raise ValueError(
+                "Quantization resolution must be a positive number")
+
+    float_limit = sys.float_info.max / 4
+
+    edge_x = array("i")
+    edge_y = array("i")
+    edge_w = array("q")
+
+    for e in edges:
+        _check_edge_types(e, float_limit)
+        (x, y, w) = e
+
+        if resolution is not None:
+            w = round(w / resolution)
+
+        if (w < 0) and (not maximum_cardinality):
+            continue
+
+        if (x >= 2**31 - 1) or (y >= 2**31 - 1):
+            raise ValueError("Edge endpoints must be less than 2**31 - 1")
+
+        # Switch to floating point weights at the first non-integer weight.
+        if isinstance(w, float) and (edge_w.typecode == "q"):
+            edge_w = array("d", edge_w)
+
+        try:
+            edge_w.append(w)
+        except OverflowError:
+            raise ValueError("Edge weights exceed 64-bit range") from None
+
+        edge_x.append(x)
+        edge_y.append(y)
+
+    u = numpy.frombuffer(edge_x, dtype=numpy.intc)
+    v = numpy.frombuffer(edge_y, dtype=numpy.intc)
+    if edge_w.typecode == "q":
+        w_arr = numpy.frombuffer(edge_w, dtype=numpy.int64)
+    else:
+        w_arr = numpy.frombuffer(edge_w, dtype=numpy.float64)
+
+    # Check for self-edges and multi-edges.
+    check_edge_arrays((u, v, w_arr))
+
+    if maximum_cardinality and (len(w_arr) > 0):
+        num_vertex = 1 + int(max(u.max(), v.max()))
+        min_weight = w_arr.min().item()
+        max_weight = w_arr.max().item()
+        delta = _maximum_cardinality_delta(num_vertex, min_weight, max_weight)
+        if delta is not None:
+            if edge_w.typecode == "q":
+                if max_weight + delta > numpy.iinfo(numpy.int64).max:
+                    raise ValueError(
+                        "Adjusted edge weights exceed 64-bit range")
+            # Adjust the weights in place.
+            w_arr += delta
+
+    return (u, v, w_arr)
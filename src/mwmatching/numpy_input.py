@@ -0,0 +1,341 @@
+"""
+Vectorized input handling for graphs given as NumPy edge arrays.
+
+A graph may be passed to the matching functions as a tuple "(u, v, w)"
+of three one-dimensional NumPy arrays of equal length, where "u[e]" and
+"v[e]" are the vertex indices of edge "e" and "w[e]" is its weight.
+
+All checks in this module run as NumPy array operations instead of
+interpreted loops over Python tuples.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+import numpy
+
+if TYPE_CHECKING:
+    from .algorithm import GraphInfo
+
+
+EdgeArrays = tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+
+
+def is_edge_arrays(edges: object) -> bool:
+    """Return True if "edges" is a tuple of three NumPy arrays."""
+    return (isinstance(edges, tuple)
+            and len(edges) == 3
+            and all(isinstance(a, numpy.ndarray) for a in edges))
+
+
+def check_edge_arrays(edges: EdgeArrays) -> None:
+    """Check that the edge arrays describe a valid graph.
+
+    This performs the same checks as "_check_input_types()" and
+    "_check_input_graph()" for list input.
+
+    This function takes time O(m * log(m)).
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    (u, v, w) = edges
+
+    if u.ndim != 1 or v.ndim != 1 or w.ndim != 1:
+        raise TypeError("Edge arrays must be one-dimensional")
+
+    if not (len(u) == len(v) == len(w)):
+        raise ValueError("Edge arrays must have equal length")
+
+    if ((not numpy.issubdtype(u.dtype, numpy.integer))
+            or (not numpy.issubdtype(v.dtype, numpy.integer))):
+        raise TypeError("Edge endpoints must be integers")
+
+    if not (numpy.issubdtype(w.dtype, numpy.integer)
+            or numpy.issubdtype(w.dtype, numpy.floating)):
+        raise TypeError(
+            "Edge weights must be integers or floating point numbers")
+
+    if len(u) == 0:
+        return
+
+    if (u.min() < 0) or (v.min() < 0):
+        raise ValueError("Edge endpoints must be non-negative integers")
+
+    if max(u.max(), v.max()) >= 2**31 - 1:
+        raise ValueError("Edge endpoints must be less than 2**31 - 1")
+
+    if numpy.issubdtype(w.dtype, numpy.floating):
+        if not numpy.isfinite(w).all():
+            raise ValueError("Edge weights must be finite numbers")
+
+        # Check that the edge weights will not cause our dual variable
+        # calculations to exceed the valid floating point range.
+        float_limit = sys.float_info.max / 4
+        if w.max() > float_limit:
+            raise ValueError("Floating point edge weights must be"
+                             f" less than {float_limit:g}")
+
+    # Check that the graph has no self-edges.
+    if (u == v).any():
+        raise ValueError("Self-edges are not supported")
+
+    # Check that the graph does not have multi-edges.
+    lo = numpy.minimum(u, v)
+    hi = numpy.maximum(u, v)
+    order = numpy.lexsort((hi, lo))
+    lo = lo[order]
+    hi = hi[order]
+    dup = numpy.flatnonzero((lo[1:] == lo[:-1]) & (hi[1:] == hi[:-1]))
+    if len(dup) > 0:
+        i = dup[0]
+        raise ValueError(f"Duplicate edge {(int(lo[i]), int(hi[i]))}")
+
+
+def remove_negative_weight_edge_arrays(edges: EdgeArrays) -> EdgeArrays:
+    """Remove edges with negative weight."""
+    (u, v, w) = edges
+    keep = (w >= 0)
+    if keep.all():
+        return edges
+    return (u[keep], v[keep], w[keep])
+
+
+def adjust_edge_arrays_for_maximum_cardinality_matching(
+        edges: EdgeArrays
+        ) -> EdgeArrays:
+    """Array version of "adjust_weights_for_maximum_cardinality_matching()".
+
+    Returns:
+        Tuple of edge arrays with adjusted weights. If no adjustments are
+        necessary, the input tuple may be returned.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    (u, v, w) = edges
+    check_edge_arrays(edges)
+
+    # Don't worry about empty graphs:
+    if len(w) == 0:
+        return edges
+
+    num_vertex = 1 + int(max(u.max(), v.max()))
+    return _add_cardinality_delta(edges, num_vertex)
+
+
+def adjust_edge_arrays_for_maximum_cardinality_b_matching(
+        edges: EdgeArrays,
+        capacity: Mapping[int, int]
+        ) -> EdgeArrays:
+    """Array version of
+    "adjust_weights_for_maximum_cardinality_b_matching()".
+
+    Returns:
+        Tuple of edge arrays with adjusted weights. If no adjustments are
+        necessary, the input tuple may be returned.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    (u, v, w) = edges
+    check_edge_arrays(edges)
+
+    # Don't worry about empty graphs:
+    if len(w) == 0:
+        return edges
+
+    num_vertex = 1 + int(max(u.max(), v.max()))
+    total_capacity = sum(capacity.get(x, 1) for x in range(num_vertex))
+    return _add_cardinality_delta(edges, total_capacity)
+
+
+def _add_cardinality_delta(
+        edges: EdgeArrays,
+        num_vertex: int
+        ) -> EdgeArrays:
+    """Raise all weights by the delta of "_maximum_cardinality_delta()".
+
+    For a b-matching, "num_vertex" is the total capacity of all vertices.
+    """
+
+    from .algorithm import _maximum_cardinality_delta
+
+    (u, v, w) = edges
+
+    # Compute the adjustment with Python numbers to avoid integer overflow.
+    min_weight = w.min().item()
+    max_weight = w.max().item()
+
+    delta = _maximum_cardinality_delta(num_vertex, min_weight, max_weight)
+
+    # Do nothing if the weights already ensure a maximum-cardinality matching.
+    if delta is None:
+        return edges
+
+    if numpy.issubdtype(w.dtype, numpy.integer):
+        if max_weight + delta > numpy.iinfo(numpy.int64).max:
+            raise ValueError("Adjusted edge weights exceed 64-bit range")
+        return (u, v, w.astype(numpy.int64) + delta)
+
+    return (u, v, w + delta)
+
+
+def quantize_edge_arrays(
+        edges: EdgeArrays,
+        resolution: float
+        ) -> EdgeArrays:
+    """Array version of "quantize_weights()".
+
+    Returns:
+        Tuple of edge arrays with 64-bit integer weights.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints,
+            or if the quantized weights exceed the 64-bit range.
+        TypeError: If the input contains invalid data types.
+    """
+
+    (u, v, w) = edges
+    check_edge_arrays(edges)
+
+    scaled = numpy.rint(w / resolution)
+    if (len(w) > 0) and (numpy.abs(scaled).max() >= 2**62):
+        raise ValueError("Quantized edge weights exceed 64-bit range")
+    return (u, v, scaled.astype(numpy.int64))
+
+
+def graph_from_edge_arrays(edges: EdgeArrays) -> GraphInfo:
+    """Build the graph representation from edge arrays.
+
+    Arrays that are views of typed arrays, as returned by "ingest_edges()",
+    are used without copying. Other arrays are copied once into the compact
+    typed arrays of "GraphInfo", without creating Python objects per edge.
+    The adjacency lists are built with a vectorized sort.
+
+    This function takes time O(m * log(m)).
+    """
+
+    from .algorithm import GraphInfo
+
+    (u, v, w) = edges
+    num_edge = len(u)
+    num_vertex = (1 + int(max(u.max(), v.max()))) if num_edge else 0
+
+    integer_weights = bool(numpy.issubdtype(w.dtype, numpy.integer))
+    edge_x = _typed_array(u, "i")
+    edge_y = _typed_array(v, "i")
+    edge_w = _typed_array(w, "q" if integer_weights else "d")
+
+    # Sort edge endpoints by vertex, then by edge index, to obtain the
+    # same adjacency order as "GraphInfo.__init__()".
+    ends = numpy.concatenate((u, v)).astype(numpy.int32)
+    ids = numpy.concatenate((numpy.arange(num_edge, dtype=numpy.int32),) * 2)
+    order = numpy.lexsort((ids, ends))
+    degree = numpy.bincount(ends, minlength=num_vertex)
+    offset = numpy.zeros(num_vertex + 1, dtype=numpy.int64)
+    numpy.cumsum(degree, out=offset[1:])
+
+    return GraphInfo.from_arrays(
+        edge_x,
+        edge_y,
+        edge_w,
+        integer_weights,
+        num_vertex,
+        adjacency=(_typed_array(offset, "q"),
+                   _typed_array(ids[order], "i")))
+
+
+def _typed_array(a: numpy.ndarray, typecode: str) -> array:
+    """Return the values of a NumPy array as a typed array.
+
+    If "a" is a view of a whole typed array of the same type, that typed
+    array is returned. Otherwise the values are copied once.
+    """
+    base = a.base
+    if (isinstance(base, memoryview)
+            and isinstance(base.obj, array)
+            and (base.obj.typecode == typecode)
+            and (a.dtype == numpy.dtype(typecode))
+            and (a.nbytes == base.nbytes)
+            and a.flags.c_contiguous):
+        return base.obj
+    typed = array(typecode)
+    typed.frombytes(
+        memoryview(numpy.ascontiguousarray(a, dtype=typecode)).cast("B"))
+    return typed
+
+
+def split_edge_arrays_by_component(
+        graph: GraphInfo,
+        num_component: int,
+        edge_component: array[int]
+        ) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray,
+                   EdgeArrays, numpy.ndarray]:
+    """Group the edges of the graph by connected component, and renumber
+    the vertices of each component to consecutive local indices.
+
+    This is the vectorized counterpart of the subproblem construction in
+    "solve_maximum_weight_matching_by_component()". Each component is
+    a contiguous slice of the returned arrays, so it can be passed to the
+    matching functions without building a list of tuples.
+
+    This function takes time O(n + m * log(m)).
+
+    Returns:
+        Tuple "(vertices, vertex_start, local_index, vertex_component,
+        (u, v, w), edge_start)". Component "c" consists of the vertices
+        "vertices[vertex_start[c]:vertex_start[c+1]]", in order of first
+        appearance, and the edges "u[edge_start[c]:edge_start[c+1]]" etc.
+    """
+
+    comp = numpy.frombuffer(edge_component, dtype=numpy.intc)
+    if graph.integer_weights:
+        weights = numpy.frombuffer(graph.edge_w, dtype=numpy.int64)
+    else:
+        weights = numpy.frombuffer(graph.edge_w, dtype=numpy.float64)
+
+    # Group the edges by component, keeping edge order within a component.
+    order = numpy.argsort(comp, kind="stable")
+    comp = comp[order]
+    x = numpy.frombuffer(graph.edge_x, dtype=numpy.intc)[order]
+    y = numpy.frombuffer(graph.edge_y, dtype=numpy.intc)[order]
+    w = weights[order]
+    del order
+
+    edge_start = numpy.zeros(num_component + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(comp, minlength=num_component),
+                 out=edge_start[1:])
+
+    # List the vertices in order of first appearance. Since the edges are
+    # grouped by component, so are the vertices.
+    ends = numpy.stack((x, y), axis=1).ravel()
+    (_, first) = numpy.unique(ends, return_index=True)
+    first.sort()
+    vertices = ends[first].astype(numpy.intc)
+    del ends
+    first_component = comp[first // 2]
+    del first
+
+    vertex_start = numpy.zeros(num_component + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(first_component, minlength=num_component),
+                 out=vertex_start[1:])
+
+    local_index = numpy.full(graph.num_vertex, -1, dtype=numpy.intc)
+    local_index[vertices] = (numpy.arange(len(vertices))
+                             - vertex_start[first_component])
+    vertex_component = numpy.full(graph.num_vertex, -1, dtype=numpy.intc)
+    vertex_component[vertices] = first_component
+
+    return (vertices, vertex_start, local_index, vertex_component,
+            (local_index[x], local_index[y], w), edge_start)
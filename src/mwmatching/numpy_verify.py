@@ -0,0 +1,242 @@
+"""
+Vectorized verification of a maximum-weight matching.
+
+This module checks the same optimality conditions as "verify_optimum()"
+in "algorithm.py", but computes edge slacks as NumPy array operations.
+
+The slack of an edge depends on the duals of all blossoms that contain
+both of its endpoints. Those blossoms form a chain in the blossom tree,
+ending at the smallest blossom that contains the edge. The blossom tree is
+walked once to number the vertices and blossoms in depth-first order and
+to compute the sum of blossom duals from the root to each blossom.
+The smallest blossom of each edge is then found for all edges at once by
+binary lifting over the blossom tree.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Optional
+
+import numpy
+
+if TYPE_CHECKING:
+    from .algorithm import MatchingContext
+
+
+def verify_optimum_arrays(
+        ctx: MatchingContext,
+        sample_size: Optional[int] = None,
+        seed: int = 0
+        ) -> None:
+    """Verify that the optimum solution has been found.
+
+    With "sample_size", only a random sample of the unmatched edges is
+    checked for non-negative slack. All other checks still cover the whole
+    graph. A failed check proves that the solution is not optimal, but
+    a passed check on a sample does not prove that it is.
+
+    This function takes time O(n + m * log(d)) in NumPy operations,
+    where "d" is the maximum nesting depth of blossoms, and time O(n)
+    in Python code.
+
+    Parameters:
+        ctx: Matching context after "cleanup()".
+        sample_size: Optional number of edges to check for
+            non-negative slack.
+        seed: Seed for choosing the sample.
+
+    Raises:
+        MatchingError: If the solution is not optimal.
+    """
+
+    from .algorithm import MatchingError, NonTrivialBlossom
+
+    graph = ctx.graph
+    num_vertex = graph.num_vertex
+
+    edge_x = numpy.frombuffer(graph.edge_x, dtype=numpy.intc)
+    edge_y = numpy.frombuffer(graph.edge_y, dtype=numpy.intc)
+
+    # Slacks are sums of a few duals and weights. With large integer
+    # weights, use Python integers to avoid overflow.
+    edge_w: numpy.ndarray
+    if not graph.integer_weights:
+        edge_w = numpy.frombuffer(graph.edge_w, dtype=numpy.float64)
+    elif isinstance(graph.edge_w, array):
+        edge_w = numpy.frombuffer(graph.edge_w, dtype=numpy.int64)
+        if (len(edge_w) > 0) and (numpy.abs(edge_w).max() >= 2**60):
+            edge_w = edge_w.astype(object)
+    else:
+        edge_w = numpy.array(graph.edge_w, dtype=object)
+
+    mate = numpy.array(ctx.vertex_mate, dtype=numpy.int64)
+    dual_2x = numpy.array(ctx.vertex_dual_2x, dtype=edge_w.dtype)
+
+    # Check that the matching is symmetric.
+    matched = numpy.flatnonzero(mate != -1)
+    bad = matched[mate[mate[matched]] != matched]
+    if len(bad) > 0:
+        x = int(bad[0])
+        raise MatchingError("Verification failed:"
+                            f" asymmetric match of vertex {x}"
+                            f" and {int(mate[x])}")
+
+    # Check that each matched edge actually exists in the graph.
+    edge_matched = mate[edge_x] == edge_y
+    num_matched_edge = int(numpy.count_nonzero(edge_matched))
+    if len(matched) != 2 * num_matched_edge:
+        raise MatchingError(
+            f"Verification failed: {len(matched)} matched vertices"
+            f" inconsistent with {num_matched_edge} matched edges")
+
+    # Check that all dual variables are non-negative.
+    bad = numpy.flatnonzero(dual_2x < 0)
+    if len(bad) > 0:
+        x = int(bad[0])
+        raise MatchingError(
+            "Verification failed:"
+            f" vertex {x} has negative dual {ctx.vertex_dual_2x[x]/2}")
+
+    # Check that all unmatched vertices have zero dual.
+    bad = numpy.flatnonzero((mate == -1) & (dual_2x != 0))
+    if len(bad) > 0:
+        x = int(bad[0])
+        raise MatchingError(
+            f"Verification failed: Unmatched vertex {x}"
+            f" has non-zero dual {ctx.vertex_dual_2x[x]/2}")
+
+    # Walk the blossom tree.
+    # Blossoms are numbered from 1 in depth-first order; number 0 stands
+    # for the graph as a whole. Vertices are numbered in the order in which
+    # the walk reaches them, so the vertices of each blossom have
+    # consecutive numbers "blossom_first[b] .. blossom_end[b]-1".
+    # Blossom "b" contains blossoms "b .. blossom_last[b]".
+    vertex_pos = num_vertex * [0]
+    vertex_leaf = num_vertex * [0]
+    blossom_parent = [0]
+    blossom_first = [-1]
+    blossom_end = [num_vertex]
+    blossom_last = [0]
+    blossom_sum_dual: list[float] = [0]
+    next_pos = 0
+
+    for top in ctx.trivial_blossom:
+        if top.parent is not None:
+            continue
+        vertex_pos[top.base_vertex] = next_pos
+        next_pos += 1
+
+    for top in ctx.nontrivial_blossom:
+        if top.parent is not None:
+            continue
+        if top.dual_var < 0:
+            raise MatchingError("Verification failed:"
+                                f" negative blossom dual {top.dual_var}")
+        blossom_parent.append(0)
+        blossom_first.append(next_pos)
+        blossom_end.append(0)
+        blossom_last.append(0)
+        blossom_sum_dual.append(top.dual_var)
+        stack = [(top, len(blossom_parent) - 1, 0)]
+        while stack:
+            (blossom, b, p) = stack.pop()
+            if p == len(blossom.subblossoms):
+                blossom_end[b] = next_pos
+                blossom_last[b] = len(blossom_parent) - 1
+                continue
+            stack.append((blossom, b, p + 1))
+            sub = blossom.subblossoms[p]
+            if not isinstance(sub, NonTrivialBlossom):
+                vertex_pos[sub.base_vertex] = next_pos
+                vertex_leaf[sub.base_vertex] = b
+                next_pos += 1
+            else:
+                if sub.dual_var < 0:
+                    raise MatchingError(
+                        "Verification failed:"
+                        f" negative blossom dual {sub.dual_var}")
+                blossom_parent.append(b)
+                blossom_first.append(next_pos)
+                blossom_end.append(0)
+                blossom_last.append(0)
+                blossom_sum_dual.append(blossom_sum_dual[b] + sub.dual_var)
+                stack.append((sub, len(blossom_parent) - 1, 0))
+
+    num_blossom = len(blossom_parent)
+    pos = numpy.array(vertex_pos, dtype=numpy.int64)
+    leaf = numpy.array(vertex_leaf, dtype=numpy.int64)
+    first = numpy.array(blossom_first, dtype=numpy.int64)
+    end = numpy.array(blossom_end, dtype=numpy.int64)
+    last = numpy.array(blossom_last, dtype=numpy.int64)
+    sum_dual = numpy.array(blossom_sum_dual, dtype=edge_w.dtype)
+
+    # "up[k][b]" is the ancestor of blossom "b" at 2**k levels up,
+    # or 0 if there is no such ancestor.
+    up = [numpy.array(blossom_parent, dtype=numpy.int64)]
+    while (len(up) < 64) and numpy.any(up[-1] != 0):
+        up.append(up[-1][up[-1]])
+
+    def smallest_blossom(ex: numpy.ndarray,
+                         ey: numpy.ndarray) -> numpy.ndarray:
+        """Return the smallest blossom that contains both endpoints
+        of each edge, or 0."""
+        px = pos[ex]
+        py = pos[ey]
+        lo = numpy.minimum(px, py)
+        b = numpy.where(px < py, leaf[ey], leaf[ex])
+        # Blossom "b" contains the later endpoint. Its ancestors all do,
+        # and they contain the earlier endpoint if they start before it.
+        for k in range(len(up) - 1, -1, -1):
+            anc = up[k][b]
+            b = numpy.where(first[anc] > lo, anc, b)
+        return numpy.where(first[b] > lo, up[0][b], b)
+
+    # Check that all blossoms are full.
+    # A blossom is full if all except one of its vertices are matched
+    # to another vertex in the blossom.
+    if num_blossom > 1:
+        e_matched = numpy.flatnonzero(edge_matched)
+        count = numpy.bincount(
+            smallest_blossom(edge_x[e_matched], edge_y[e_matched]),
+            minlength=num_blossom)
+        count_sum = numpy.concatenate(([0], numpy.cumsum(count)))
+        num_matched = count_sum[last + 1] - count_sum[:-1]
+        num_vert = end - first
+        bad = numpy.flatnonzero(num_vert[1:] != 2 * num_matched[1:] + 1) + 1
+        if len(bad) > 0:
+            b = int(bad[0])
+            raise MatchingError(
+                "Verification failed: blossom non-full"
+                f" nvertex={int(num_vert[b])}"
+                f" nmatched={int(num_matched[b])}")
+
+    # Choose the edges to check. Matched edges are always checked.
+    check = numpy.arange(graph.num_edge)
+    if (sample_size is not None) and (sample_size < graph.num_edge):
+        rng = numpy.random.default_rng(seed)
+        sample = rng.choice(graph.num_edge, size=sample_size, replace=False)
+        check = numpy.union1d(sample, numpy.flatnonzero(edge_matched))
+
+    # Calculate the slack of each edge, including the duals of blossoms
+    # that contain the edge.
+    ex = edge_x[check]
+    ey = edge_y[check]
+    slack_2x = dual_2x[ex] + dual_2x[ey] - 2 * edge_w[check]
+    if num_blossom > 1:
+        slack_2x = slack_2x + 2 * sum_dual[smallest_blossom(ex, ey)]
+
+    # Check that all edges have non-negative slack.
+    bad = numpy.flatnonzero(slack_2x < 0)
+    if len(bad) > 0:
+        raise MatchingError(
+            f"Verification failed: negative edge slack {slack_2x[bad[0]]/2}")
+
+    # Check that all matched edges have zero slack.
+    bad = numpy.flatnonzero(edge_matched[check] & (slack_2x != 0))
+    if len(bad) > 0:
+        i = int(bad[0])
+        raise MatchingError(
+            "Verification failed:"
+            f" matched edge ({int(ex[i])}, {int(ey[i])})"
+            f" has slack {slack_2x[i]/2}")
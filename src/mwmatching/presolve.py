@@ -0,0 +1,280 @@
+"""
+Reduction of a matching problem before solving it.
+
+The presolve pass shrinks the graph with reductions that preserve
+the weight of the maximum-weight matching:
+
+ - Pendant folding: A vertex "v" with a single incident edge (v, u) of
+   weight "a" is removed, and "a" is subtracted from the weights of all
+   other edges of "u". Edges that end up with non-positive weight are
+   removed. In the reduced graph, matching "u" to another vertex "x"
+   is worth exactly what it gains over matching "u" to "v".
+   If all other edges of "u" are removed this way, the edge (u, v) is
+   a forced match. Repeated folding collapses chains of vertices that
+   hang off the rest of the graph.
+
+ - Reduced-cost fixing (optional): Edges that can not be part of any
+   maximum-weight matching are removed. An edge is removed if an upper
+   bound on the weight of any matching that contains it is less than
+   the weight of a greedy matching. This only removes edges when the
+   greedy matching is close to optimal, for example when a few heavy
+   edges dominate. In k-nearest-neighbor graphs, where edge weights
+   differ much less than the gap between greedy and optimal matching,
+   it rarely removes anything.
+
+The reductions are undone by "Presolve.restore()", which maps
+a maximum-weight matching of the reduced graph to a maximum-weight
+matching of the original graph.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, NamedTuple, Union
+
+from .algorithm import GraphInfo, _is_edge_arrays, _make_graph
+from .approx import greedy_matching
+
+if TYPE_CHECKING:
+    from .numpy_input import EdgeArrays
+
+
+class Presolve(NamedTuple):
+    """Result of "presolve()"."""
+
+    # Edges of the reduced graph, with the same vertex indices as
+    # the original graph, in the same form as the input. If nothing was
+    # reduced, this is the input instance itself.
+    edges: Union[list[tuple[int, int, float]], EdgeArrays, GraphInfo]
+
+    # Folded pendant vertices, in the order they were folded.
+    # Each entry "(v, u)" means that vertex "v" had only the neighbor "u".
+    folds: list[tuple[int, int]]
+
+    # Number of edges removed by reduced-cost fixing.
+    num_fixed_edges: int
+
+    def restore(
+            self,
+            pairs: Sequence[tuple[int, int]]
+            ) -> list[tuple[int, int]]:
+        """Map a matching of the reduced graph to the original graph.
+
+        If "pairs" is a maximum-weight matching of the reduced graph,
+        the result is a maximum-weight matching of the original graph.
+
+        This function takes time O(n).
+        """
+
+        mate: dict[int, int] = {}
+        for (x, y) in pairs:
+            mate[x] = y
+            mate[y] = x
+
+        # Undo the folds in reverse order. Vertex "u" is matched to its
+        # folded neighbor "v" unless it got a better mate.
+        restored = list(pairs)
+        for (v, u) in reversed(self.folds):
+            if u not in mate:
+                mate[u] = v
+                mate[v] = u
+                restored.append((v, u))
+        return restored
+
+
+def presolve(
+        edges: Union[Sequence[tuple[int, int, float]], EdgeArrays, GraphInfo],
+        *,
+        fix_edges: bool = False
+        ) -> Presolve:
+    """Reduce the graph before computing a maximum-weight matching.
+
+    The graph is specified as for "maximum_weight_matching()", or as
+    a graph built by "build_graph()".
+
+    This function takes time O(n + m * d), where "d" is the maximum vertex
+    degree, plus the time for one greedy matching if "fix_edges" is True.
+
+    Parameters:
+        edges: List of edges, each edge specified as a tuple "(x, y, w)"
+            where "x" and "y" are vertex indices and "w" is the edge weight;
+            or a tuple of NumPy arrays "(u, v, w)";
+            or a graph built by "build_graph()".
+        fix_edges: True to also apply reduced-cost fixing.
+
+    Returns:
+        Presolve containing the reduced graph and the information needed
+        to map its matching back to the original graph.
+
+    Raises:
+        ValueError: If the input does not satisfy the constraints.
+        TypeError: If the input contains invalid data types.
+    """
+
+    graph = _make_graph(edges)
+
+    # A graph without pendant vertices and without removable edges is
+    # returned as it is. This avoids building the adjacency maps for
+    # graphs such as k-nearest-neighbor graphs, where every vertex has
+    # at least "k" neighbors.
+    if isinstance(edges, GraphInfo):
+        num_input_edge = graph.num_edge
+    elif _is_edge_arrays(edges):
+        num_input_edge = len(edges[0])
+    else:
+        num_input_edge = len(edges)
+    offset = graph.adjacent_offset
+    if ((not fix_edges)
+            and (graph.num_edge == num_input_edge)
+            and all(w > 0 for w in graph.edge_w)
+            and all(offset[x+1] - offset[x] != 1
+                    for x in range(graph.num_vertex))):
+        return Presolve(edges=edges, folds=[], num_fixed_edges=0)
+
+    # "adjacent[x]" maps each neighbor of vertex "x" to the current weight
+    # of the edge between them.
+    adjacent: list[dict[int, float]] = [{} for _x in range(graph.num_vertex)]
+    for (x, y, w) in zip(graph.edge_x, graph.edge_y, graph.edge_w):
+        if w > 0:
+            adjacent[x][y] = w
+            adjacent[y][x] = w
+
+    folds: list[tuple[int, int]] = []
+    _fold_pendants(adjacent, range(graph.num_vertex), folds)
+
+    num_fixed_edges = 0
+    if fix_edges:
+        fixed = _fix_edges(adjacent, graph.integer_weights)
+        num_fixed_edges = len(fixed)
+        if fixed:
+            _fold_pendants(adjacent,
+                           [x for edge in fixed for x in edge],
+                           folds)
+
+    # Keep the reduced edges in the order of the original graph.
+    reduced_edges = ((x, y, adjacent[x][y])
+                     for (x, y) in zip(graph.edge_x, graph.edge_y)
+                     if y in adjacent[x])
+    reduced: Union[list[tuple[int, int, float]], EdgeArrays, GraphInfo]
+    if isinstance(edges, GraphInfo):
+        # Return a graph for a graph, with the same number of vertices.
+        reduced = _reduced_graph(graph, reduced_edges)
+    elif _is_edge_arrays(edges):
+        # Return edge arrays for edge arrays, without a list of tuples.
+        from .ingest import ingest_edges
+        reduced = ingest_edges(reduced_edges)
+    else:
+        reduced = list(reduced_edges)
+
+    return Presolve(edges=reduced,
+                    folds=folds,
+                    num_fixed_edges=num_fixed_edges)
+
+
+def _reduced_graph(
+        graph: GraphInfo,
+        reduced_edges: Iterable[tuple[int, int, float]]
+        ) -> GraphInfo:
+    """Pack the reduced edges into a graph representation."""
+    edge_x = array("i")
+    edge_y = array("i")
+    edge_w: Union[array[float], list[float]]
+    if isinstance(graph.edge_w, array):
+        edge_w = array(graph.edge_w.typecode)
+    else:
+        edge_w = []
+    for (x, y, w) in reduced_edges:
+        edge_x.append(x)
+        edge_y.append(y)
+        edge_w.append(w)
+    return GraphInfo.from_arrays(edge_x, edge_y, edge_w,
+                                 graph.integer_weights, graph.num_vertex)
+
+
+def _fold_pendants(
+        adjacent: list[dict[int, float]],
+        candidates: Sequence[int],
+        folds: list[tuple[int, int]]
+        ) -> None:
+    """Fold pendant vertices until none are left.
+
+    Only vertices in "candidates" and vertices whose degree drops
+    during folding are considered.
+    """
+
+    queue = [x for x in candidates if len(adjacent[x]) == 1]
+    while queue:
+        v = queue.pop()
+        if len(adjacent[v]) != 1:
+            continue
+
+        ((u, a), ) = adjacent[v].items()
+        del adjacent[v][u]
+        del adjacent[u][v]
+        folds.append((v, u))
+
+        # Matching "u" elsewhere now only gains its excess over "a".
+        adj_u = adjacent[u]
+        for x in list(adj_u):
+            w = adj_u[x] - a
+            if w > 0:
+                adj_u[x] = w
+                adjacent[x][u] = w
+            else:
+                del adj_u[x]
+                del adjacent[x][u]
+                if len(adjacent[x]) == 1:
+                    queue.append(x)
+        if len(adj_u) == 1:
+            queue.append(u)
+
+
+def _fix_edges(
+        adjacent: list[dict[int, float]],
+        integer_weights: bool
+        ) -> list[tuple[int, int]]:
+    """Remove edges that are not part of any maximum-weight matching.
+
+    Vertex duals "y" with "y[x] + y[z] >= w(x, z)" for every edge give
+    an upper bound: any matching that contains edge (x, z) has weight
+    at most "sum(y) - slack(x, z)". If that is less than the weight of
+    a greedy matching, the edge can not be part of an optimal matching.
+
+    Returns:
+        List of removed edges.
+    """
+
+    num_vertex = len(adjacent)
+    edges = [(x, z, w)
+             for x in range(num_vertex)
+             for (z, w) in adjacent[x].items()
+             if x < z]
+    if not edges:
+        return []
+
+    lower_bound = sum(adjacent[x][z] for (x, z) in greedy_matching(edges))
+
+    # Start from the trivially feasible duals "y[x] = max. edge weight",
+    # then lower each dual as far as the current duals of its neighbors
+    # allow.
+    dual = [max(adj.values(), default=0) for adj in adjacent]
+    for x in range(num_vertex):
+        dual[x] = max([0] + [w - dual[z] for (z, w) in adjacent[x].items()])
+    upper_bound = sum(dual)
+
+    # With floating point weights, keep a margin for rounding errors.
+    margin: float = 0
+    if not integer_weights:
+        margin = 1e-9 * upper_bound
+
+    fixed: list[tuple[int, int]] = []
+    threshold = upper_bound - lower_bound + margin
+    if math.isfinite(threshold):
+        for (x, z, w) in edges:
+            if dual[x] + dual[z] - w > threshold:
+                del adjacent[x][z]
+                del adjacent[z][x]
+                fixed.append((x, z))
+    return fixed
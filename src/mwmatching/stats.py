@@ -0,0 +1,237 @@
+"""
+Instrumentation of the matching algorithm.
+
+A "SolverStats" object passed to "solve_maximum_weight_matching()" collects
+counters for each stage of the algorithm: which delta steps were taken,
+how many blossoms were created and expanded, how many edges were scanned,
+how many priority queue operations were performed, and how long the stage
+took. This helps to explain why some graphs take much longer than others.
+
+Without a "SolverStats" object, the algorithm does not collect anything
+and runs at full speed.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Optional, TypeVar
+
+from .datastruct import (IndexedPriorityQueue, PriorityQueue,
+                         RadixPriorityQueue)
+
+
+_ElemT = TypeVar("_ElemT")
+
+
+class StageStats:
+    """Counters for one stage of the matching algorithm."""
+
+    def __init__(self) -> None:
+        # "delta_steps[t]" is the number of delta steps of type "t",
+        # for "t" from 1 to 4. Element 0 is not used.
+        self.delta_steps: list[int] = [0, 0, 0, 0, 0]
+
+        # Number of blossoms created and expanded.
+        self.blossoms_created: int = 0
+        self.blossoms_expanded: int = 0
+
+        # Number of edges scanned in "scan_new_s_vertices()".
+        self.edges_scanned: int = 0
+
+        # Number of insert, delete and change-priority operations on
+        # priority queues.
+        self.queue_ops: int = 0
+
+        # Wall time of the stage in seconds.
+        self.seconds: float = 0
+
+        # True if the stage augmented the matching (or released a vertex
+        # after a warm start), False if it was the final stage.
+        self.augmented: bool = False
+
+    def add(self, other: StageStats) -> None:
+        """Add the counters of another stage to this one."""
+        for t in range(1, 5):
+            self.delta_steps[t] += other.delta_steps[t]
+        self.blossoms_created += other.blossoms_created
+        self.blossoms_expanded += other.blossoms_expanded
+        self.edges_scanned += other.edges_scanned
+        self.queue_ops += other.queue_ops
+        self.seconds += other.seconds
+
+    def __repr__(self) -> str:
+        return (f"StageStats(delta_steps={self.delta_steps[1:]}, "
+                f"blossoms_created={self.blossoms_created}, "
+                f"blossoms_expanded={self.blossoms_expanded}, "
+                f"edges_scanned={self.edges_scanned}, "
+                f"queue_ops={self.queue_ops}, "
+                f"seconds={self.seconds:.6f})")
+
+
+class SolverStats:
+    """Per-stage statistics of a run of the matching algorithm."""
+
+    def __init__(
+            self,
+            on_stage: Optional[Callable[[int, StageStats], None]] = None
+            ) -> None:
+        """Initialize empty statistics.
+
+        Parameters:
+            on_stage: Optional function which is called at the end of
+                each stage with the stage number (starting at 0) and
+                the counters of that stage.
+        """
+        self.on_stage = on_stage
+
+        # Counters of completed stages.
+        self.stages: list[StageStats] = []
+
+        # Counters of the stage in progress.
+        self.current = StageStats()
+
+        self._stage_start: float = 0
+
+    def start_stage(self) -> None:
+        """Start timing the stage in progress.
+
+        Operations before the first stage, while the algorithm is set up,
+        are counted as part of the first stage.
+        """
+        self._stage_start = time.perf_counter()
+
+    def end_stage(self, augmented: bool) -> None:
+        """Finish the stage in progress and report it to the hook."""
+        stage = self.current
+        stage.seconds = time.perf_counter() - self._stage_start
+        stage.augmented = augmented
+        self.current = StageStats()
+        self.add_stage(stage)
+
+    def add_stage(self, stage: StageStats) -> None:
+        """Add a completed stage and report it to the hook.
+
+        This is used to combine statistics that were collected separately,
+        for example in worker processes.
+        """
+        self.stages.append(stage)
+        if self.on_stage is not None:
+            self.on_stage(len(self.stages) - 1, stage)
+
+    def totals(self) -> StageStats:
+        """Return the sum of the counters of all completed stages."""
+        total = StageStats()
+        for stage in self.stages:
+            total.add(stage)
+        total.augmented = any(stage.augmented for stage in self.stages)
+        return total
+
+    def new_queue(self) -> PriorityQueue:
+        """Return an empty priority queue that counts its operations."""
+        return _CountingPriorityQueue(self)
+
+    def new_indexed_queue(
+            self,
+            size: int = 0,
+            share: Optional[IndexedPriorityQueue] = None
+            ) -> IndexedPriorityQueue:
+        """Return an empty indexed priority queue that counts its
+        operations."""
+        return _CountingIndexedPriorityQueue(self, size, share)
+
+    def new_radix_queue(self, size: int = 0) -> RadixPriorityQueue:
+        """Return an empty radix priority queue that counts its
+        operations."""
+        return _CountingRadixPriorityQueue(self, size)
+
+
+class _CountingPriorityQueue(PriorityQueue[_ElemT]):
+    """Priority queue that counts its operations in "SolverStats"."""
+
+    __slots__ = ("stats", )
+
+    def __init__(self, stats: SolverStats) -> None:
+        super().__init__()
+        self.stats = stats
+
+    def insert(self, prio: float, data: _ElemT) -> PriorityQueue.Node:
+        self.stats.current.queue_ops += 1
+        return super().insert(prio, data)
+
+    def delete(self, elem: PriorityQueue.Node[_ElemT]) -> None:
+        self.stats.current.queue_ops += 1
+        super().delete(elem)
+
+    def decrease_prio(
+            self,
+            elem: PriorityQueue.Node[_ElemT],
+            prio: float
+            ) -> None:
+        self.stats.current.queue_ops += 1
+        super().decrease_prio(elem, prio)
+
+    def increase_prio(
+            self,
+            elem: PriorityQueue.Node[_ElemT],
+            prio: float
+            ) -> None:
+        self.stats.current.queue_ops += 1
+        super().increase_prio(elem, prio)
+
+
+class _CountingIndexedPriorityQueue(IndexedPriorityQueue):
+    """Indexed priority queue that counts its operations in "SolverStats"."""
+
+    __slots__ = ("stats", )
+
+    def __init__(
+            self,
+            stats: SolverStats,
+            size: int = 0,
+            share: Optional[IndexedPriorityQueue] = None
+            ) -> None:
+        super().__init__(size, share)
+        self.stats = stats
+
+    def insert(self, elem: int, prio: float) -> None:
+        self.stats.current.queue_ops += 1
+        super().insert(elem, prio)
+
+    def delete(self, elem: int) -> None:
+        self.stats.current.queue_ops += 1
+        super().delete(elem)
+
+    def decrease_prio(self, elem: int, prio: float) -> None:
+        self.stats.current.queue_ops += 1
+        super().decrease_prio(elem, prio)
+
+    def increase_prio(self, elem: int, prio: float) -> None:
+        self.stats.current.queue_ops += 1
+        super().increase_prio(elem, prio)
+
+
+class _CountingRadixPriorityQueue(RadixPriorityQueue):
+    """Radix priority queue that counts its operations in "SolverStats"."""
+
+    __slots__ = ("stats", )
+
+    def __init__(self, stats: SolverStats, size: int = 0) -> None:
+        super().__init__(size)
+        self.stats = stats
+
+    def insert(self, elem: int, prio: int) -> None:
+        self.stats.current.queue_ops += 1
+        super().insert(elem, prio)
+
+    def delete(self, elem: int) -> None:
+        self.stats.current.queue_ops += 1
+        super().delete(elem)
+
+    def decrease_prio(self, elem: int, prio: int) -> None:
+        self.stats.current.queue_ops += 1
+        super().decrease_prio(elem, prio)
+
+    def increase_prio(self, elem: int, prio: int) -> None:
+        self.stats.current.queue_ops += 1
+        super().increase_prio(elem, prio)
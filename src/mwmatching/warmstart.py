@@ -0,0 +1,452 @@
+"""
+Preparation of a warm start for the matching algorithm.
+
+A warm start begins from the matching and dual solution of a previous
+solve on a similar graph. That solution is repaired to obtain a starting
+point for the matching algorithm that satisfies the following conditions:
+ - all vertex duals are non-negative;
+ - all edges have non-negative slack;
+ - all matched edges have zero slack;
+ - if all edge weights are integers, all unmatched vertices have an even
+   vertex dual (times 2).
+
+Unlike a cold start, unmatched vertices may have different duals and
+matched vertices may have smaller duals than unmatched vertices.
+The matching algorithm handles this by tracking the minimum dual of
+all S-vertices (see "MatchingContext.release_s_vertex()").
+
+Because releasing a matched pair does not require any change of dual
+variables, repairs remain local to the part of the graph that changed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .algorithm import GraphInfo, MatchingState
+
+
+def _fold_blossom_duals(state: MatchingState) -> list[float]:
+    """Return vertex duals (times 2) with blossom duals folded in.
+
+    Adding the dual of a blossom to the 2x dual of each vertex in the blossom
+    and then removing the blossom preserves the slack of all edges inside
+    the blossom and only increases the slack of other edges.
+
+    This function takes time O(n + k), where "k" is the number of blossoms.
+    """
+
+    num_blossom = len(state.blossom_dual)
+
+    # "total[b]" is the sum of the duals of "b" and all its ancestors.
+    total: list[float | None] = num_blossom * [None]
+    for b in range(num_blossom):
+        chain = []
+        c = b
+        while (c != -1) and (total[c] is None):
+            chain.append(c)
+            c = state.blossom_parent[c]
+        acc = 0 if c == -1 else total[c]
+        for c in reversed(chain):
+            acc += state.blossom_dual[c]
+            total[c] = acc
+
+    dual_2x = list(state.vertex_dual_2x)
+    for (x, b) in enumerate(state.vertex_blossom):
+        if b != -1:
+            dual_2x[x] += total[b]
+    return dual_2x
+
+
+def prepare_warm_start(
+        graph: GraphInfo,
+        state: MatchingState
+        ) -> tuple[list[int], list[float]]:
+    """Derive a valid initial matching and dual solution from a previous
+    state.
+
+    Blossom duals are folded into the vertex duals.
+    Matched edges that no longer exist or are no longer tight are released.
+    Edges with negative slack are repaired by raising the dual of one of
+    their vertices, shifting dual from its mate if necessary.
+
+    This function takes time O(n + m * d), where "d" is the maximum
+    vertex degree. In practice, the time is O(n + m) since only edges
+    near changes in the graph need to be repaired.
+
+    Returns:
+        Tuple "(vertex_mate, vertex_dual_2x)".
+    """
+
+    num_vertex = graph.num_vertex
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+    edge_w = graph.edge_w
+    adjacent_offset = graph.adjacent_offset
+    adjacent_edge = graph.adjacent_edge
+    integer_weights = graph.integer_weights
+
+    # Pull vertex duals from the state.
+    # Vertices without a known dual start with dual 0.
+    # Negative duals are clamped to 0.
+    old_dual_2x = _fold_blossom_duals(state)
+    num_known = min(num_vertex, len(old_dual_2x))
+    dual_2x: list[float] = num_vertex * [0]
+    for x in range(num_known):
+        d = old_dual_2x[x]
+        if integer_weights and not isinstance(d, int):
+            d = math.ceil(d)
+        dual_2x[x] = max(d, 0)
+
+    # With floating point weights, folding blossom duals introduces
+    # rounding errors. Treat a tiny slack as zero slack.
+    tolerance: float = 0
+    if (not integer_weights) and (len(edge_w) > 0):
+        tolerance = 1e-9 * max(edge_w)
+
+    # Keep matched edges that still exist and have non-negative slack.
+    candidate_mate = num_vertex * [-1]
+    for x in range(num_known):
+        y = state.vertex_mate[x]
+        if (0 <= y < num_known) and (state.vertex_mate[y] == x):
+            candidate_mate[x] = y
+
+    mate = num_vertex * [-1]
+    loose_edges: list[int] = []
+    for (e, (x, y, w)) in enumerate(zip(edge_x, edge_y, edge_w)):
+        slack = dual_2x[x] + dual_2x[y] - 2 * w
+        if (candidate_mate[x] == y) and (slack >= -tolerance):
+            mate[x] = y
+            mate[y] = x
+            if slack > tolerance:
+                loose_edges.append(e)
+
+    def min_slack_2x(x: int, skip: int) -> float:
+        # Return the minimum slack of edges incident on "x",
+        # ignoring the edge to vertex "skip".
+        slack: float = math.inf
+        for e in adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]:
+            p = edge_x[e]
+            y = p if p != x else edge_y[e]
+            if y != skip:
+                slack = min(slack, dual_2x[x] + dual_2x[y] - 2 * edge_w[e])
+        return slack
+
+    def try_shift(x: int, y: int, d: float) -> bool:
+        # Try to add "d" to the dual of "x" and subtract "d" from the dual
+        # of its mate "y". This does not change the slack of edge (x, y).
+        if (dual_2x[y] >= d) and (min_slack_2x(y, x) >= d - tolerance):
+            dual_2x[x] += d
+            dual_2x[y] -= d
+            return True
+        return False
+
+    # Repair edges with negative slack.
+    # Raising the dual of a vertex can not cause negative slack elsewhere,
+    # so a single pass over all edges is sufficient.
+    for (x, y, w) in zip(edge_x, edge_y, edge_w):
+        d = 2 * w - dual_2x[x] - dual_2x[y]
+        if d <= tolerance:
+            continue
+        if mate[x] == -1:
+            dual_2x[x] += d
+        elif mate[y] == -1:
+            dual_2x[y] += d
+        elif not (try_shift(x, mate[x], d) or try_shift(y, mate[y], d)):
+            mate[mate[x]] = -1
+            mate[x] = -1
+            dual_2x[x] += d
+
+    # Make matched edges tight by lowering the dual of one of its vertices.
+    # This is typically the matched edge at the base of a blossom whose dual
+    # was folded into its vertices. If that is not possible, release the
+    # matched pair.
+    for e in loose_edges:
+        x = edge_x[e]
+        y = edge_y[e]
+        if mate[x] == y:
+            d = dual_2x[x] + dual_2x[y] - 2 * edge_w[e]
+            if d <= tolerance:
+                continue
+            if (dual_2x[x] >= d) and (min_slack_2x(x, y) >= d - tolerance):
+                dual_2x[x] -= d
+            elif (dual_2x[y] >= d) and (min_slack_2x(y, x) >= d - tolerance):
+                dual_2x[y] -= d
+            else:
+                mate[x] = -1
+                mate[y] = -1
+
+    # With integer weights, all S-vertices must keep the same parity
+    # to ensure that delta steps remain integral. Unmatched vertices
+    # become the roots of alternating trees, so give them an even dual.
+    if integer_weights:
+        for x in range(num_vertex):
+            if (mate[x] == -1) and (dual_2x[x] % 2 != 0):
+                dual_2x[x] += 1
+
+    return (mate, dual_2x)
+
+
+def _blossom_depth(blossom_parent: list[int]) -> Optional[list[int]]:
+    """Return the nesting depth of each blossom, where top-level blossoms
+    have depth 0, or None if the parent links do not form a forest.
+
+    This function takes time O(k), where "k" is the number of blossoms.
+    """
+
+    num_blossom = len(blossom_parent)
+    depth: list[Optional[int]] = num_blossom * [None]
+    for b in range(num_blossom):
+        chain = []
+        c = b
+        while c != -1:
+            if not (0 <= c < num_blossom) or (len(chain) > num_blossom):
+                return None
+            if depth[c] is not None:
+                break
+            chain.append(c)
+            c = blossom_parent[c]
+        d = -1 if c == -1 else depth[c]
+        assert d is not None
+        for c in reversed(chain):
+            d += 1
+            depth[c] = d
+    return [d for d in depth if d is not None]
+
+
+def is_exact_resume(graph: GraphInfo, state: MatchingState) -> bool:
+    """Return True if the state, including its blossoms, is a valid
+    starting point for the matching algorithm on this graph.
+
+    This is the case for the state of a solve of the same graph that was
+    stopped by its deadline. Such a state can be resumed as it is,
+    without folding the blossom duals or releasing matched edges,
+    so that the stages before the stop are not lost.
+
+    The state must have one entry per vertex of the graph and known
+    blossom edges. All duals must be non-negative, all edges must have
+    non-negative slack, and all matched edges and blossom edges must have
+    zero slack, counting the blossom duals. Each blossom must be an
+    alternating cycle over its sub-blossoms that agrees with the matching.
+    If all edge weights are integers, all duals must be integers and all
+    unmatched vertices with non-zero dual must have the same parity,
+    as the matching algorithm maintains.
+
+    This function takes time O(n + m * d), where "d" is the maximum
+    nesting depth of the blossoms.
+    """
+
+    num_vertex = graph.num_vertex
+    mate = state.vertex_mate
+    dual_2x = state.vertex_dual_2x
+    vertex_blossom = state.vertex_blossom
+    blossom_parent = state.blossom_parent
+    blossom_dual = state.blossom_dual
+    blossom_edges = state.blossom_edges
+    num_blossom = len(blossom_dual)
+
+    if ((blossom_edges is None)
+            or (len(mate) != num_vertex)
+            or (len(dual_2x) != num_vertex)
+            or (len(vertex_blossom) != num_vertex)
+            or (len(blossom_parent) != num_blossom)
+            or (len(blossom_edges) != num_blossom)):
+        return False
+
+    depth = _blossom_depth(blossom_parent)
+    if depth is None:
+        return False
+    if not all((-1 <= b < num_blossom) for b in vertex_blossom):
+        return False
+
+    # With floating point weights, the duals and recomputed slacks carry
+    # rounding errors. Treat a tiny value as zero.
+    tolerance: float = 0
+    if (not graph.integer_weights) and (graph.num_edge > 0):
+        tolerance = 1e-9 * max(graph.edge_w)
+
+    duals = itertools.chain(dual_2x, blossom_dual)
+    if graph.integer_weights:
+        if not all(isinstance(d, int) and (d >= 0) for d in duals):
+            return False
+    elif not all(d >= -tolerance for d in duals):
+        return False
+
+    # The matching must be symmetric.
+    for (x, y) in enumerate(mate):
+        if (y != -1) and not ((0 <= y < num_vertex) and (mate[y] == x)):
+            return False
+
+    # With integer weights, all S-vertices must keep the same parity.
+    if graph.integer_weights:
+        parities = {dual_2x[x] % 2 for x in range(num_vertex)
+                    if (mate[x] == -1) and (dual_2x[x] != 0)}
+        if len(parities) > 1:
+            return False
+
+    # Check each blossom, deepest first so that the base vertex of
+    # each sub-blossom is known.
+    base = num_blossom * [-1]
+    num_children = num_blossom * [0]
+    for b in vertex_blossom:
+        if b != -1:
+            num_children[b] += 1
+    for b in blossom_parent:
+        if b != -1:
+            num_children[b] += 1
+
+    def child(b: int, x: int) -> int:
+        # Return the sub-blossom of "b" that contains vertex "x", as "x"
+        # for a single vertex or "num_vertex + c" for blossom "c",
+        # or -1 if "x" is not in "b".
+        c = vertex_blossom[x]
+        if c == b:
+            return x
+        while (c != -1) and (blossom_parent[c] != b):
+            c = blossom_parent[c]
+        return -1 if c == -1 else num_vertex + c
+
+    def base_vertex(sub: int) -> int:
+        return sub if sub < num_vertex else base[sub - num_vertex]
+
+    tight_edges: set[tuple[int, int]] = set()
+    for b in sorted(range(num_blossom), key=depth.__getitem__, reverse=True):
+        edges = blossom_edges[b]
+        length = len(edges)
+        if (length < 3) or (length % 2 != 1) or (length != num_children[b]):
+            return False
+        subs = []
+        for (i, (x, y)) in enumerate(edges):
+            if not ((0 <= x < num_vertex) and (0 <= y < num_vertex)):
+                return False
+            sub = child(b, x)
+            if (sub == -1) or (child(b, edges[i - 1][1]) != sub):
+                return False
+            # Edges alternate between unmatched and matched, and the
+            # matched edges end at the base of their sub-blossoms.
+            if i % 2 == 1:
+                if (mate[x] != y) or (base_vertex(sub) != x):
+                    return False
+            else:
+                if mate[x] == y:
+                    return False
+                if (i > 0) and (base_vertex(sub) != edges[i - 1][1]):
+                    return False
+            subs.append(sub)
+            tight_edges.add((min(x, y), max(x, y)))
+        if len(set(subs)) != length:
+            return False
+        base[b] = base_vertex(subs[0])
+
+    # Sum of the duals of each blossom and its ancestors.
+    total: list[float] = num_blossom * [0]
+    for b in sorted(range(num_blossom), key=depth.__getitem__):
+        p = blossom_parent[b]
+        total[b] = blossom_dual[b] + (0 if p == -1 else total[p])
+
+    def common_dual(x: int, y: int) -> float:
+        # Sum of the duals of all blossoms that contain "x" and "y".
+        bx = vertex_blossom[x]
+        by = vertex_blossom[y]
+        while bx != by:
+            if (bx == -1) or (by == -1):
+                return 0
+            if depth[bx] >= depth[by]:
+                bx = blossom_parent[bx]
+            else:
+                by = blossom_parent[by]
+        return 0 if bx == -1 else total[bx]
+
+    num_matched = sum(1 for y in mate if y != -1)
+    num_matched_edges = 0
+    num_tight_edges = 0
+    for (x, y, w) in zip(graph.edge_x, graph.edge_y, graph.edge_w):
+        slack = dual_2x[x] + dual_2x[y] - 2 * w + 2 * common_dual(x, y)
+        if slack < -tolerance:
+            return False
+        is_matched = (mate[x] == y)
+        is_tight = ((min(x, y), max(x, y)) in tight_edges)
+        if (is_matched or is_tight) and (slack > tolerance):
+            return False
+        num_matched_edges += is_matched
+        num_tight_edges += is_tight
+
+    # All matched edges and blossom edges must exist in the graph.
+    return ((2 * num_matched_edges == num_matched)
+            and (num_tight_edges == len(tight_edges)))
+
+
+def greedy_start_state(graph: GraphInfo) -> MatchingState:
+    """Return a greedy matching of tight edges with a feasible dual
+    solution, to be used as a warm start.
+
+    Each vertex starts with the largest weight of its incident edges as
+    its dual (times 2), so every edge has non-negative slack. Vertices
+    are then visited in order of decreasing dual. The dual of each
+    unmatched vertex is lowered until one of its edges becomes tight,
+    and the vertex is matched along a tight edge to an unmatched vertex
+    if there is one.
+
+    Two vertices that are each other's heaviest neighbor are typically
+    matched this way. The matching algorithm then only runs stages to
+    fix the greedy solution, instead of one stage per matched edge.
+
+    This function takes time O(n * log(n) + m).
+
+    Returns:
+        MatchingState with a matching in which every matched edge has
+        zero slack, and non-negative vertex duals that give every edge
+        non-negative slack.
+    """
+
+    from .algorithm import MatchingState
+
+    num_vertex = graph.num_vertex
+    edge_x = graph.edge_x
+    edge_y = graph.edge_y
+    edge_w = graph.edge_w
+    adjacent_offset = graph.adjacent_offset
+    adjacent_edge = graph.adjacent_edge
+
+    dual_2x: list[float] = num_vertex * [0]
+    for (x, y, w) in zip(edge_x, edge_y, edge_w):
+        if w > dual_2x[x]:
+            dual_2x[x] = w
+        if w > dual_2x[y]:
+            dual_2x[y] = w
+
+    mate = num_vertex * [-1]
+    for x in sorted(range(num_vertex), key=dual_2x.__getitem__, reverse=True):
+        if mate[x] != -1:
+            continue
+
+        # Find the minimum slack of all edges of "x", and of the edges
+        # to unmatched vertices.
+        min_slack: float = math.inf
+        free_slack: float = math.inf
+        free_y = -1
+        for e in adjacent_edge[adjacent_offset[x]:adjacent_offset[x+1]]:
+            p = edge_x[e]
+            y = p if p != x else edge_y[e]
+            slack = dual_2x[x] + dual_2x[y] - 2 * edge_w[e]
+            min_slack = min(min_slack, slack)
+            if (mate[y] == -1) and (slack < free_slack):
+                free_slack = slack
+                free_y = y
+
+        # Lowering the dual of "x" only changes the slack of its own edges.
+        d = min(min_slack, dual_2x[x])
+        dual_2x[x] -= d
+        if (free_y != -1) and (free_slack == d):
+            mate[x] = free_y
+            mate[free_y] = x
+
+    return MatchingState(vertex_mate=mate,
+                         vertex_dual_2x=dual_2x,
+                         vertex_blossom=num_vertex * [-1],
+                         blossom_parent=[],
+                         blossom_dual=[],
+                         blossom_edges=[])
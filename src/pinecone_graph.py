@@ -1,7 +1,12 @@
 import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
 from typing import TypeVar, Union, Iterable, Optional, Set, Tuple
+import numpy
 from pinecone.grpc import PineconeGRPC, GRPCClientConfig, PineconeGrpcFuture
 from dotenv import load_dotenv
+from .knn import normalize_rows, top_k_unit_neighbours
 
 load_dotenv()
 
@@ -17,13 +22,31 @@ class PineconeGraph:
 		)
 		self.id_to_index: dict[str, int] = {}
 		self.index_to_id: list[str] = []
+		self.query_latencies: list[float] = []
+		self.has_values = False
+		self.unit_vectors = None
 
-	def build(self):
+	def build(self, include_values: bool = True):
+		# include_values=True copies each page of values into one float32 matrix of unit rows (4 bytes per
+		# dimension) and then drops them from the nodes, so no one's values are kept as Python floats.
+		# include_values=False skips the matrix, for when nothing ranks neighbours locally
+		# (local=False edges, no certified matching)
 		# index_host = self.client.describe_index(name=self.index_name).host
 		# self.index = self.client.Index(host=index_host, grpc_config=GRPCClientConfig(secure=False))
 		self.index = self.client.Index(name=self.index_name)
 
-		self.vectors = self.get_all_entries()
+		self.vectors = []
+		self.unit_vectors = None
+		matrix = None
+		for chunk in self.iter_entries(include_values=include_values):
+			if include_values and chunk:
+				matrix = self._store_rows(matrix, len(self.vectors), chunk)
+				for vec in chunk:
+					vec.values = []
+			self.vectors.extend(chunk)
+		if matrix is not None:
+			self.unit_vectors = normalize_rows(matrix[:len(self.vectors)])
+		self.has_values = include_values
 
 		# establish mappings between external ids and local indices
 		self.id_to_index = {vec.id: idx for idx, vec in enumerate(self.vectors)}
@@ -35,12 +58,132 @@ class PineconeGraph:
 		self,
 		top_k: Optional[int] = None,
 		forbidden_pairs: Optional[Set[Tuple[str, str]]] = None,
+		local: bool = False,
+		memory_limit: int = 256 * 2**20,
+		max_in_flight: int = 16,
 	):
-		edges = []
+		return list(self.iter_edges(top_k, forbidden_pairs, local, memory_limit, max_in_flight))
 
+	def iter_edges(
+		self,
+		top_k: Optional[int] = None,
+		forbidden_pairs: Optional[Set[Tuple[str, str]]] = None,
+		local: bool = False,
+		memory_limit: int = 256 * 2**20,
+		max_in_flight: int = 16,
+	):
+		# Same edges as edges(), yielded as they come in so ingest_edges() can pack them without a list.
+		# local ranks the neighbours from the downloaded vectors (see knn.py) instead of one Pinecone query
+		# per person; memory_limit caps the bytes of each block of similarities it ranks.
+		# Otherwise up to max_in_flight Pinecone queries are sent at once
+		forbidden_idx = self.forbidden_index_pairs(forbidden_pairs)
+
+		requested_top_k = (max(1, top_k) if top_k is not None else max(1, min(50, len(self.id_to_index) - 1)))
+
+		if local and not self.has_values:
+			raise ValueError("Ranking neighbours locally needs build(include_values=True)")
+		if local:
+			neighbours = self._local_neighbours(requested_top_k, memory_limit)
+		else:
+			neighbours = self._pinecone_neighbours(requested_top_k, max_in_flight)
+
+		for i, matches in neighbours:
+			for match_index, score in matches:
+				lo, hi = (i, match_index) if i < match_index else (match_index, i)
+				if lo == hi:
+					continue
+				# Skip forbidden pairs (order-insensitive)
+				if (lo, hi) in forbidden_idx:
+					continue
+				# Only add edge in one direction to avoid duplicates
+				if i < match_index:
+					yield (i, match_index, score)
+
+	def _pinecone_neighbours(self, top_k: int, max_in_flight: int):
+		# One query per person with up to max_in_flight of them pending or answered but not yet yielded;
+		# yields (index, [(neighbour index, score), ...]). Answers are parsed as they arrive but yielded in
+		# index order, so the edge list (and the checkpoint fingerprint) doesn't depend on network timing.
+		# The seconds from sending each query to its answer go to query_latencies
+		max_in_flight = max(1, max_in_flight)
+		self.query_latencies = []
+		pending: dict = {}
+		answered: dict[int, list] = {}
+
+		def send(i: int, vecy):
+			started = time.perf_counter()
+			# By id: Pinecone already has the vector, no need to ship its 3072 floats back
+			future = self.index.query(
+				id=vecy.id,
+				top_k=top_k,
+				include_metadata=False,
+				async_req=True,
+			)
+			# The callback runs on the gRPC thread the moment the answer arrives, or right away if it already has
+			future.add_done_callback(lambda _future: self.query_latencies.append(time.perf_counter() - started))
+			pending[future] = (i, vecy.id)
+
+		def collect():
+			done, _ = wait(pending, return_when=FIRST_COMPLETED)
+			for future in done:
+				i, vid = pending.pop(future)
+				answered[i] = self._known_matches(vid, future.result().matches)
+
+		next_i = 0
+		for i, vecy in enumerate(self.vectors):
+			while len(pending) + len(answered) >= max_in_flight:
+				collect()
+				while next_i in answered:
+					yield next_i, answered.pop(next_i)
+					next_i += 1
+			send(i, vecy)
+		while pending:
+			collect()
+			while next_i in answered:
+				yield next_i, answered.pop(next_i)
+				next_i += 1
+
+	def _known_matches(self, vid: str, matches):
+		# Skip self-matches and ids we don't know about
 		id_to_index = self.id_to_index
+		return [(id_to_index[match.id], match.score) for match in matches if match.id != vid and match.id in id_to_index]
+
+	def query_latency_summary(self) -> dict[str, float]:
+		# Of the Pinecone queries behind the last edges() call
+		latencies = sorted(self.query_latencies)
+		if not latencies:
+			return {"queries": 0}
+		return {
+			"queries": len(latencies),
+			"mean": sum(latencies) / len(latencies),
+			"p50": latencies[len(latencies) // 2],
+			"p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+			"max": latencies[-1],
+		}
 
+	def _local_neighbours(self, top_k: int, memory_limit: int):
+		# Exact top_k by cosine similarity over the vectors we already hold; a query's top_k includes the person
+		# themselves, so rank one fewer to get the same neighbours
+		indices, scores = top_k_unit_neighbours(self.unit_vectors, top_k - 1, memory_limit)
+		for i, (row, row_scores) in enumerate(zip(indices.tolist(), scores.tolist())):
+			yield i, list(zip(row, row_scores))
+
+	def _store_rows(self, matrix: Optional[numpy.ndarray], start: int, chunk) -> numpy.ndarray:
+		# Copies a page of values into the float32 matrix at row start, so the whole export only ever holds
+		# one page as Python floats. The matrix is sized from the index stats and doubles if more arrive
+		rows = numpy.array([vec.values for vec in chunk], dtype=numpy.float32)
+		if matrix is None:
+			expected = self.index.describe_index_stats()["total_vector_count"]
+			matrix = numpy.empty((max(expected, len(rows)), rows.shape[1]), dtype=numpy.float32)
+		if start + len(rows) > len(matrix):
+			grown = numpy.empty((max(2 * len(matrix), start + len(rows)), matrix.shape[1]), dtype=numpy.float32)
+			grown[:start] = matrix[:start]
+			matrix = grown
+		matrix[start:start + len(rows)] = rows
+		return matrix
+
+	def forbidden_index_pairs(self, forbidden_pairs: Optional[Set[Tuple[str, str]]]) -> Set[Tuple[int, int]]:
 		# normalize forbidden pairs to index pairs for quick filtering
+		id_to_index = self.id_to_index
 		forbidden_idx: Set[Tuple[int, int]] = set()
 		if forbidden_pairs:
 			for a_id, b_id in forbidden_pairs:
@@ -49,59 +192,49 @@ class PineconeGraph:
 					bi = id_to_index[b_id]
 					if ai != bi:
 						forbidden_idx.add((ai, bi) if ai < bi else (bi, ai))
+		return forbidden_idx
 
-		requested_top_k = (max(1, top_k) if top_k is not None else max(1, min(50, len(id_to_index) - 1)))
+	def vector_matrix(self):
+		# One float32 unit row per local index, for computing similarities without querying Pinecone
+		if not self.has_values:
+			raise ValueError("vector_matrix() needs build(include_values=True)")
+		if self.unit_vectors is None:
+			return numpy.empty((0, 0), dtype=numpy.float32)
+		return self.unit_vectors
 
-		for i, vecy in enumerate(self.vectors):
-			matches = self.gimme(self.index.query(
-				vector=vecy.values,
-				top_k=requested_top_k,
-				include_metadata=False,
-			)).matches
+	def get_all_entries(self, include_values: bool = True):
+		return [vec for chunk in self.iter_entries(include_values=include_values) for vec in chunk]
 
-			# Create edges from matches
-			for match in matches:
-				# Skip self-matches
-				if match.id == vecy.id:
-					continue
-				
-				# Find the index of the matched vector
-				if match.id in id_to_index:
-					match_index = id_to_index[match.id]
-					lo, hi = (i, match_index) if i < match_index else (match_index, i)
-					if lo == hi:
-						continue
-					# Skip forbidden pairs (order-insensitive)
-					if (lo, hi) in forbidden_idx:
-						continue
-					# Only add edge in one direction to avoid duplicates
-					if i < match_index:
-						edges.append((i, match_index, match.score))
-		
-		return edges
-
-	def get_all_entries(self):
+	def iter_entries(self, page_size: int = 100, max_in_flight: int = 4, include_values: bool = True):
 		"""
-		You can't actually grab everything out of Pinecone. You can hack it with a big ol'
-		query tho. BIG NOTE THO, this only works for up to 10000 entries.
+		Pages through every id in the index and yields the vectors (values and metadata) one page
+		at a time, in listing order. A zero-vector query caps out at 10000 entries, so ids are
+		listed and then fetched in batches instead. At most max_in_flight fetches are pending at once.
+		fetch always sends the values; without include_values they are dropped page by page, so
+		they never pile up in memory.
 		"""
-		stats = self.index.describe_index_stats()
-		dimension = stats["dimension"]
-		dummy_vector = [0.0] * dimension
+		pending: deque = deque()
+		for ids in self.index.list(limit=page_size):
+			pending.append((ids, self.index.fetch(ids=ids, async_req=True)))
+			if len(pending) >= max_in_flight:
+				yield self._fetched_chunk(*pending.popleft(), include_values)
+		while pending:
+			yield self._fetched_chunk(*pending.popleft(), include_values)
 
-		response = self.gimme(self.index.query(
-			vector=dummy_vector,
-			top_k=10000,
-			include_values=True,
-			include_metadata=True
-		))
-
-		return response["matches"]
+	def _fetched_chunk(self, ids, future, include_values: bool):
+		# fetch returns a dict keyed by id; ids deleted since listing are simply absent
+		fetched = self.gimme(future).vectors
+		chunk = [fetched[vid] for vid in ids if vid in fetched]
+		if not include_values:
+			for vec in chunk:
+				vec.values = []
+		return chunk
 
 	def load_pairs(self) -> Set[Tuple[str, str]]:
 		existing_pairs: Set[Tuple[str, str]] = set()
 		for vec in self.vectors:
-			past = vec.metadata.get("pastPairings") or []
+			# fetch leaves metadata as None for vectors that have none
+			past = (vec.metadata or {}).get("pastPairings") or []
 			for partner_id in past:
 				# Coda doesn't wanna insert empty list, so we ignore id 0
 				if partner_id == "0" or partner_id == 0:
@@ -109,30 +242,36 @@ class PineconeGraph:
 				existing_pairs.add((vec.id, partner_id))
 		return existing_pairs
 
-	def add_pairs(self, pairs: Iterable[Tuple[str, str]]) -> int:
+	def load_capacities(self, field: str = "matchesWanted") -> dict[int, int]:
+		# How many matches each person wants, by local index; people without the field want one
+		capacity: dict[int, int] = {}
+		for idx, vec in enumerate(self.vectors):
+			wanted = (vec.metadata or {}).get(field)
+			if wanted is not None and int(wanted) != 1:
+				capacity[idx] = max(0, int(wanted))
+		return capacity
+
+	def add_pairs(self, pairs: Iterable[Tuple[str, str]], max_in_flight: int = 16) -> int:
 		partners_to_add: dict[str, set[str]] = {}
 		for a, b in pairs:
 			partners_to_add.setdefault(a, set()).add(b)
 			partners_to_add.setdefault(b, set()).add(a)
 
-		payload = []
+		# update only touches the metadata field we set, so the values don't need to be sent back
+		pending = set()
 		for vid, additions in partners_to_add.items():
 			idx = self.id_to_index.get(vid)
 			vec = self.vectors[idx]
-			metadata = dict(getattr(vec, "metadata", {}) or {})
-			past = list(metadata.get("pastPairings") or [])
-			metadata["pastPairings"] = list({*past, *additions})
-			payload.append({
-				"id": vid,
-				"values": getattr(vec, "values", []),
-				"metadata": metadata,
-			})
-
-		if not payload:
-			return 0
-
-		self.index.upsert(vectors=payload)
-		return len(payload)
+			past = list((getattr(vec, "metadata", {}) or {}).get("pastPairings") or [])
+			pending.add(self.index.update(id=vid, set_metadata={"pastPairings": list({*past, *additions})}, async_req=True))
+			if len(pending) >= max_in_flight:
+				done, pending = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					future.result()
+		for future in pending:
+			future.result()
+
+		return len(partners_to_add)
 
 	# I dunno why I need this, maybe temporary?
 	def gimme(self, thing: Union[T, PineconeGrpcFuture]) -> T:
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from src.knn import normalize_rows, top_k_neighbours, top_k_unit_neighbours
+
+
+@pytest.mark.parametrize("memory_limit", [1, 2000, 256 * 2**20])
+def test_top_k_neighbours_matches_brute_force(memory_limit):
+	rng = np.random.default_rng(5)
+	vectors = rng.normal(size=(57, 16))
+	vectors[3] = 0
+	unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-300)
+	similarity = unit @ unit.T
+	np.fill_diagonal(similarity, -np.inf)
+
+	# A memory limit of 1 byte still ranks one row at a time
+	indices, scores = top_k_neighbours(vectors, 6, memory_limit)
+	assert indices.shape == scores.shape == (57, 6)
+	for i in range(57):
+		if i == 3:
+			continue
+		assert indices[i].tolist() == np.argsort(-similarity[i], kind="stable")[:6].tolist()
+		assert scores[i] == pytest.approx(similarity[i, indices[i]], abs=1e-5)
+		assert i not in indices[i]
+
+
+def test_top_k_neighbours_caps_k_at_the_other_rows():
+	indices, scores = top_k_neighbours(np.eye(3), 50)
+	assert indices.shape == (3, 2)
+	assert top_k_neighbours(np.eye(1), 50)[0].shape == (1, 0)
+
+
+def test_normalize_rows_scales_in_place():
+	rng = np.random.default_rng(7)
+	vectors = rng.normal(size=(20, 8))
+	vectors[4] = 0
+	matrix = vectors.astype(np.float32)
+	assert normalize_rows(matrix) is matrix
+	norms = np.linalg.norm(matrix, axis=1)
+	assert norms[4] == 0
+	assert np.delete(norms, 4) == pytest.approx(1, abs=1e-6)
+
+	# Ranking rows normalized ahead of time gives the same neighbours
+	indices, scores = top_k_unit_neighbours(matrix, 5, 2000)
+	expected_indices, expected_scores = top_k_neighbours(vectors, 5, 2000)
+	assert np.delete(indices, 4, axis=0).tolist() == np.delete(expected_indices, 4, axis=0).tolist()
+	assert scores == pytest.approx(expected_scores, abs=1e-6)
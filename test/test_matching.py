@@ -1,5 +1,8 @@
 import math
-from src.matching import optimal_matching
+import os
+import numpy as np
+import pytest
+from src.matching import optimal_matching, certified_matching
 
 
 def test_maximum_cardinality_even_complete_graph():
@@ -58,3 +61,126 @@ def test_isolated_node_without_negative_edges():
 	assert 3 not in used
 
 
+
+
+def test_approximate_modes_return_valid_matchings():
+	edges = [(i, j, float(100 - abs(i - j))) for i in range(6) for j in range(i + 1, 6)]
+	for mode in ("greedy", "path_growing"):
+		pairs = optimal_matching(edges, mode=mode)
+		assert len(pairs) == 3
+		assert len({v for pair in pairs for v in pair}) == 6
+		refined = optimal_matching(edges, mode=mode, refine_seconds=1.0)
+		assert len({v for pair in refined for v in pair}) == 6
+
+
+def test_unknown_mode_is_rejected():
+	with pytest.raises(ValueError):
+		optimal_matching([(0, 1, 1.0)], mode="fastest")
+
+
+def test_expired_deadline_still_returns_valid_matching():
+	edges = [(i, j, float(100 - abs(i - j))) for i in range(6) for j in range(i + 1, 6)]
+	pairs = optimal_matching(edges, deadline=0)
+	used = [v for pair in pairs for v in pair]
+	assert len(used) == len(set(used))
+
+
+def test_stopped_solve_resumes_from_checkpoint(tmp_path):
+	edges = [(i, j, float(100 - abs(i - j))) for i in range(6) for j in range(i + 1, 6)]
+	path = str(tmp_path / "checkpoint.json.gz")
+	optimal_matching(edges, deadline=0, checkpoint_path=path)
+	assert os.path.exists(path)
+	pairs = optimal_matching(edges, checkpoint_path=path)
+	assert len(pairs) == 3
+	assert not os.path.exists(path)
+
+
+def test_deadline_limited_runs_resume_to_the_cold_optimum(tmp_path, monkeypatch):
+	# Each run gets two stages before its deadline, like a weekly run that always hits its time budget
+	edges = [(12, 9, 42), (8, 10, 43), (0, 12, 38), (1, 6, 30), (0, 11, 21), (10, 12, 12), (10, 2, 34), (15, 12, 40), (7, 14, 7), (0, 9, 32), (4, 1, 1), (15, 0, 31), (6, 7, 48), (10, 5, 22), (15, 14, 49), (8, 2, 33), (6, 11, 16), (5, 7, 35), (12, 8, 38), (6, 16, 11), (15, 11, 42), (5, 6, 47), (5, 15, 40), (0, 4, 14), (6, 0, 40)]
+	path = str(tmp_path / "checkpoint.json.gz")
+	for _run in range(20):
+		ticks = iter(range(1_000_000))
+		monkeypatch.setattr("src.mwmatching.algorithm.time.monotonic", lambda: next(ticks))
+		pairs = optimal_matching(edges, deadline=2, checkpoint_path=path)
+		if not os.path.exists(path):
+			break
+	monkeypatch.undo()
+	assert not os.path.exists(path)
+	weight = {(min(x, y), max(x, y)): w for (x, y, w) in edges}
+	total = lambda ps: sum(weight[min(p), max(p)] for p in ps)
+	assert total(pairs) == total(optimal_matching(edges))
+
+
+def test_checkpoint_follows_vertex_ids_to_new_indices(tmp_path):
+	edges = [(i, j, float(100 - abs(i - j))) for i in range(6) for j in range(i + 1, 6)]
+	path = str(tmp_path / "checkpoint.json.gz")
+	optimal_matching(edges, deadline=0, checkpoint_path=path, vertex_ids=list("abcdef"))
+	# Listed in reverse on the next run, so the graph's fingerprint no longer matches
+	reversed_edges = [(5 - j, 5 - i, w) for (i, j, w) in edges]
+	pairs = optimal_matching(reversed_edges, checkpoint_path=path, vertex_ids=list("fedcba"))
+	weight = {(i, j): w for (i, j, w) in reversed_edges}
+	assert len(pairs) == 3
+	total = lambda ps: sum(weight[min(p), max(p)] for p in ps)
+	assert total(pairs) == total(optimal_matching(reversed_edges))
+	assert not os.path.exists(path)
+
+
+def test_weight_resolution_keeps_cosine_matching():
+	edges = [(0, 1, 0.91), (0, 2, 0.42), (1, 3, 0.77), (2, 3, 0.88), (1, 2, 0.35)]
+	assert sorted(optimal_matching(edges, weight_resolution=1e-6)) == sorted(optimal_matching(edges))
+
+
+def test_certified_matching_is_optimal_on_full_similarity_graph():
+	rng = np.random.default_rng(3)
+	vectors = rng.normal(size=(41, 8))
+	unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+	similarity = unit @ unit.T
+	forbidden = {(0, 1), (2, 5), (7, 30)}
+	# Sparse candidates: each vertex's 3 nearest neighbors, one direction only, like PineconeGraph.edges
+	edges = []
+	for i in range(41):
+		for j in np.argsort(-similarity[i])[1:4]:
+			if i < j and (i, int(j)) not in forbidden:
+				edges.append((i, int(j), float(similarity[i, j])))
+	full = [(i, j, float(similarity[i, j])) for i in range(41) for j in range(i + 1, 41) if (i, j) not in forbidden]
+
+	pairs = certified_matching(vectors, edges, forbidden, block_size=8)
+	expected = optimal_matching(full)
+	assert len(pairs) == len(expected) == 20
+	assert not {(min(a, b), max(a, b)) for a, b in pairs} & forbidden
+	weight = lambda ps: sum(similarity[a, b] for a, b in ps)
+	assert weight(pairs) == pytest.approx(weight(expected), abs=41e-6)
+	assert weight(pairs) > weight(optimal_matching(edges))
+
+
+def test_capacity_gives_extra_matches_without_repeats():
+	# 0 wants two matches; everyone else one. 5 vertices can then all be matched
+	edges = [(0, 1, 0.9), (0, 2, 0.8), (1, 2, 0.5), (3, 4, 0.4), (0, 3, 0.1)]
+	pairs = optimal_matching(edges, capacity={0: 2})
+	keys = sorted(tuple(sorted(pair)) for pair in pairs)
+	assert keys == [(0, 1), (0, 2), (3, 4)]
+	with pytest.raises(ValueError):
+		optimal_matching(edges, mode="greedy", capacity={0: 2})
+
+
+def test_capacity_accepts_edge_arrays():
+	edges = [(0, 1, 0.9), (0, 2, 0.8), (1, 2, 0.5), (3, 4, 0.4), (0, 3, 0.1)]
+	arrays = tuple(np.array(col) for col in zip(*edges))
+	pairs = optimal_matching(arrays, capacity={0: 2}, weight_resolution=1e-6)
+	assert sorted(tuple(sorted(pair)) for pair in pairs) == [(0, 1), (0, 2), (3, 4)]
+
+
+def test_capacity_prefers_maximum_cardinality():
+	# Taking the heavy edge (1, 2) would leave 1 short of its second match
+	edges = [(0, 1, 1.0), (1, 2, 10.0), (2, 3, 1.0), (1, 3, 1.0)]
+	pairs = optimal_matching(edges, capacity={1: 2, 2: 2})
+	assert len(pairs) == 3
+
+
+@pytest.mark.parametrize("capacity", [{0: 2}, {0: 1, 1: 1}])
+def test_capacity_matches_all_negative_edges_like_plain_matching(capacity):
+	# Maximum cardinality wins over weight, so even a negative edge is taken
+	edges = [(0, 1, -1.0)]
+	assert sorted(tuple(sorted(pair)) for pair in optimal_matching(edges, capacity=capacity)) == [(0, 1)]
+	assert sorted(tuple(sorted(pair)) for pair in optimal_matching(edges)) == [(0, 1)]
@@ -0,0 +1,851 @@
+import random
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.mwmatching import maximum_weight_matching, adjust_weights_for_maximum_cardinality_matching, quantize_weights, build_graph, solve_maximum_weight_matching, MatchingState, maximum_weight_matching_by_component, solve_maximum_weight_matching_by_component, greedy_matching, path_growing_matching, improve_matching
+from src.mwmatching.algorithm import GraphInfo, MatchingContext, MatchingError, _verify_optimum_lists
+from src.mwmatching.components import connected_components
+from src.mwmatching.datastruct import IndexedPriorityQueue, RadixPriorityQueue
+from src.mwmatching.stats import SolverStats
+from src.mwmatching.presolve import presolve
+from src.mwmatching.checkpoint import graph_fingerprint, save_checkpoint, load_checkpoint, remap_state
+from src.mwmatching.generation import solve_with_edge_generation, find_violated_edges
+from src.mwmatching.bmatching import maximum_weight_b_matching, solve_maximum_weight_b_matching, reduce_b_matching, adjust_weights_for_maximum_cardinality_b_matching
+from src.mwmatching.numpy_verify import verify_optimum_arrays
+from src.mwmatching.ingest import ingest_edges
+from src.mwmatching.warmstart import greedy_start_state, is_exact_resume
+
+
+def random_edges(num_vertex, num_edge, seed, integer=True):
+	rng = random.Random(seed)
+	seen = set()
+	edges = []
+	while len(edges) < num_edge:
+		x, y = rng.randrange(num_vertex), rng.randrange(num_vertex)
+		if x == y or (min(x, y), max(x, y)) in seen:
+			continue
+		seen.add((min(x, y), max(x, y)))
+		w = rng.randint(1, 100) if integer else rng.random()
+		edges.append((x, y, w))
+	return edges
+
+
+def matching_weight(edges, pairs):
+	weights = {(min(x, y), max(x, y)): w for x, y, w in edges}
+	return sum(weights[(min(x, y), max(x, y))] for x, y in pairs)
+
+
+def reference_weight(edges):
+	g = nx.Graph()
+	g.add_weighted_edges_from(edges)
+	return matching_weight(edges, nx.max_weight_matching(g))
+
+
+def assert_valid_matching(edges, pairs):
+	existing = {(min(x, y), max(x, y)) for x, y, _w in edges}
+	used = set()
+	for x, y in pairs:
+		assert (min(x, y), max(x, y)) in existing
+		assert x not in used and y not in used
+		used.update((x, y))
+
+
+def test_graph_info_adjacency_is_compressed():
+	edges = [(0, 1, 5), (1, 2, 3), (0, 3, 4)]
+	graph = GraphInfo(edges)
+	assert graph.num_vertex == 4
+	assert graph.num_edge == 3
+	assert list(graph.incident_edges(0)) == [0, 2]
+	assert list(graph.incident_edges(1)) == [0, 1]
+	assert list(graph.incident_edges(3)) == [2]
+	assert list(graph.edge_w) == [5, 3, 4]
+	assert graph.integer_weights
+
+
+def test_graph_info_keeps_big_integer_weights_exact():
+	edges = [(0, 1, 2**70 + 1), (1, 2, 2**70)]
+	graph = GraphInfo(edges)
+	assert graph.edge_w[0] == 2**70 + 1
+	assert maximum_weight_matching(edges) == [(0, 1)]
+
+
+def test_matches_networkx_on_random_integer_graphs():
+	for seed in range(30):
+		edges = random_edges(30, 80, seed)
+		pairs = maximum_weight_matching(edges)
+		assert_valid_matching(edges, pairs)
+		assert matching_weight(edges, pairs) == reference_weight(edges)
+
+
+def test_matches_networkx_on_random_float_graphs():
+	for seed in range(10):
+		edges = random_edges(40, 120, seed, integer=False)
+		pairs = maximum_weight_matching(edges)
+		assert_valid_matching(edges, pairs)
+		assert abs(matching_weight(edges, pairs) - reference_weight(edges)) < 1e-9
+
+
+def test_numpy_edge_arrays_match_list_input():
+	for seed in range(10):
+		edges = random_edges(30, 80, seed)
+		u = np.array([x for x, _y, _w in edges])
+		v = np.array([y for _x, y, _w in edges])
+		w = np.array([w for _x, _y, w in edges])
+		assert maximum_weight_matching((u, v, w)) == maximum_weight_matching(edges)
+
+
+def test_numpy_edge_arrays_adjust_for_maximum_cardinality():
+	edges = [(0, 1, 10), (1, 2, 11), (2, 3, 10)]
+	u, v, w = (np.array(col) for col in zip(*edges))
+	adjusted = adjust_weights_for_maximum_cardinality_matching((u, v, w))
+	assert [tuple(e) for e in zip(*adjusted)] == adjust_weights_for_maximum_cardinality_matching(edges)
+	assert sorted(maximum_weight_matching(adjusted)) == [(0, 1), (2, 3)]
+
+
+@pytest.mark.parametrize("u, v, w, error", [
+	([0, 1], [1, 1], [1.0, 2.0], ValueError),
+	([0, 1], [1, 0], [1.0, 2.0], ValueError),
+	([0, -1], [1, 2], [1.0, 2.0], ValueError),
+	([0, 1], [1, 2], [1.0, np.nan], ValueError),
+	([0.0, 1.0], [1, 2], [1.0, 2.0], TypeError),
+])
+def test_numpy_edge_arrays_are_validated(u, v, w, error):
+	with pytest.raises(error):
+		maximum_weight_matching((np.array(u), np.array(v), np.array(w)))
+
+
+def perturb_edges(edges, pairs, seed, rate=0.1):
+	rng = random.Random(seed)
+	matched = {(min(x, y), max(x, y)) for x, y in pairs}
+	perturbed = []
+	for x, y, w in edges:
+		c = rng.random()
+		if (min(x, y), max(x, y)) in matched and c < rate / 2:
+			continue
+		if c < rate:
+			w = rng.randint(1, 100)
+		perturbed.append((x, y, w))
+	return perturbed
+
+
+def count_stages(monkeypatch):
+	stages = []
+	run_stage = MatchingContext.run_stage
+	def counting_run_stage(ctx):
+		stages.append(1)
+		return run_stage(ctx)
+	monkeypatch.setattr(MatchingContext, "run_stage", counting_run_stage)
+	return stages
+
+
+def test_warm_start_matches_networkx_after_changes():
+	for seed in range(20):
+		edges = random_edges(30, 80, seed)
+		result = solve_maximum_weight_matching(edges)
+		for step in range(3):
+			edges = perturb_edges(edges, result.pairs, seed * 10 + step)
+			result = solve_maximum_weight_matching(edges, warm_start=result.state)
+			assert_valid_matching(edges, result.pairs)
+			assert matching_weight(edges, result.pairs) == reference_weight(edges)
+
+
+def test_warm_start_runs_few_stages(monkeypatch):
+	edges = random_edges(400, 3000, 7)
+	result = solve_maximum_weight_matching(edges)
+	changed = perturb_edges(edges, result.pairs, 7, rate=0.01)
+
+	stages = count_stages(monkeypatch)
+	cold = solve_maximum_weight_matching(changed)
+	num_cold = len(stages)
+	stages.clear()
+	warm = solve_maximum_weight_matching(changed, warm_start=result.state)
+
+	assert matching_weight(changed, warm.pairs) == matching_weight(changed, cold.pairs)
+	assert len(stages) * 5 < num_cold
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_jump_start_matches_cold_start_in_fewer_stages(monkeypatch, integer):
+	for seed in range(5):
+		edges = random_edges(300, 2000, seed, integer)
+		stages = count_stages(monkeypatch)
+		cold = solve_maximum_weight_matching(edges)
+		num_cold = len(stages)
+		stages.clear()
+		jump = solve_maximum_weight_matching(edges, jump_start=True)
+		assert_valid_matching(edges, jump.pairs)
+		assert matching_weight(edges, jump.pairs) == pytest.approx(matching_weight(edges, cold.pairs))
+		assert len(stages) < num_cold
+
+
+def test_greedy_start_state_is_feasible():
+	graph = GraphInfo(random_edges(100, 500, 4))
+	state = greedy_start_state(graph)
+	assert sum(y != -1 for y in state.vertex_mate) > 50
+	assert all(d >= 0 for d in state.vertex_dual_2x)
+	for x, y, w in zip(graph.edge_x, graph.edge_y, graph.edge_w):
+		assert state.edge_slack_2x(x, y, w) >= 0
+		if state.vertex_mate[x] == y:
+			assert state.vertex_mate[y] == x
+			assert state.edge_slack_2x(x, y, w) == 0
+
+
+def test_warm_start_accepts_arbitrary_state():
+	edges = random_edges(20, 60, 3)
+	state = MatchingState(
+		vertex_mate=[1, 0, 3, 2, -1],
+		vertex_dual_2x=[-4, 500, 3, 0, 17],
+		vertex_blossom=[-1] * 5,
+		blossom_parent=[],
+		blossom_dual=[])
+	result = solve_maximum_weight_matching(edges, warm_start=state)
+	assert matching_weight(edges, result.pairs) == reference_weight(edges)
+
+
+def disjoint_union(graphs):
+	edges = []
+	offset = 0
+	for graph in graphs:
+		edges.extend((x + offset, y + offset, w) for x, y, w in graph)
+		offset += 1 + max(max(x, y) for x, y, _w in graph)
+	return edges
+
+
+def test_connected_components_partition_edges():
+	edges = [(0, 1, 1), (2, 3, 1), (1, 4, 1), (5, 3, 1)]
+	components = connected_components(GraphInfo(edges))
+	assert components == [[0, 2], [1, 3]]
+
+
+@pytest.mark.parametrize("max_workers, min_parallel_edges", [(1, 0), (2, 0), (None, 10000)])
+def test_matching_by_component_matches_single_solve(max_workers, min_parallel_edges):
+	edges = disjoint_union([random_edges(30, 80, seed) for seed in range(4)])
+	pairs = maximum_weight_matching_by_component(edges, max_workers=max_workers, min_parallel_edges=min_parallel_edges)
+	assert_valid_matching(edges, pairs)
+	assert matching_weight(edges, pairs) == matching_weight(edges, maximum_weight_matching(edges))
+
+
+@pytest.mark.parametrize("max_workers, min_parallel_edges", [(1, 0), (2, 0)])
+def test_matching_by_component_splits_edge_arrays(max_workers, min_parallel_edges):
+	edges = disjoint_union([random_edges(30, 80, seed) for seed in range(4)])
+	random.Random(5).shuffle(edges)
+	arrays = tuple(np.array(a) for a in zip(*edges))
+	result = solve_maximum_weight_matching_by_component(arrays, max_workers=max_workers, min_parallel_edges=min_parallel_edges)
+	expected = solve_maximum_weight_matching_by_component(edges, max_workers=1)
+	assert sorted(result.pairs) == sorted(expected.pairs)
+	assert result.state.vertex_dual_2x == expected.state.vertex_dual_2x
+
+
+@pytest.mark.parametrize("approximate", [greedy_matching, path_growing_matching])
+def test_approximate_matching_is_at_least_half_optimal(approximate):
+	for seed in range(20):
+		edges = random_edges(40, 120, seed)
+		pairs = approximate(edges)
+		assert_valid_matching(edges, pairs)
+		assert 2 * matching_weight(edges, pairs) >= reference_weight(edges)
+
+
+def test_path_growing_matches_paths_optimally():
+	# Greedy takes the heavy middle edge; the path itself is better matched at both ends
+	edges = [(0, 1, 2), (1, 2, 3), (2, 3, 2)]
+	assert greedy_matching(edges) == [(1, 2)]
+	assert path_growing_matching(edges) == [(0, 1), (2, 3)]
+
+
+def test_local_search_improves_approximate_matching():
+	for seed in range(20):
+		edges = random_edges(40, 120, seed, integer=seed % 2 == 0)
+		initial = greedy_matching(edges)
+		result = improve_matching(edges, initial, time_budget=None)
+		assert_valid_matching(edges, result.pairs)
+		assert result.converged
+		assert result.initial_weight == pytest.approx(matching_weight(edges, initial))
+		assert result.final_weight == pytest.approx(matching_weight(edges, result.pairs))
+		assert result.improvement >= 0
+		assert result.final_weight <= reference_weight(edges) + 1e-9
+
+
+def test_local_search_applies_two_swap():
+	# Both matched edges are light; swapping them for the diagonals is optimal
+	edges = [(0, 1, 1), (2, 3, 1), (0, 2, 5), (1, 3, 5)]
+	result = improve_matching(edges, [(0, 1), (2, 3)], time_budget=None)
+	assert sorted(result.pairs) == [(0, 2), (1, 3)]
+	assert result.improvement == 8
+	assert result.num_moves == 1
+
+
+def test_local_search_rejects_invalid_matching():
+	edges = [(0, 1, 1), (1, 2, 1)]
+	with pytest.raises(ValueError):
+		improve_matching(edges, [(0, 2)])
+	with pytest.raises(ValueError):
+		improve_matching(edges, [(0, 1), (1, 2)])
+
+
+def fake_clock(monkeypatch):
+	# Every call to time.monotonic() advances the clock by one second
+	ticks = iter(range(1_000_000))
+	monkeypatch.setattr("src.mwmatching.algorithm.time.monotonic", lambda: next(ticks))
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_deadline_returns_partial_matching_that_resumes(monkeypatch, integer):
+	edges = random_edges(200, 1000, 11, integer)
+	fake_clock(monkeypatch)
+	partial = solve_maximum_weight_matching(edges, deadline=10)
+	assert not partial.optimal
+	assert_valid_matching(edges, partial.pairs)
+	assert 0 < len(partial.pairs) < len(maximum_weight_matching(edges))
+	monkeypatch.undo()
+	resumed = solve_maximum_weight_matching(edges, warm_start=partial.state)
+	assert resumed.optimal
+	assert matching_weight(edges, resumed.pairs) == pytest.approx(reference_weight(edges))
+
+
+def test_deadline_by_component_combines_states(monkeypatch):
+	edges = disjoint_union([random_edges(60, 200, seed) for seed in range(4)])
+	fake_clock(monkeypatch)
+	partial = solve_maximum_weight_matching_by_component(edges, max_workers=1, deadline=20)
+	assert not partial.optimal
+	assert_valid_matching(edges, partial.pairs)
+	monkeypatch.undo()
+	resumed = solve_maximum_weight_matching(edges, warm_start=partial.state)
+	assert matching_weight(edges, resumed.pairs) == reference_weight(edges)
+	resumed = solve_maximum_weight_matching_by_component(edges, max_workers=1, warm_start=partial.state)
+	assert resumed.optimal
+	assert matching_weight(edges, resumed.pairs) == reference_weight(edges)
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_checkpoint_round_trips_exactly(tmp_path, monkeypatch, integer):
+	edges = random_edges(200, 1000, 12, integer)
+	fake_clock(monkeypatch)
+	partial = solve_maximum_weight_matching(edges, deadline=30)
+	monkeypatch.undo()
+	path = tmp_path / "checkpoint.json.gz"
+	save_checkpoint(path, partial.state, graph_fingerprint(edges))
+	checkpoint = load_checkpoint(path)
+	assert checkpoint.state == partial.state
+	assert checkpoint.fingerprint == graph_fingerprint(edges)
+	# Resuming runs verify_optimum for integer weights
+	resumed = solve_maximum_weight_matching(edges, warm_start=checkpoint.state)
+	assert matching_weight(edges, resumed.pairs) == pytest.approx(reference_weight(edges))
+
+
+def test_remapped_checkpoint_resumes_in_another_vertex_order(tmp_path, monkeypatch):
+	edges = random_edges(200, 1000, 13)
+	fake_clock(monkeypatch)
+	partial = solve_maximum_weight_matching(edges, deadline=30)
+	monkeypatch.undo()
+	ids = [f"v{x}" for x in range(200)]
+	path = tmp_path / "checkpoint.json.gz"
+	save_checkpoint(path, partial.state, graph_fingerprint(edges), ids)
+	checkpoint = load_checkpoint(path)
+	assert checkpoint.vertex_ids == ids
+
+	# The same people listed in another order, minus one who left
+	order = list(range(200))
+	random.Random(13).shuffle(order)
+	order.remove(7)
+	new_index = {x: y for (y, x) in enumerate(order)}
+	moved = [(new_index[x], new_index[y], w) for (x, y, w) in edges if 7 not in (x, y)]
+	state = remap_state(checkpoint.state, checkpoint.vertex_ids, [ids[x] for x in order])
+	assert state.blossom_parent == []
+	for (x, y) in partial.pairs:
+		if 7 not in (x, y):
+			assert state.vertex_mate[new_index[x]] == new_index[y]
+	resumed = solve_maximum_weight_matching(moved, warm_start=state)
+	assert matching_weight(moved, resumed.pairs) == reference_weight(moved)
+
+
+STALLED_RESUME_EDGES = [(12, 9, 42), (8, 10, 43), (0, 12, 38), (1, 6, 30), (0, 11, 21), (10, 12, 12), (10, 2, 34), (15, 12, 40), (7, 14, 7), (0, 9, 32), (4, 1, 1), (15, 0, 31), (6, 7, 48), (10, 5, 22), (15, 14, 49), (8, 2, 33), (6, 11, 16), (5, 7, 35), (12, 8, 38), (6, 16, 11), (15, 11, 42), (5, 6, 47), (5, 15, 40), (0, 4, 14), (6, 0, 40)]
+
+
+@pytest.mark.parametrize("edges", [STALLED_RESUME_EDGES, random_edges(60, 200, 14), random_edges(60, 200, 15, integer=False)])
+def test_deadline_resumes_through_checkpoint_reach_optimum(tmp_path, monkeypatch, edges):
+	# Folding the blossoms on every resume used to release their matched edges, so runs
+	# of two stages each redid the same work forever on the first graph
+	path = tmp_path / "checkpoint.json.gz"
+	state = None
+	num_pairs = 0
+	for _round in range(100):
+		fake_clock(monkeypatch)
+		result = solve_maximum_weight_matching(edges, warm_start=state, deadline=2)
+		assert len(result.pairs) >= num_pairs
+		num_pairs = len(result.pairs)
+		if result.optimal:
+			break
+		save_checkpoint(path, result.state, graph_fingerprint(edges))
+		state = load_checkpoint(path).state
+		assert state == result.state
+		assert is_exact_resume(GraphInfo(edges), state)
+	assert result.optimal
+	assert matching_weight(edges, result.pairs) == pytest.approx(reference_weight(edges))
+
+
+def test_resume_folds_blossoms_that_no_longer_fit():
+	edges = STALLED_RESUME_EDGES
+	state = solve_maximum_weight_matching(edges).state
+	assert state.blossom_dual
+	assert is_exact_resume(GraphInfo(edges), state)
+	# Raising an edge weight breaks the dual constraint; the warm start repairs it instead
+	changed = [(x, y, w + 50 if (x, y) == (7, 14) else w) for (x, y, w) in edges]
+	assert not is_exact_resume(GraphInfo(changed), state)
+	assert not is_exact_resume(GraphInfo(edges), state._replace(blossom_edges=None))
+	resumed = solve_maximum_weight_matching(changed, warm_start=state)
+	assert matching_weight(changed, resumed.pairs) == reference_weight(changed)
+
+
+def test_graph_fingerprint_detects_changes():
+	edges = [(0, 1, 3), (1, 2, 4)]
+	assert graph_fingerprint(edges) == graph_fingerprint(list(edges))
+	assert graph_fingerprint(edges) != graph_fingerprint([(0, 1, 3), (1, 2, 5)])
+	assert graph_fingerprint(edges) != graph_fingerprint([(0, 1, 3.0), (1, 2, 4.0)])
+
+
+def test_load_checkpoint_rejects_damaged_file(tmp_path):
+	path = tmp_path / "checkpoint.json.gz"
+	path.write_bytes(b"not a checkpoint")
+	with pytest.raises(ValueError):
+		load_checkpoint(path)
+
+
+def test_solver_stats_count_each_stage():
+	edges = random_edges(300, 1500, 13)
+	reported = []
+	stats = SolverStats(on_stage=lambda i, stage: reported.append(i))
+	result = solve_maximum_weight_matching(edges, stats=stats)
+	assert reported == list(range(len(stats.stages)))
+	# One augmenting stage per matched pair, then one final stage
+	assert len(stats.stages) == len(result.pairs) + 1
+	assert all(stage.augmented for stage in stats.stages[:-1])
+	assert not stats.stages[-1].augmented
+	totals = stats.totals()
+	assert totals.delta_steps[1] == 1
+	assert totals.delta_steps[2] > 0 and totals.delta_steps[3] > 0
+	assert totals.blossoms_created >= totals.blossoms_expanded
+	assert totals.edges_scanned >= 2 * len(edges)
+	assert totals.queue_ops > 0
+	assert totals.seconds == pytest.approx(sum(stage.seconds for stage in stats.stages))
+
+
+def test_solver_stats_combine_components():
+	edges = disjoint_union([random_edges(30, 80, seed) for seed in range(3)])
+	stats = SolverStats()
+	result = solve_maximum_weight_matching_by_component(edges, max_workers=1, stats=stats)
+	assert len(stats.stages) == len(result.pairs) + 3
+
+
+def test_cached_top_level_blossom_matches_concatenable_queue():
+	for edges in [random_edges(60, 300, seed) for seed in range(10)] + [nested_blossom_edges(30)]:
+		ctx = MatchingContext(GraphInfo(edges))
+		ctx.start()
+		while ctx.run_stage():
+			for x in range(ctx.graph.num_vertex):
+				assert ctx.top_level_blossom(x) is ctx.vertex_queue_node[x].find()
+			# Every slot belongs to exactly one top-level blossom or is free
+			used = {ctx.vertex_top_slot[x] for x in range(ctx.graph.num_vertex)}
+			assert len(used) + len(ctx.free_top_slots) == ctx.graph.num_vertex
+			assert not used & set(ctx.free_top_slots)
+
+
+def test_quantize_weights_rounds_to_integers():
+	edges = [(0, 1, 0.8123456), (1, 2, -0.25), (2, 3, 0.0000004)]
+	assert quantize_weights(edges, 1e-6) == [(0, 1, 812346), (1, 2, -250000), (2, 3, 0)]
+	(u, v, w) = quantize_weights((np.array([0, 1]), np.array([1, 2]), np.array([0.5, 0.1234567])), 1e-6)
+	assert w.dtype == np.int64
+	assert w.tolist() == [500000, 123457]
+	with pytest.raises(ValueError):
+		quantize_weights(edges, 0)
+
+
+def test_quantized_matching_is_near_optimal():
+	for seed in range(10):
+		edges = random_edges(50, 200, seed, integer=False)
+		resolution = 1e-4
+		pairs = maximum_weight_matching(quantize_weights(edges, resolution))
+		assert_valid_matching(edges, pairs)
+		assert matching_weight(edges, pairs) >= reference_weight(edges) - 50 * resolution / 2
+
+
+@pytest.mark.parametrize("fix_edges", [False, True])
+def test_presolve_preserves_optimum(fix_edges):
+	for seed in range(60):
+		# Sparse graphs have plenty of pendant vertices and chains
+		edges = random_edges(40, 40 + seed, seed, integer=seed % 2 == 0)
+		reduction = presolve(edges, fix_edges=fix_edges)
+		pairs = reduction.restore(maximum_weight_matching(reduction.edges))
+		assert_valid_matching(edges, pairs)
+		assert matching_weight(edges, pairs) == pytest.approx(reference_weight(edges))
+
+
+def test_presolve_solves_trees_completely():
+	# A path with a pendant hanging off vertex 2
+	edges = [(0, 1, 4), (1, 2, 5), (2, 3, 3), (3, 4, 1), (2, 5, 2)]
+	reduction = presolve(edges)
+	assert reduction.edges == []
+	assert sorted(tuple(sorted(pair)) for pair in reduction.restore([])) == [(0, 1), (2, 5), (3, 4)]
+
+
+def test_presolve_fixes_dominated_edges():
+	# The light edges of the 4-cycle can not be in an optimal matching
+	edges = [(0, 1, 10), (1, 2, 1), (2, 3, 10), (3, 0, 1)]
+	assert presolve(edges).edges == edges
+	reduction = presolve(edges, fix_edges=True)
+	assert reduction.num_fixed_edges == 2
+	assert sorted(tuple(sorted(pair)) for pair in reduction.restore(maximum_weight_matching(reduction.edges))) == [(0, 1), (2, 3)]
+
+
+def dense_weights(num_vertex, seed):
+	rng = np.random.default_rng(seed)
+	weights = rng.integers(1, 1000, size=(num_vertex, num_vertex))
+	weights = np.triu(weights, 1)
+	return weights + weights.T
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_edge_generation_finds_full_graph_optimum(seed):
+	num_vertex = 40
+	weights = dense_weights(num_vertex, seed)
+	full = [(x, y, int(weights[x, y])) for x in range(num_vertex) for y in range(x + 1, num_vertex)]
+	# Candidates: the 3 heaviest edges of each vertex
+	candidates = {}
+	for x in range(num_vertex):
+		for y in np.argsort(-weights[x])[:3]:
+			candidates[(min(x, int(y)), max(x, int(y)))] = int(weights[x, y])
+	edges = [(x, y, w) for (x, y), w in candidates.items()]
+
+	result = solve_with_edge_generation(edges, lambda state: find_violated_edges(state, num_vertex, lambda start, end: weights[start:end], block_size=16))
+	assert result.optimal
+	assert_valid_matching(full, result.pairs)
+	assert matching_weight(full, result.pairs) == reference_weight(full)
+	# The final duals certify the matching on the full graph
+	assert all(result.state.edge_slack_2x(x, y, w) >= 0 for x, y, w in full)
+	assert result.num_added_edges == len(result.edges) - len(edges)
+
+
+def test_edge_generation_stops_after_max_rounds():
+	num_vertex = 30
+	weights = dense_weights(num_vertex, 7)
+	edges = [(x, x + 1, int(weights[x, x + 1])) for x in range(num_vertex - 1)]
+	find = lambda state: find_violated_edges(state, num_vertex, lambda start, end: weights[start:end])
+	result = solve_with_edge_generation(edges, find, max_rounds=1)
+	assert result.num_rounds == 1
+	assert not result.optimal
+	assert result.num_added_edges > 0
+
+
+def test_find_violated_edges_accounts_for_blossom_duals():
+	# The triangle becomes a blossom with positive dual; its edges have negative
+	# slack from the vertex duals alone but are not violated
+	edges = [(0, 1, 10), (1, 2, 10), (0, 2, 10), (0, 3, 2)]
+	state = solve_maximum_weight_matching(edges).state
+	assert state.blossom_dual == [8]
+	weights = np.array([[-1, 10, 10, 2], [10, -1, 10, 2], [10, 10, -1, 3], [2, 2, 3, -1]])
+	assert find_violated_edges(state, 4, lambda start, end: weights[start:end]) == [(2, 3, 3)]
+
+
+def brute_force_b_matching_weight(edges, capacity):
+	best = 0
+	for mask in range(1 << len(edges)):
+		used = {}
+		weight = 0
+		for i, (x, y, w) in enumerate(edges):
+			if mask >> i & 1:
+				used[x] = used.get(x, 0) + 1
+				used[y] = used.get(y, 0) + 1
+				weight += w
+		if all(n <= capacity.get(v, 1) for v, n in used.items()):
+			best = max(best, weight)
+	return best
+
+
+def assert_valid_b_matching(edges, pairs, capacity):
+	existing = {(min(x, y), max(x, y)) for x, y, _w in edges}
+	keys = [(min(x, y), max(x, y)) for x, y in pairs]
+	assert len(set(keys)) == len(keys)
+	assert set(keys) <= existing
+	for v in {v for pair in pairs for v in pair}:
+		assert sum(v in pair for pair in pairs) <= capacity.get(v, 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_b_matching_matches_brute_force(seed):
+	rng = random.Random(seed)
+	edges = random_edges(7, 12, seed)
+	capacity = {v: rng.choice([0, 1, 2, 3]) for v in range(7)}
+	pairs = maximum_weight_b_matching(edges, capacity)
+	assert_valid_b_matching(edges, pairs, capacity)
+	assert matching_weight(edges, pairs) == brute_force_b_matching_weight(edges, capacity)
+
+
+def test_b_matching_never_repeats_a_pair():
+	# Duplicating both vertices would match the heavy pair twice
+	edges = [(0, 1, 100), (0, 2, 1), (1, 3, 1)]
+	pairs = maximum_weight_b_matching(edges, {0: 2, 1: 2})
+	assert sorted(tuple(sorted(pair)) for pair in pairs) == [(0, 1), (0, 2), (1, 3)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_b_matching_generates_gadgets_like_full_reduction(seed):
+	rng = random.Random(seed)
+	edges = random_edges(40, 160, seed, integer=seed % 2 == 0)
+	capacity = {v: rng.choice([1, 2, 2, 3]) for v in range(40)}
+	reduction = reduce_b_matching(edges, capacity)
+	full = reduction.restore(maximum_weight_matching(reduction.edges))
+	result = solve_maximum_weight_b_matching(edges, capacity, max_workers=1)
+	assert result.optimal
+	assert_valid_b_matching(edges, result.pairs, capacity)
+	assert matching_weight(edges, result.pairs) == pytest.approx(matching_weight(edges, full))
+
+
+def test_b_matching_reports_violated_excluded_edges():
+	edges = [(0, 1, 100), (0, 2, 1), (1, 3, 1)]
+	capacity = {0: 2, 1: 2}
+	reduction = reduce_b_matching(edges, capacity, gadget_pairs=set())
+	assert reduction.gadget_edge == []
+	assert reduction.excluded_edge == [(0, 1, 100)]
+	state = solve_maximum_weight_matching(reduction.edges).state
+	assert reduction.violated_gadget_pairs(state) == {(0, 1)}
+	# With the gadget, the duals cover every edge
+	with_gadget = reduce_b_matching(edges, capacity, gadget_pairs={(0, 1)})
+	state = solve_maximum_weight_matching(with_gadget.edges, warm_start=with_gadget.carry_over_state(reduction, state)).state
+	assert with_gadget.excluded_edge == []
+	assert with_gadget.violated_gadget_pairs(state) == set()
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_b_matching_accepts_edge_arrays(integer):
+	for seed in range(10):
+		edges = random_edges(20, 50, seed, integer)
+		capacity = {x: 1 + (x + seed) % 3 for x in range(20)}
+		arrays = tuple(np.array(col) for col in zip(*edges))
+		expected = adjust_weights_for_maximum_cardinality_b_matching(edges, capacity)
+		adjusted = adjust_weights_for_maximum_cardinality_b_matching(arrays, capacity)
+		assert isinstance(adjusted, tuple) and all(isinstance(a, np.ndarray) for a in adjusted)
+		assert list(zip(*(a.tolist() for a in adjusted))) == expected
+		pairs = solve_maximum_weight_b_matching(adjusted, capacity, max_workers=1).pairs
+		assert_valid_b_matching(edges, pairs, capacity)
+		assert matching_weight(expected, pairs) == pytest.approx(matching_weight(expected, maximum_weight_b_matching(expected, capacity)))
+
+
+def test_b_matching_with_unit_capacity_is_a_matching():
+	edges = random_edges(30, 80, 3)
+	pairs = maximum_weight_b_matching(edges, {})
+	assert matching_weight(edges, pairs) == reference_weight(edges)
+	assert reduce_b_matching(edges, {}).gadget_edge == []
+
+
+def nested_blossom_edges(depth):
+	# Each pair (u, v) closes an odd cycle through the previous pair, so every
+	# new blossom contains the one before it
+	edges = []
+	for i in range(1, depth + 1):
+		u, v = 2 * i - 1, 2 * i
+		a, b = (0, 0) if i == 1 else (u - 2, v - 2)
+		w = 10 * depth - i
+		edges += [(u, v, w), (a, u, w), (b, v, w)]
+	return edges
+
+
+def blossom_depth(state):
+	deepest = 0
+	for b in state.vertex_blossom:
+		depth = 0
+		while b != -1:
+			depth += 1
+			b = state.blossom_parent[b]
+		deepest = max(deepest, depth)
+	return deepest
+
+
+def test_deeply_nested_blossoms_do_not_recurse():
+	depth = sys.getrecursionlimit() + 100
+	edges = nested_blossom_edges(depth)
+	# Integer weights, so the solver also verifies the optimum
+	result = solve_maximum_weight_matching(edges)
+	assert blossom_depth(result.state) == depth
+	assert len(result.pairs) == depth
+	# Augmenting from a warm start walks down through every level again
+	changed = edges[:-1] + [(edges[-1][0], edges[-1][1], edges[-1][2] + 1)]
+	resumed = solve_maximum_weight_matching(changed, warm_start=result.state)
+	assert matching_weight(changed, resumed.pairs) == matching_weight(changed, solve_maximum_weight_matching(changed).pairs)
+
+
+def test_indexed_priority_queue_matches_reference():
+	rng = random.Random(5)
+	queue = IndexedPriorityQueue(50)
+	other = IndexedPriorityQueue(share=queue)
+	prio = {}
+	for _ in range(2000):
+		elem = rng.randrange(50)
+		if elem not in prio:
+			prio[elem] = rng.randint(0, 100)
+			queue.insert(elem, prio[elem])
+		elif rng.random() < 0.3:
+			queue.delete(elem)
+			del prio[elem]
+		else:
+			new = rng.randint(0, 100)
+			if new < prio[elem]:
+				queue.decrease_prio(elem, new)
+			else:
+				queue.increase_prio(elem, new)
+			prio[elem] = new
+		if prio:
+			assert queue.min_prio() == min(prio.values())
+			assert prio[queue.find_min()] == queue.min_prio()
+		# Queues sharing positions see the same membership
+		assert all((e in other) == (e in prio) for e in range(50))
+	queue.clear()
+	assert queue.empty() and not any(e in queue for e in range(50))
+
+
+def test_radix_priority_queue_matches_reference():
+	rng = random.Random(6)
+	queue = RadixPriorityQueue(50)
+	prio = {}
+	floor = 0
+	for _ in range(5000):
+		elem = rng.randrange(50)
+		if elem not in prio:
+			# Priorities may be below the current minimum, but never below the floor
+			prio[elem] = floor + rng.choice([rng.randint(0, 3), rng.randint(0, 1_000_000)])
+			queue.insert(elem, prio[elem])
+		elif rng.random() < 0.3:
+			queue.delete(elem)
+			del prio[elem]
+		elif rng.random() < 0.5:
+			new = rng.randint(floor, prio[elem])
+			queue.decrease_prio(elem, new)
+			prio[elem] = new
+		else:
+			new = prio[elem] + rng.randint(0, 1000)
+			queue.increase_prio(elem, new)
+			prio[elem] = new
+		if prio and rng.random() < 0.2:
+			floor = rng.randint(floor, min(prio.values()))
+			queue.advance(floor)
+		if prio:
+			assert queue.min_prio() == min(prio.values())
+			assert prio[queue.find_min()] == queue.min_prio()
+		assert all((e in queue) == (e in prio) for e in range(50))
+	queue.clear()
+	assert queue.empty() and not any(e in queue for e in range(50))
+
+
+def solved_context(edges):
+	ctx = MatchingContext(GraphInfo(edges))
+	ctx.start()
+	while ctx.run_stage():
+		pass
+	ctx.cleanup()
+	return ctx
+
+
+def test_verify_optimum_arrays_agrees_with_lists():
+	graphs = [random_edges(40, 150, seed) for seed in range(20)] + [nested_blossom_edges(30)]
+	for edges in graphs:
+		ctx = solved_context(edges)
+		_verify_optimum_lists(ctx)
+		verify_optimum_arrays(ctx)
+		verify_optimum_arrays(ctx, sample_size=10)
+
+		# Make one unmatched edge heavier than its duals allow: both versions must notice
+		e = next(e for e in range(ctx.graph.num_edge) if ctx.vertex_mate[ctx.graph.edge_x[e]] != ctx.graph.edge_y[e])
+		ctx.graph.edge_w[e] += ctx.vertex_dual_2x[ctx.graph.edge_x[e]] + ctx.vertex_dual_2x[ctx.graph.edge_y[e]] + 1
+		with pytest.raises(MatchingError):
+			_verify_optimum_lists(ctx)
+		with pytest.raises(MatchingError):
+			verify_optimum_arrays(ctx)
+
+
+def test_verify_optimum_arrays_uses_blossom_duals():
+	ctx = solved_context(nested_blossom_edges(30))
+	blossom = next(b for b in ctx.nontrivial_blossom if b.parent is not None and b.dual_var > 0)
+	blossom.dual_var = 0
+	with pytest.raises(MatchingError):
+		_verify_optimum_lists(ctx)
+	with pytest.raises(MatchingError):
+		verify_optimum_arrays(ctx)
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_ingest_edges_matches_list_pipeline(integer):
+	for seed in range(10):
+		edges = random_edges(30, 80, seed, integer) + [(30, 31, -5 if integer else -0.5)]
+		expected = adjust_weights_for_maximum_cardinality_matching(quantize_weights(edges, 0.01))
+		ingested = ingest_edges((e for e in edges), resolution=0.01, maximum_cardinality=True)
+		assert [tuple(e) for e in zip(*(a.tolist() for a in ingested))] == expected
+		assert ingested[2].dtype == np.int64
+
+		# Without the adjustment, negative edges are dropped as they arrive
+		ingested = ingest_edges(iter(edges))
+		assert [tuple(e) for e in zip(*(a.tolist() for a in ingested))] == edges[:-1]
+		assert maximum_weight_matching(ingested) == maximum_weight_matching(edges)
+
+
+@pytest.mark.parametrize("edges, error", [
+	([(0, 1, 1), (1, 1, 2)], ValueError),
+	([(0, 1, 1), (1, 0, 2)], ValueError),
+	([(0, 1, 1), (0, 2, float("nan"))], ValueError),
+	([(0, 1, 1), (0, 2, 2**64)], ValueError),
+	([(0, 1, 1), (0, 2.0, 2)], TypeError),
+	([(0, 1, 1), (0, 2)], TypeError),
+])
+def test_ingest_edges_validates_input(edges, error):
+	with pytest.raises(error):
+		ingest_edges(iter(edges))
+
+
+def test_presolve_keeps_edge_arrays_as_arrays():
+	for seed in range(10):
+		edges = random_edges(40, 40 + seed, seed)
+		arrays = tuple(np.array(col) for col in zip(*edges))
+		reduced = presolve(arrays).edges
+		assert isinstance(reduced, tuple) and all(isinstance(a, np.ndarray) for a in reduced)
+		assert list(zip(*(a.tolist() for a in reduced))) == presolve(edges).edges
+
+
+def test_presolve_returns_graph_without_pendants_unchanged():
+	edges = [(0, 1, 3), (1, 2, 4), (2, 0, 5), (2, 3, 1), (3, 4, 2), (4, 2, 6)]
+	arrays = tuple(np.array(col) for col in zip(*edges))
+	assert presolve(arrays).edges is arrays
+	assert presolve(edges).edges is edges
+
+
+def test_build_graph_reuses_ingested_arrays():
+	edges = [(0, 1, 3), (1, 2, 4), (2, 0, 5), (2, 3, 1), (3, 4, 2), (4, 2, 6)]
+	ingested = ingest_edges(iter(edges))
+	graph = build_graph(ingested)
+	for (typed, arr) in zip((graph.edge_x, graph.edge_y, graph.edge_w), ingested):
+		assert np.shares_memory(np.frombuffer(typed, dtype=arr.dtype), arr)
+	# The same graph goes through presolve, the fingerprint and the solver
+	assert presolve(graph).edges is graph
+	assert graph_fingerprint(graph) == graph_fingerprint(edges)
+	assert solve_maximum_weight_matching(graph).pairs == maximum_weight_matching(edges)
+
+	# Other arrays are copied, so later changes to them do not leak into the graph
+	arrays = tuple(np.array(col) for col in zip(*edges))
+	graph = build_graph(arrays)
+	arrays[2][0] = 100
+	assert graph.edge_w[0] == 3
+
+
+@pytest.mark.parametrize("integer", [True, False])
+def test_presolve_and_components_keep_built_graph(integer):
+	for seed in range(20):
+		# Sparse graphs fall apart into components with pendant vertices
+		edges = random_edges(60, 50 + seed, seed, integer)
+		graph = build_graph(ingest_edges(iter(edges)))
+		reduction = presolve(graph)
+		assert isinstance(reduction.edges, GraphInfo)
+		assert reduction.edges.num_vertex == graph.num_vertex
+		assert list(zip(reduction.edges.edge_x, reduction.edges.edge_y, reduction.edges.edge_w)) == presolve(edges).edges
+		result = solve_maximum_weight_matching_by_component(reduction.edges, max_workers=1)
+		pairs = reduction.restore(result.pairs)
+		assert_valid_matching(edges, pairs)
+		assert matching_weight(edges, pairs) == pytest.approx(reference_weight(edges))
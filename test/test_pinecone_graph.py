@@ -1,3 +1,5 @@
+import pytest
+
 from src.pinecone_graph import PineconeGraph
 
 
@@ -12,6 +14,13 @@ def test_pinecone_load_pairs_local():
 	assert ("mercury", "venus") in pairs
 
 
+def test_pinecone_load_capacities_defaults_to_one_match():
+	graph = PineconeGraph(INDEX_NAME)
+	graph.build(include_values=False)
+	# Nobody seeded by init-local.py sets matchesWanted
+	assert graph.load_capacities() == {}
+
+
 def test_pinecone_add_pairs_local_and_cleanup():
 	graph = PineconeGraph(INDEX_NAME)
 	graph.build()
@@ -38,12 +47,55 @@ def test_pinecone_add_pairs_local_and_cleanup():
 	assert a_id in (graph.vectors[bi2].metadata.get("pastPairings") or [])
 
 	# Cleanup: restore original metadata for both ids via bulk upsert
+	# build() drops the raw values once they are in the matrix, so fetch them again
+	fetched = graph.index.fetch(ids=[a_id, b_id]).vectors
 	payload = []
 	for vid, md in [(a_id, orig_a_md), (b_id, orig_b_md)]:
-		idx = graph.id_to_index[vid]
 		payload.append({
 			"id": vid,
-			"values": graph.vectors[idx].values,
+			"values": fetched[vid].values,
 			"metadata": md,
 		})
 	graph.index.upsert(vectors=payload)
+
+
+def test_pinecone_export_pages_through_every_entry():
+	graph = PineconeGraph(INDEX_NAME)
+	graph.build()
+	total = graph.index.describe_index_stats()["total_vector_count"]
+
+	# Small pages force several list calls and several fetches in flight
+	chunks = list(graph.iter_entries(page_size=2, max_in_flight=2))
+	assert all(len(chunk) <= 2 for chunk in chunks)
+	ids = [vec.id for chunk in chunks for vec in chunk]
+	assert len(ids) == len(set(ids)) == total
+	assert sorted(ids) == sorted(graph.index_to_id)
+
+	# The values live only in the float32 matrix, one row per local index
+	assert graph.vector_matrix().shape[0] == total
+	assert all(not vec.values for vec in graph.vectors)
+
+
+def test_pinecone_concurrent_queries_give_the_same_edges():
+	graph = PineconeGraph(INDEX_NAME)
+	graph.build()
+	one_at_a_time = graph.edges(max_in_flight=1)
+	fanned_out = graph.edges(max_in_flight=8)
+	assert fanned_out == one_at_a_time
+	summary = graph.query_latency_summary()
+	assert summary["queries"] == len(graph.vectors)
+	assert 0 < summary["p50"] <= summary["p95"] <= summary["max"]
+
+
+def test_pinecone_build_without_values_queries_by_id():
+	graph = PineconeGraph(INDEX_NAME)
+	graph.build()
+	with_values = graph.edges()
+
+	slim = PineconeGraph(INDEX_NAME)
+	slim.build(include_values=False)
+	assert all(not vec.values for vec in slim.vectors)
+	assert ("mercury", "venus") in slim.load_pairs()
+	assert slim.edges() == with_values
+	with pytest.raises(ValueError):
+		slim.edges(local=True)